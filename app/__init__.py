@@ -1,10 +1,24 @@
+import click
 from flask import Flask
-from .extensions import db, migrate, ma, jwt
+from .extensions import db, ma, jwt
 from .blueprints import register_blueprints
-from flask_admin import Admin
-from app.utils import is_token_blacklisted
-from flask_admin.contrib.sqla import ModelView
-from app.models import User, Verification, Loan, RequestLoan, Repayment, TokenBlacklist, LoanBalance
+from .commands import register_commands
+from .session import init_read_routing
+from app.utils import (
+    is_token_blacklisted, init_compression, init_pool_metrics, init_sqlite, init_query_stats,
+    init_metrics, init_profiler,
+)
+
+def init_migrate(app):
+    """Set up Flask-Migrate when the app is loaded by the ``flask`` CLI.
+
+    Only the ``flask db`` commands need it, and importing it pulls in
+    alembic, so gunicorn workers skip it.
+    """
+    if click.get_current_context(silent=True) is None:
+        return
+    from flask_migrate import Migrate
+    Migrate(app, db)
 
 def create_app(config):
     app = Flask(__name__)
@@ -12,9 +26,13 @@ def create_app(config):
 
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    init_sqlite(app)
+    init_migrate(app)
     ma.init_app(app)
     jwt.init_app(app)
+    init_pool_metrics(app)
+    init_read_routing(app)
+    init_query_stats(app)
 
     # Ensure that the JWT configuration checks for blacklisted tokens
     @jwt.token_in_blocklist_loader
@@ -22,24 +40,29 @@ def create_app(config):
         jti = jwt_payload['jti']
         return is_token_blacklisted(jti)
 
-    # Initialize Flask-Admin
-    admin = Admin(app, name='Trustlend Admin Panel', template_mode='bootstrap4')
-
-    # Add model views to admin
-    admin.add_view(ModelView(User, db.session))
-    admin.add_view(ModelView(Verification, db.session))
-    admin.add_view(ModelView(RequestLoan, db.session))
-    admin.add_view(ModelView(Loan, db.session))
-    admin.add_view(ModelView(TokenBlacklist, db.session))
-    admin.add_view(ModelView(LoanBalance, db.session))
-    admin.add_view(ModelView(Repayment, db.session))
-
+    # Flask-Admin is imported only when enabled, so API-only workers skip it
+    if app.config.get('ADMIN_ENABLED'):
+        from .admin import init_admin
+        init_admin(app)
 
     # register blueprints
     register_blueprints(app)
 
-    # Create database tables if they don't exist 
-    with app.app_context():
-        db.create_all()
+    # register CLI commands
+    register_commands(app)
+
+    # Admin-controlled request profiling
+    init_profiler(app)
+
+    # Request metrics, registered first so their timing includes compression
+    init_metrics(app)
+
+    # Compress large responses for clients that accept it
+    init_compression(app)
+
+    # Tables come from `flask db upgrade`; creating them here is a development shortcut
+    if app.config.get('AUTO_CREATE_SCHEMA'):
+        with app.app_context():
+            db.create_all()
 
     return app
\ No newline at end of file
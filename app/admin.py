@@ -0,0 +1,94 @@
+from flask_admin import Admin
+from flask_admin.contrib.sqla import ModelView
+from sqlalchemy.orm import joinedload, load_only
+from app.extensions import db
+from app.models import User, Verification, Loan, RequestLoan, Repayment, TokenBlacklist, LoanBalance
+
+# Just enough of the borrower for its __repr__ (the email) in list pages
+BORROWER = (User.id, User.email)
+
+
+class TrustlendModelView(ModelView):
+    """ModelView whose list page loads only the columns and relations it shows.
+
+    Subclasses list their columns in ``column_list`` and the eager loads for
+    any relation shown there in ``list_options``, so a page costs one SELECT
+    (plus the COUNT unless ``simple_list_pager`` skips it) whatever the page
+    size. Flask-Admin's own auto-joins are off so they cannot load whole rows
+    behind our back.
+    """
+    column_auto_select_related = False
+    column_display_pk = True
+    page_size = 50
+    list_options = ()
+
+    def get_query(self):
+        mapper = self.model.__mapper__
+        names = [name for name in self.column_list or () if name in mapper.column_attrs]
+        columns = [getattr(self.model, name) for name in names]
+        return super().get_query().options(load_only(*columns), *self.list_options)
+
+
+class UserView(TrustlendModelView):
+    column_list = ('id', 'full_name', 'email', 'is_active', 'is_admin', 'active_loan', 'date_joined')
+    column_exclude_list = ('password',)
+    form_excluded_columns = ('password', 'loans', 'loan_balance', 'repayments', 'verifications')
+    column_searchable_list = ('email',)
+    column_filters = ('is_admin', 'active_loan')
+
+
+class VerificationView(TrustlendModelView):
+    column_list = ('id', 'user', 'is_verified', 'date_verified', 'address')
+    column_filters = ('is_verified', 'user_id')
+    list_options = (joinedload(Verification.user).load_only(*BORROWER),)
+
+
+class RequestLoanView(TrustlendModelView):
+    column_list = ('id', 'user_id', 'amount', 'amortization_rate', 'approval', 'date_requested')
+    column_filters = ('approval', 'user_id', 'date_requested')
+    form_excluded_columns = ('loans', 'updated_at')
+    simple_list_pager = True
+
+
+class LoanView(TrustlendModelView):
+    column_list = ('id', 'user', 'request_loan_id', 'amount', 'paid_off', 'start_at')
+    column_filters = ('paid_off', 'user_id', 'start_at')
+    form_excluded_columns = ('updated_at',)
+    list_options = (joinedload(Loan.user).load_only(*BORROWER),)
+    simple_list_pager = True
+
+
+class LoanBalanceView(TrustlendModelView):
+    column_list = ('id', 'user', 'total_loan', 'total_paid', 'last_updated')
+    column_filters = ('user_id', 'last_updated')
+    list_options = (joinedload(LoanBalance.user).load_only(*BORROWER),)
+    simple_list_pager = True
+
+
+class RepaymentView(TrustlendModelView):
+    column_list = ('id', 'user', 'repay_amount', 'is_approved', 'paid_at')
+    column_filters = ('is_approved', 'user_id', 'paid_at')
+    form_excluded_columns = ('updated_at',)
+    list_options = (joinedload(Repayment.user).load_only(*BORROWER),)
+    simple_list_pager = True
+
+
+class TokenBlacklistView(TrustlendModelView):
+    column_list = ('id', 'jti', 'created_at')
+    column_searchable_list = ('jti',)
+    can_create = False
+    can_edit = False
+    simple_list_pager = True
+
+
+def init_admin(app):
+    """Mount the Flask-Admin panel at ``/admin``."""
+    admin = Admin(app, name='Trustlend Admin Panel', template_mode='bootstrap4')
+    admin.add_view(UserView(User, db.session))
+    admin.add_view(VerificationView(Verification, db.session))
+    admin.add_view(RequestLoanView(RequestLoan, db.session))
+    admin.add_view(LoanView(Loan, db.session))
+    admin.add_view(TokenBlacklistView(TokenBlacklist, db.session))
+    admin.add_view(LoanBalanceView(LoanBalance, db.session))
+    admin.add_view(RepaymentView(Repayment, db.session))
+    return admin
@@ -1,10 +1,16 @@
-from app.views import auth, verify, loans, repayments
-from .swagger import swagger_ui_blueprint, swagger_blueprint, SWAGGER_URL
+from app.views import auth, verify, loans, repayments, system, exports, analytics
 
 def register_blueprints(app):
     app.register_blueprint(auth, url_prefix='/api/v1/user')
     app.register_blueprint(verify, url_prefix='/api/v1/verification')
     app.register_blueprint(loans, url_prefix='/api/v1/loan')
     app.register_blueprint(repayments, url_prefix='/api/v1/repayment')
-    app.register_blueprint(swagger_ui_blueprint, url_prefix=SWAGGER_URL)
-    app.register_blueprint(swagger_blueprint)
\ No newline at end of file
+    app.register_blueprint(system, url_prefix='/api/v1/system')
+    app.register_blueprint(exports, url_prefix='/api/v1/export')
+    app.register_blueprint(analytics, url_prefix='/api/v1/analytics')
+
+    # API docs are imported only where they are served
+    if app.config.get('SWAGGER_ENABLED'):
+        from .swagger import swagger_ui_blueprint, swagger_blueprint, SWAGGER_URL
+        app.register_blueprint(swagger_ui_blueprint, url_prefix=SWAGGER_URL)
+        app.register_blueprint(swagger_blueprint)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from .seed import seed_command
+from .export import export_command
+from .snapshot import snapshot_command
+from .loan_import import import_loan_requests_command
+from .portfolio import rebuild_portfolio_command
+from .delinquency import delinquency_command
+from .accrual import accrue_interest_command
+from .ledger import ledger_command
+from .reconcile import reconcile_balances_command
+
+def register_commands(app):
+    app.cli.add_command(seed_command)
+    app.cli.add_command(export_command)
+    app.cli.add_command(snapshot_command)
+    app.cli.add_command(import_loan_requests_command)
+    app.cli.add_command(rebuild_portfolio_command)
+    app.cli.add_command(delinquency_command)
+    app.cli.add_command(accrue_interest_command)
+    app.cli.add_command(ledger_command)
+    app.cli.add_command(reconcile_balances_command)
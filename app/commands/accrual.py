@@ -0,0 +1,28 @@
+import json
+import click
+from flask.cli import with_appcontext
+from app.utils.accrual import ACCRUAL_CHUNK_USERS, AccrualUnavailable, accrue_interest
+
+
+@click.command('accrue-interest')
+@click.option('--date', 'accrual_date', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day to accrue. Defaults to yesterday.')
+@click.option('--chunk-users', default=ACCRUAL_CHUNK_USERS, show_default=True, help='Borrower ids posted per transaction.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON.')
+@with_appcontext
+def accrue_interest_command(accrual_date, chunk_users, as_json):
+    """Post the interest every open loan has earned up to a date (run nightly)."""
+    try:
+        report = accrue_interest(accrual_date.date() if accrual_date else None, chunk_users)
+    except AccrualUnavailable as e:
+        raise click.ClickException(str(e))
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+    if report['already_run']:
+        click.echo(f"Interest up to {report['accrual_date']} was already accrued: "
+                   f"{report['loans_accrued']:,} loans, {report['interest']}.")
+        return
+    click.echo(f"Accrued {report['interest']} on {report['loans_accrued']:,} loans up to {report['accrual_date']}; "
+               f"{report['loans_scanned']:,} loans scanned in {report['seconds']:.1f}s "
+               f"({report['loans_per_sec'] or 0:,} loans/s).")
@@ -0,0 +1,60 @@
+import time
+import click
+from flask.cli import AppGroup
+from app.utils.ledger import LEDGER_CHUNK_USERS, backfill_range, snapshot_range, rebuild_range, snapshot_cutoff, balance_at
+from app.utils.parallel import DEFAULT_WORKERS, user_ranges, map_user_ranges
+
+ledger_command = AppGroup('ledger', help='Balance ledger: opening entries, snapshots and the loan_balance cache.')
+
+chunk_users_option = click.option('--chunk-users', default=LEDGER_CHUNK_USERS, show_default=True, help='Borrower ids per range and transaction.')
+workers_option = click.option('--workers', default=DEFAULT_WORKERS, show_default=True, help='Processes working on ranges in parallel.')
+
+
+def _run(task, chunk_users, workers, **kwargs):
+    """Run ``task`` over every user-id range, echoing progress; returns the results and seconds taken."""
+    started = time.perf_counter()
+    ranges = user_ranges(chunk_users)
+    results = []
+    for low, high, result in map_user_ranges(task, ranges, workers, **kwargs):
+        results.append(result)
+        click.echo(f'  users {low + 1:,}-{high:,}: {result}')
+    return results, time.perf_counter() - started
+
+
+@ledger_command.command('backfill')
+@chunk_users_option
+@workers_option
+def backfill_command(chunk_users, workers):
+    """Open the ledger of borrowers who only have a loan_balance, from their current balance."""
+    results, seconds = _run(backfill_range, chunk_users, workers)
+    click.echo(f'{sum(results):,} opening entries written in {seconds:.1f}s.')
+
+
+@ledger_command.command('snapshot')
+@chunk_users_option
+@workers_option
+def snapshot_command(chunk_users, workers):
+    """Snapshot the ledger totals of every borrower with entries since their last snapshot."""
+    as_of = snapshot_cutoff()
+    results, seconds = _run(snapshot_range, chunk_users, workers, as_of=as_of)
+    click.echo(f'{sum(results):,} balances snapshotted as of {as_of:%Y-%m-%d %H:%M:%S} in {seconds:.1f}s.')
+
+
+@ledger_command.command('rebuild-balances')
+@chunk_users_option
+@workers_option
+def rebuild_balances_command(chunk_users, workers):
+    """Rebuild the loan_balance cache from the ledger, rewriting only rows that differ."""
+    results, seconds = _run(rebuild_range, chunk_users, workers)
+    users = sum(users for users, _ in results)
+    click.echo(f'{sum(rewritten for _, rewritten in results):,} of {users:,} balances rewritten in {seconds:.1f}s '
+               f'({users / seconds if seconds else 0:,.0f} users/s).')
+
+
+@ledger_command.command('balance')
+@click.argument('user_id', type=int)
+@click.option('--at', type=click.DateTime(), help='Point in time to read the balance at. Defaults to now.')
+def balance_command(user_id, at):
+    """Print a borrower's balance from the ledger, optionally at a past time."""
+    total_loan, total_paid = balance_at(user_id, at)
+    click.echo(f'total_loan {total_loan}  total_paid {total_paid}  outstanding {total_loan - total_paid}')
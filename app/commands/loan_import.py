@@ -0,0 +1,29 @@
+import json
+import time
+import click
+from flask.cli import with_appcontext
+from app.schemas import request_loan_import_schema
+from app.utils.loan_import import IMPORT_CHUNK_SIZE, import_loan_requests
+
+
+@click.command('import-loan-requests')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig', lazy=False))
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True, help='Rows validated and inserted per transaction.')
+@click.option('--dry-run', is_flag=True, help='Validate every row without inserting anything.')
+@click.option('--errors', 'errors_file', type=click.File('w'), help='Write the row errors to this file as JSON.')
+@with_appcontext
+def import_loan_requests_command(csv_file, chunk_size, dry_run, errors_file):
+    """Create pending loan requests from a user_id,amount,amortization_rate CSV."""
+    started = time.perf_counter()
+    try:
+        report = import_loan_requests(csv_file, request_loan_import_schema, chunk_size, dry_run)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for error in report['errors'][:10]:
+        click.echo(f"  line {error['line']}: {error['errors']}", err=True)
+    if errors_file:
+        json.dump(report['errors'], errors_file, indent=2)
+    verb = 'would be imported' if dry_run else 'imported'
+    click.echo(f"{report['imported']:,} of {report['processed']:,} rows {verb}, {report['failed']:,} failed "
+               f"in {time.perf_counter() - started:.1f}s.")
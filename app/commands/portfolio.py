@@ -0,0 +1,28 @@
+import time
+import click
+from flask.cli import with_appcontext
+from app.utils.portfolio import verify_portfolio, rebuild_portfolio
+
+
+@click.command('rebuild-portfolio')
+@click.option('--check', is_flag=True, help='Only compare the stored totals with a recompute; exit 1 on drift.')
+@with_appcontext
+def rebuild_portfolio_command(check):
+    """Verify the portfolio summary against a full recompute and rebuild it."""
+    started = time.perf_counter()
+    drift = verify_portfolio()
+    for row in drift[:20]:
+        where = row['day'].isoformat() if row['day'] else 'summary'
+        click.echo(f"  {where:<10} {row['field']:<16} stored {row['stored']} expected {row['expected']}", err=True)
+    if len(drift) > 20:
+        click.echo(f'  ... and {len(drift) - 20} more', err=True)
+
+    if check:
+        click.echo(f'{len(drift)} drifted counters, checked in {time.perf_counter() - started:.1f}s.')
+        if drift:
+            raise click.exceptions.Exit(1)
+        return
+
+    days = rebuild_portfolio()
+    click.echo(f'{len(drift)} drifted counters fixed; summary and {days:,} daily rows rebuilt '
+               f'in {time.perf_counter() - started:.1f}s.')
@@ -0,0 +1,31 @@
+import json
+import time
+import click
+from flask.cli import with_appcontext
+from app.utils.ledger import LEDGER_CHUNK_USERS
+from app.utils.parallel import DEFAULT_WORKERS, user_ranges, map_user_ranges
+from app.utils.reconcile import reconcile_range, reconcile_report
+
+
+@click.command('reconcile-balances')
+@click.option('--repair', is_flag=True, help='Rewrite drifted balances and post ledger corrections.')
+@click.option('--chunk-users', default=LEDGER_CHUNK_USERS, show_default=True, help='Borrower ids per range and transaction.')
+@click.option('--workers', default=DEFAULT_WORKERS, show_default=True, help='Processes checking ranges in parallel.')
+@with_appcontext
+def reconcile_balances_command(repair, chunk_users, workers):
+    """Check every loan_balance against its loans, interest and approved repayments (run nightly).
+
+    Prints a JSON report on stdout and progress on stderr. Without
+    --repair it exits 1 when any balance has drifted.
+    """
+    started = time.perf_counter()
+    ranges = user_ranges(chunk_users)
+    results = []
+    for low, high, result in map_user_ranges(reconcile_range, ranges, workers, repair=repair):
+        results.append(result)
+        click.echo(f"  users {low + 1:,}-{high:,}: {result['drifted']:,} of {result['users']:,} drifted", err=True)
+
+    report = reconcile_report(results, repair, workers, time.perf_counter() - started)
+    click.echo(json.dumps(report, indent=2))
+    if report['drifted'] and not repair:
+        raise click.exceptions.Exit(1)
@@ -0,0 +1,266 @@
+import time
+import click
+import random
+from decimal import Decimal, ROUND_HALF_EVEN
+from datetime import datetime, timedelta
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models import (
+    User, Verification, RequestLoan, Loan, InterestAccrual, LoanBalance, Repayment, LedgerEntry, LedgerEntryKind,
+    AMORTIZATION_SCHEDULES,
+)
+from app.utils.interest import TERM_DAYS
+from app.utils.portfolio import rebuild_portfolio
+
+SEED_PASSWORD = 'password123'
+
+# Seeded tables in foreign key order
+TABLES = (User, Verification, RequestLoan, Loan, InterestAccrual, Repayment, LedgerEntry, LoanBalance)
+
+AMORTIZATION_WEIGHTS = {'MONTHLY': 60, 'WEEKLY': 25, 'YEARLY': 10, 'DAILY': 5}
+AMORTIZATION_DAYS = {rate.value: days for rate, (days, _) in AMORTIZATION_SCHEDULES.items()}
+INSTALMENTS = {rate.value: instalments for rate, (_, instalments) in AMORTIZATION_SCHEDULES.items()}
+
+# Loan requests per user: most borrow once or twice, a few are repeat borrowers
+REQUEST_COUNTS = (0, 1, 2, 3, 4, 5)
+REQUEST_COUNT_WEIGHTS = (10, 40, 25, 13, 8, 4)
+
+
+def _naira(kobo):
+    return Decimal(kobo).scaleb(-2)
+
+
+class Seeder:
+    """Generates consistent rows for a range of users from one random stream.
+
+    Amounts are kept in integer kobo while generating, so that every
+    ``LoanBalance`` matches the loans and approved repayments behind it.
+    """
+
+    def __init__(self, seed, start_ids, now):
+        self.rng = random.Random(seed)
+        self.next_id = dict(start_ids)
+        self.now = now
+        self.password = generate_password_hash(SEED_PASSWORD)
+        self.interest = Decimal(str(RequestLoan.INTEREST_RATE))
+        self.accrual_date = (now - timedelta(days=1)).date()
+
+    def _id(self, table):
+        value = self.next_id[table]
+        self.next_id[table] = value + 1
+        return value
+
+    def _amount(self):
+        # Log-normal around ~100k NGN, rounded to the nearest 100 NGN
+        naira = min(max(self.rng.lognormvariate(11.5, 0.8), 5000), 5000000)
+        return int(round(naira, -2)) * 100
+
+    def users(self, count):
+        rows = {table: [] for table in TABLES}
+        for _ in range(count):
+            self._user(rows)
+        return rows
+
+    def _user(self, rows):
+        rng = self.rng
+        user_id = self._id(User)
+        joined = self.now - timedelta(days=rng.uniform(30, 3 * 365))
+        total_loan = total_paid = 0
+        active_loan = False
+
+        if rng.random() < 0.85:
+            rows[Verification].append({
+                'id': self._id(Verification),
+                'address': f'{rng.randint(1, 300)} Seed Street, Lagos',
+                'is_verified': rng.random() < 0.9,
+                'bvn': f'{rng.randrange(10 ** 10, 10 ** 11)}',
+                'date_verified': joined + timedelta(days=rng.uniform(0, 7)),
+                'user_id': user_id,
+            })
+
+        requests = rng.choices(REQUEST_COUNTS, REQUEST_COUNT_WEIGHTS)[0]
+        requested = joined
+        for index in range(requests):
+            requested += timedelta(days=rng.uniform(1, 180))
+            if requested >= self.now:
+                break
+            amount = self._amount()
+            rate = rng.choices(list(AMORTIZATION_WEIGHTS), list(AMORTIZATION_WEIGHTS.values()))[0]
+            # Only a user's latest request can still be waiting for approval
+            approved = index < requests - 1 or rng.random() < 0.8
+            request_loan_id = self._id(RequestLoan)
+            rows[RequestLoan].append({
+                'id': request_loan_id,
+                'interest_rate': RequestLoan.INTEREST_RATE,
+                'amount': _naira(amount),
+                'approval': approved,
+                'date_requested': requested,
+                'amortization_rate': rate,
+                'user_id': user_id,
+            })
+            if not approved:
+                continue
+
+            start_at = requested + timedelta(days=rng.uniform(0, 3))
+            interest = int(amount * self.interest)
+            paid = self._repayments(rows, user_id, amount + interest, rate, start_at)
+            paid_off = amount + interest - paid <= 10000
+            accrued = interest if paid_off else self._accrued(interest, rate, start_at)
+            loan_id = self._id(Loan)
+            rows[Loan].append({
+                'id': loan_id,
+                'amount': _naira(amount),
+                'paid_off': paid_off,
+                'interest_accrued': _naira(accrued),
+                'user_id': user_id,
+                'start_at': start_at,
+                'request_loan_id': request_loan_id,
+            })
+            self._entry(rows, user_id, LedgerEntryKind.DISBURSEMENT, amount, start_at, loan_id=loan_id)
+            if accrued:
+                # One catch-up posting, as the accrual job makes for the days it missed
+                rows[InterestAccrual].append({
+                    'id': self._id(InterestAccrual),
+                    'loan_id': loan_id,
+                    'user_id': user_id,
+                    'accrual_date': self.accrual_date,
+                    'amount': _naira(accrued),
+                    'created_at': self.now,
+                })
+                self._entry(rows, user_id, LedgerEntryKind.INTEREST, accrued, self.now, loan_id=loan_id)
+            total_loan += amount + accrued
+            total_paid += paid
+            active_loan = active_loan or not paid_off
+
+        rows[User].append({
+            'id': user_id,
+            'full_name': f'Seed User {user_id}',
+            'email': f'user{user_id}@seed.trustlend.test',
+            'password': self.password,
+            'is_active': rng.random() < 0.97,
+            'is_admin': False,
+            'active_loan': active_loan,
+            'phone_number': f'080{rng.randrange(10 ** 8, 10 ** 9)}',
+            'date_joined': joined,
+        })
+        rows[LoanBalance].append({
+            'id': self._id(LoanBalance),
+            'total_loan': _naira(total_loan),
+            'total_paid': _naira(total_paid),
+            'user_id': user_id,
+            'last_updated': self.now,
+        })
+
+    def _entry(self, rows, user_id, kind, kobo, created_at, loan_id=None, repayment_id=None):
+        rows[LedgerEntry].append({
+            'id': self._id(LedgerEntry),
+            'user_id': user_id,
+            'kind': kind,
+            'amount': _naira(kobo),
+            'loan_id': loan_id,
+            'repayment_id': repayment_id,
+            'note': None,
+            'created_at': created_at,
+        })
+
+    def _accrued(self, interest, rate, start_at):
+        """Interest in kobo the accrual job has posted on an open loan by yesterday."""
+        days = min(max((self.accrual_date - start_at.date()).days + 1, 0), TERM_DAYS[rate])
+        return int((Decimal(interest * days) / TERM_DAYS[rate]).quantize(Decimal(1), ROUND_HALF_EVEN))
+
+    def _repayments(self, rows, user_id, owed, rate, start_at):
+        """Instalments made so far on one loan; returns the approved total in kobo."""
+        rng = self.rng
+        period = timedelta(days=AMORTIZATION_DAYS[rate])
+        instalments = INSTALMENTS[rate]
+        # A loan can start up to three days after its request, so possibly after now
+        due = min(max(int((self.now - start_at) / period), 0), instalments)
+        # Some borrowers fall behind, a few stop paying altogether
+        made = due if rng.random() < 0.75 else rng.randint(0, due)
+        per_instalment = owed // instalments
+
+        paid = 0
+        for number in range(1, made + 1):
+            amount = owed - per_instalment * (instalments - 1) if number == instalments else per_instalment
+            approved = rng.random() < 0.97
+            repayment = {
+                'id': self._id(Repayment),
+                'repay_amount': _naira(amount),
+                'is_approved': approved,
+                'paid_at': start_at + period * number - timedelta(days=rng.uniform(0, 2)),
+                'user_id': user_id,
+            }
+            rows[Repayment].append(repayment)
+            if approved:
+                paid += amount
+                self._entry(rows, user_id, LedgerEntryKind.REPAYMENT, amount, repayment['paid_at'], repayment_id=repayment['id'])
+        return paid
+
+
+def _start_ids(connection):
+    return {
+        model: (connection.execute(select(func.max(model.__table__.c.id))).scalar() or 0) + 1
+        for model in TABLES
+    }
+
+
+def _advance_sequences(connection):
+    """Move PostgreSQL's id sequences past the explicit ids the seed inserted."""
+    if connection.dialect.name != 'postgresql':
+        return
+    quote = connection.dialect.identifier_preparer.format_table
+    for model in TABLES:
+        table = model.__table__
+        connection.execute(select(func.setval(
+            func.pg_get_serial_sequence(quote(table), 'id'), select(func.max(table.c.id)).scalar_subquery(),
+        )))
+
+
+@click.command('seed')
+@click.option('--users', default=10000, show_default=True, help='Number of users to generate.')
+@click.option('--seed', 'seed_value', default=0, show_default=True,
+              help='Random seed; the same seed and --now give the same data.')
+@click.option('--now', type=click.DateTime(), default=None,
+              help='Time the data is generated relative to, default the current time.')
+@click.option('--chunk-size', default=5000, show_default=True, help='Users generated and inserted per transaction.')
+@click.option('--reset', is_flag=True, help='Drop and recreate all tables first.')
+@with_appcontext
+def seed_command(users, seed_value, now, chunk_size, reset):
+    """Bulk-load synthetic users, loans and repayments."""
+    if reset:
+        db.drop_all()
+        db.create_all()
+
+    with db.engine.connect() as connection:
+        seeder = Seeder(seed_value, _start_ids(connection), (now or datetime.now()).replace(microsecond=0))
+    statements = {model: insert(model.__table__) for model in TABLES}
+    totals = dict.fromkeys(TABLES, 0)
+    started = time.perf_counter()
+
+    done = 0
+    while done < users:
+        count = min(chunk_size, users - done)
+        rows = seeder.users(count)
+        with db.engine.begin() as connection:
+            for model in TABLES:
+                if rows[model]:
+                    connection.execute(statements[model], rows[model])
+                    totals[model] += len(rows[model])
+        done += count
+
+        elapsed = time.perf_counter() - started
+        loaded = sum(totals.values())
+        click.echo(f'{done}/{users} users, {loaded} rows, {loaded / elapsed:,.0f} rows/s')
+
+    with db.engine.begin() as connection:
+        _advance_sequences(connection)
+    # Rows were inserted around the write paths, so recount the portfolio totals
+    rebuild_portfolio()
+
+    elapsed = time.perf_counter() - started
+    for model in TABLES:
+        click.echo(f'  {model.__tablename__:<14} {totals[model]:>12,}')
+    click.echo(f'Loaded {sum(totals.values()):,} rows in {elapsed:.1f}s. '
+               f"Every seeded user's password is {SEED_PASSWORD!r}.")
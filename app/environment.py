@@ -1,5 +1,56 @@
 import os
 
+
+def database_url(default):
+    """Read the database URL from ``DATABASE_URL``, falling back to ``default``."""
+    url = os.environ.get('DATABASE_URL') or default
+    # Render and Heroku hand out postgres:// which SQLAlchemy no longer accepts
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for ``url``.
+
+    Pool sizes default to what one gunicorn worker can actually use: a sync
+    worker serves one request at a time, gthread workers one per thread and
+    gevent/eventlet workers many concurrent greenlets. Every value can be
+    overridden with a ``DB_*`` environment variable.
+    """
+    if url.startswith('sqlite'):
+        return {}
+
+    worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+    threads = int(os.environ.get('GUNICORN_THREADS', 1))
+    if worker_class in ('gevent', 'eventlet'):
+        pool_size, max_overflow = 20, 10
+    else:
+        pool_size, max_overflow = max(threads, 2), 2
+
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', max_overflow)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+
+    statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    if url.startswith('postgresql') and statement_timeout:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+
+def replica_binds():
+    """SQLALCHEMY_BINDS entry for the read replica named by ``DATABASE_REPLICA_URL``."""
+    url = os.environ.get('DATABASE_REPLICA_URL')
+    if not url:
+        return {}
+    url = url.replace('postgres://', 'postgresql://', 1)
+    return {'replica': {'url': url, **engine_options(url)}}
+
+
 class Environment:
     SECRET_KEY = os.environ.get('SECRET_KEY')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -7,9 +58,73 @@ class Environment:
     PAYSTACK_SK = os.environ.get('PAYSTACK_SEC_KEY')
     PAYSTACK_PK = os.environ.get('PAYSTACK_PUB_KEY')
 
+    # Response compression (gzip/brotli), see app/utils/compression.py
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))
+    COMPRESS_MIMETYPES = [
+        'application/json', 'application/x-ndjson', 'text/csv', 'text/html',
+        'text/css', 'text/plain', 'application/javascript',
+    ]
+
+    # SQLite tuning for single-node deployments, applied on every connection
+    SQLITE_TUNED = os.environ.get('SQLITE_TUNED', 'true').lower() == 'true'
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': -64000,           # negative means KiB, so ~64MB
+        'mmap_size': 268435456,         # 256MB
+    }
+    SQLITE_LOCK_RETRIES = int(os.environ.get('SQLITE_LOCK_RETRIES', 5))
+    SQLITE_LOCK_BACKOFF = float(os.environ.get('SQLITE_LOCK_BACKOFF', 0.05))
+
+    # Read replica routing, see app/session.py
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+    REPLICA_EXCLUDED_TABLES = ['tokenblacklists']
+
+    # Per-request query counts, Server-Timing headers and the slow query log
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'false').lower() == 'true'
+    SQL_TIMING_HEADERS = os.environ.get('SQL_TIMING_HEADERS', 'false').lower() == 'true'
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+
+    # Prometheus /metrics, behind a bearer token when METRICS_TOKEN is set
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_REQUIRE_TOKEN = False
+
+    # Admin request profiler, state is kept per worker
+    PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', 0))
+    PROFILER_BUFFER_SIZE = int(os.environ.get('PROFILER_BUFFER_SIZE', 50))
+    PROFILER_TOP = 30
+    PROFILER_TOKEN_MAX_AGE = 3600
+    TRACEMALLOC_FRAMES = 1
+
+    # Mount the Flask-Admin panel at /admin; turn off for API-only workers
+    ADMIN_ENABLED = os.environ.get('ADMIN_ENABLED', 'true').lower() == 'true'
+    # Serve the swagger UI at / and the spec at /swagger.json
+    SWAGGER_ENABLED = os.environ.get('SWAGGER_ENABLED', 'true').lower() == 'true'
+    # Run db.create_all() in create_app instead of relying on migrations
+    AUTO_CREATE_SCHEMA = os.environ.get('AUTO_CREATE_SCHEMA', 'false').lower() == 'true'
+
+    # Worker warm-up before serving traffic, run from gunicorn's post_worker_init
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'false').lower() == 'true'
+    WARMUP_CONNECTIONS = int(os.environ.get('WARMUP_CONNECTIONS', 2))
+
+    # Balance snapshots only cover ledger entries older than this, see app/utils/ledger.py
+    LEDGER_SNAPSHOT_LAG_SECONDS = int(os.environ.get('LEDGER_SNAPSHOT_LAG_SECONDS', 60))
+
+    # Parquet analytics snapshots, see app/utils/snapshot.py
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+    SNAPSHOT_LAG_SECONDS = int(os.environ.get('SNAPSHOT_LAG_SECONDS', 60))
+
 
 class DevelopmentEnvironment(Environment):
     DEBUG = True
+    SQL_INSTRUMENTATION = True
+    SQL_TIMING_HEADERS = True
+    AUTO_CREATE_SCHEMA = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///dev.db'
 
 
@@ -19,5 +134,8 @@ class TestingEnvironment(Environment):
 
 
 class ProductionEnvironment(Environment):
-    # SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///prod.db'
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = database_url('sqlite:///prod.db')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_BINDS = replica_binds()
+    # /metrics is only registered with a METRICS_TOKEN set
+    METRICS_REQUIRE_TOKEN = True
\ No newline at end of file
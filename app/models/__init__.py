@@ -1,4 +1,7 @@
 from .user import User, TokenBlacklist
-from .loan import Loan, RequestLoan, AmortizationRateEnum, LoanBalance
+from .loan import Loan, RequestLoan, AmortizationRateEnum, AMORTIZATION_SCHEDULES, LoanBalance, LoanDelinquency
 from .verification import Verification
-from .repayment import Repayment
\ No newline at end of file
+from .repayment import Repayment
+from .portfolio import PortfolioSummary, PortfolioDaily, RATE_COLUMNS
+from .accrual import InterestAccrual, InterestAccrualRun
+from .ledger import LedgerEntry, LedgerEntryKind, LOAN_KINDS, BalanceSnapshot
\ No newline at end of file
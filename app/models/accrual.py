@@ -0,0 +1,38 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class InterestAccrual(db.Model):
+    """Interest posted to a loan by the accrual job, append-only."""
+    __tablename__ = 'interest_accruals'
+
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loans.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    accrual_date = db.Column(db.Date, nullable=False)
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        # A loan is accrued at most once per date
+        db.UniqueConstraint('loan_id', 'accrual_date', name='uq_interest_accruals_loan_date'),
+        db.Index('ix_interest_accruals_date_user', 'accrual_date', 'user_id'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<InterestAccrual loan_id={self.loan_id} {self.accrual_date} amount={self.amount}>"
+
+
+class InterestAccrualRun(db.Model):
+    """Progress of the accrual job for one date, claimed range by range."""
+    __tablename__ = 'interest_accrual_runs'
+
+    accrual_date = db.Column(db.Date, primary_key=True)
+    last_user_id = db.Column(db.Integer, nullable=False, default=0)
+    loans = db.Column(db.Integer, nullable=False, default=0)
+    interest = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self) -> str:
+        return f"<InterestAccrualRun {self.accrual_date} loans={self.loans} finished_at={self.finished_at}>"
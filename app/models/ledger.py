@@ -0,0 +1,50 @@
+from app.extensions import db
+from datetime import datetime
+from enum import Enum
+
+
+class LedgerEntryKind(Enum):
+    DISBURSEMENT = 'DISBURSEMENT'
+    INTEREST = 'INTEREST'
+    REPAYMENT = 'REPAYMENT'
+    ADJUSTMENT = 'ADJUSTMENT'
+
+# Kinds that add to a borrower's total_loan; repayments add to total_paid
+LOAN_KINDS = (LedgerEntryKind.DISBURSEMENT, LedgerEntryKind.INTEREST, LedgerEntryKind.ADJUSTMENT)
+
+
+class LedgerEntry(db.Model):
+    """Every change to a borrower's balance, append-only; loan_balance is derived from it."""
+    __tablename__ = 'ledger_entries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    kind = db.Column(db.Enum(LedgerEntryKind), nullable=False)
+    amount = db.Column(db.Numeric(12, 2), nullable=False)     # adjustments may be negative
+    loan_id = db.Column(db.Integer, db.ForeignKey('loans.id'))
+    repayment_id = db.Column(db.Integer, db.ForeignKey('repayments.id'))
+    note = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        # Balance-at-time reads one borrower's tail after a snapshot
+        db.Index('ix_ledger_entries_user_created', 'user_id', 'created_at'),
+        # A repayment is posted once; entries without one (NULL) are not constrained
+        db.UniqueConstraint('repayment_id', 'kind', name='uq_ledger_entries_repayment_kind'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<LedgerEntry user_id={self.user_id} {self.kind.value} amount={self.amount}>"
+
+
+class BalanceSnapshot(db.Model):
+    """A borrower's ledger totals up to ``as_of``, so balance reads only sum the entries after it."""
+    __tablename__ = 'balance_snapshots'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    as_of = db.Column(db.DateTime, primary_key=True)
+    total_loan = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    total_paid = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<BalanceSnapshot user_id={self.user_id} as_of={self.as_of} total_loan={self.total_loan}>"
@@ -8,6 +8,14 @@ class AmortizationRateEnum(Enum):
     MONTHLY = 'MONTHLY'
     YEARLY = 'YEARLY'
 
+# Repayment schedule per amortization rate: days between instalments and number of instalments
+AMORTIZATION_SCHEDULES = {
+    AmortizationRateEnum.DAILY: (1, 30),
+    AmortizationRateEnum.WEEKLY: (7, 12),
+    AmortizationRateEnum.MONTHLY: (30, 6),
+    AmortizationRateEnum.YEARLY: (365, 2),
+}
+
 class RequestLoan(db.Model):
     __tablename__ = 'requestloans'
 
@@ -17,9 +25,19 @@ class RequestLoan(db.Model):
     interest_rate = db.Column(db.Float, nullable=False)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     approval = db.Column(db.Boolean(), default=False)
-    date_requested = db.Column(db.DateTime(), default=datetime.now())
+    # Not null: the review queue pages on (date_requested, id)
+    date_requested = db.Column(db.DateTime(), default=datetime.now, nullable=False)
     amortization_rate = db.Column(db.Enum(AmortizationRateEnum), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime(), default=datetime.now, onupdate=datetime.now, index=True)
+
+    __table_args__ = (
+        # Pending requests oldest first, for the admin review queue
+        db.Index(
+            'ix_requestloans_pending', 'date_requested', 'id',
+            postgresql_where=approval.is_(False), sqlite_where=approval.is_(False),
+        ),
+    )
 
     def __repr__(self) -> str:
         return f"Requesting User>> {self.approval}"
@@ -31,9 +49,12 @@ class Loan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     paid_off = db.Column(db.Boolean, default=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    start_at = db.Column(db.DateTime(), default=datetime.now())
+    # Interest charged so far, posted daily by the accrual job
+    interest_accrued = db.Column(db.Numeric(12, 2), nullable=False, default=0, server_default='0')
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    start_at = db.Column(db.DateTime(), default=datetime.now, index=True)
     request_loan_id = db.Column(db.Integer, db.ForeignKey('requestloans.id'), nullable=False)
+    updated_at = db.Column(db.DateTime(), default=datetime.now, onupdate=datetime.now, index=True)
 
     # Define a relationship to the User model
     user = db.relationship('User', back_populates='loans', lazy=True)
@@ -50,9 +71,26 @@ class LoanBalance(db.Model):
     total_loan = db.Column(db.Numeric(10, 2), default=0.00)
     total_paid = db.Column(db.Numeric(10, 2), default=0.00)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, nullable=False)
-    last_updated = db.Column(db.DateTime(), default=datetime.now(), onupdate=datetime.now())
+    last_updated = db.Column(db.DateTime(), default=datetime.now, onupdate=datetime.now, index=True)
 
     user = db.relationship('User', back_populates='loan_balance', uselist=False)
         
     def __repr__(self) -> str:
         return f"<LoanBalance id={self.id} user_id={self.user_id} total_loan={self.total_loan} loan_paid={self.total_paid}>"
+
+
+class LoanDelinquency(db.Model):
+    """Days past due of each open loan, rewritten by the nightly delinquency job."""
+    __tablename__ = 'loan_delinquency'
+
+    loan_id = db.Column(db.Integer, db.ForeignKey('loans.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    days_past_due = db.Column(db.Integer, nullable=False, default=0)
+    par_bucket = db.Column(db.SmallInteger, nullable=False, default=0, index=True)    # 0, 1, 7, 30 or 90
+    arrears = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    outstanding = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    as_of = db.Column(db.Date, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self) -> str:
+        return f"<LoanDelinquency loan_id={self.loan_id} days_past_due={self.days_past_due}>"
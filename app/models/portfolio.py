@@ -0,0 +1,44 @@
+from app.extensions import db
+from datetime import datetime
+from .loan import AmortizationRateEnum
+
+# Loans per amortization rate are kept in one summary column each
+RATE_COLUMNS = {rate: f'{rate.value.lower()}_loans' for rate in AmortizationRateEnum}
+
+
+class PortfolioSummary(db.Model):
+    """Running portfolio totals, a single row kept current by the write paths."""
+    __tablename__ = 'portfolio_summary'
+
+    id = db.Column(db.Integer, primary_key=True)
+    loan_count = db.Column(db.Integer, nullable=False, default=0)
+    principal = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    interest = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    open_loan_count = db.Column(db.Integer, nullable=False, default=0)
+    open_principal = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    repayment_count = db.Column(db.Integer, nullable=False, default=0)
+    collected = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    active_borrowers = db.Column(db.Integer, nullable=False, default=0)
+    daily_loans = db.Column(db.Integer, nullable=False, default=0)
+    weekly_loans = db.Column(db.Integer, nullable=False, default=0)
+    monthly_loans = db.Column(db.Integer, nullable=False, default=0)
+    yearly_loans = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self) -> str:
+        return f"<PortfolioSummary loans={self.loan_count} principal={self.principal}>"
+
+
+class PortfolioDaily(db.Model):
+    """Loans disbursed and repayments collected per calendar day."""
+    __tablename__ = 'portfolio_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    loan_count = db.Column(db.Integer, nullable=False, default=0)
+    principal = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    interest = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    repayment_count = db.Column(db.Integer, nullable=False, default=0)
+    collected = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<PortfolioDaily {self.day} loans={self.loan_count} collected={self.collected}>"
@@ -10,8 +10,9 @@ class Repayment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     repay_amount = db.Column(db.Numeric(10, 2))
     is_approved = db.Column(db.Boolean, default=False)
-    paid_at = db.Column(db.DateTime, default=datetime.now())
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    paid_at = db.Column(db.DateTime, default=datetime.now, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, index=True)
 
     user = db.relationship('User', backref=db.backref('repayments', lazy=True))
     
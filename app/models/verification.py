@@ -7,13 +7,22 @@ class Verification(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     address = db.Column(db.String(300), nullable=False)
-    is_verified = db.Column(db.Boolean, default=False)
+    # Not null: the review queue filters on is_verified and pages on (date_verified, id)
+    is_verified = db.Column(db.Boolean, default=False, nullable=False)
     bvn = db.Column(db.String(11), nullable=False)
-    date_verified = db.Column(db.DateTime, default=datetime.now())
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date_verified = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     
     # relationship
     user = db.relationship('User', backref=db.backref('verifications', lazy=True))
 
+    __table_args__ = (
+        # Unverified users oldest first, for the admin review queue
+        db.Index(
+            'ix_verifications_pending', 'date_verified', 'id',
+            postgresql_where=is_verified.is_(False), sqlite_where=is_verified.is_(False),
+        ),
+    )
+
     def __repr__(self) -> str:
         return f'User>>> {self.user.email}'
\ No newline at end of file
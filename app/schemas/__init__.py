@@ -1,4 +1,10 @@
 from .user_schema import user_register_schema, user_login_schema, user_update_schema
-from .verification_schema import verification_schema
-from .loan_schema import request_loan_schema, loan_schema, edit_request_loan_schema, loan_balance_schema
-from .repayment_schema import repayment_schema, RepaymentSchema
\ No newline at end of file
+from .verification_schema import verification_schema, bulk_verify_schema, verification_queue_query_schema
+from .loan_schema import (
+    request_loan_schema, loan_schema, edit_request_loan_schema, loan_balance_schema, request_loan_import_schema,
+    approve_batch_schema, pending_request_loan_query_schema, balance_at_query_schema,
+)
+from .repayment_schema import repayment_schema, RepaymentSchema
+from .system_schema import profiler_settings_schema
+from .export_schema import export_query_schema
+from .portfolio_schema import portfolio_summary_schema, portfolio_daily_schema, portfolio_query_schema
\ No newline at end of file
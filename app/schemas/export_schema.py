@@ -0,0 +1,15 @@
+from marshmallow import validate, fields, validates_schema, ValidationError
+from app.extensions import ma
+from app.utils.export import EXPORT_FORMATS
+
+class ExportQuerySchema(ma.Schema):
+    format = fields.String(load_default='csv', validate=validate.OneOf(list(EXPORT_FORMATS)))
+    start = fields.Date(data_key='from', load_default=None)
+    end = fields.Date(data_key='to', load_default=None)
+
+    @validates_schema
+    def validate_range(self, data, **kwargs):
+        if data.get('start') and data.get('end') and data['start'] > data['end']:
+            raise ValidationError('"from" must not be after "to".', 'from')
+
+export_query_schema = ExportQuerySchema()
@@ -1,6 +1,7 @@
-from marshmallow import validate, fields
+from marshmallow import validate, fields, EXCLUDE
 from app.models import Loan, RequestLoan, LoanBalance, AmortizationRateEnum
 from app.extensions import ma
+from .pagination_schema import KeysetQuerySchema
 
 class RequestLoanSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -52,4 +53,31 @@ class LoanBalanceSchema(ma.SQLAlchemySchema):
     total_paid = fields.Decimal(dump_only=True, places=2)
     last_updated = fields.DateTime(dump_only=True)
 
-loan_balance_schema = LoanBalanceSchema()
\ No newline at end of file
+loan_balance_schema = LoanBalanceSchema()
+
+
+class BalanceAtQuerySchema(ma.Schema):
+    at = fields.DateTime(required=True)
+
+balance_at_query_schema = BalanceAtQuerySchema()
+
+
+class ApproveBatchSchema(ma.Schema):
+    ids = fields.List(
+        fields.Integer(validate=validate.Range(min=1)), required=True, validate=validate.Length(min=1, max=5000)
+    )
+
+approve_batch_schema = ApproveBatchSchema()
+
+
+class PendingRequestLoanQuerySchema(KeysetQuerySchema):
+    min_amount = fields.Decimal(places=2, validate=validate.Range(min=0))
+    max_amount = fields.Decimal(places=2, validate=validate.Range(min=0))
+    amortization_rate = fields.String(validate=validate.OneOf([e.value for e in AmortizationRateEnum]))
+
+pending_request_loan_query_schema = PendingRequestLoanQuerySchema()
+
+# Single-pass validation of bulk imported rows, loading plain dicts for Core inserts
+request_loan_import_schema = RequestLoanSchema(
+    load_instance=False, only=('user_id', 'amount', 'amortization_rate'), unknown=EXCLUDE
+)
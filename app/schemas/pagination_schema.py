@@ -0,0 +1,16 @@
+from marshmallow import fields, validate, ValidationError
+from app.extensions import ma
+from app.utils.pagination import decode_cursor
+
+class KeysetCursor(fields.String):
+    """Opaque ``after`` cursor, loaded as the ``(datetime, id)`` it encodes."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            return decode_cursor(super()._deserialize(value, attr, data, **kwargs))
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+class KeysetQuerySchema(ma.Schema):
+    after = KeysetCursor(load_default=None)
+    limit = fields.Integer(load_default=50, validate=validate.Range(min=1, max=200))
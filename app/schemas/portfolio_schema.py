@@ -0,0 +1,33 @@
+from marshmallow import validate, fields
+from app.extensions import ma
+from app.models import PortfolioSummary, PortfolioDaily
+
+
+class PortfolioSummarySchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = PortfolioSummary
+        exclude = ('id',)
+
+    principal = fields.Decimal(places=2, as_string=True)
+    interest = fields.Decimal(places=2, as_string=True)
+    open_principal = fields.Decimal(places=2, as_string=True)
+    collected = fields.Decimal(places=2, as_string=True)
+
+portfolio_summary_schema = PortfolioSummarySchema()
+
+
+class PortfolioDailySchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = PortfolioDaily
+
+    principal = fields.Decimal(places=2, as_string=True)
+    interest = fields.Decimal(places=2, as_string=True)
+    collected = fields.Decimal(places=2, as_string=True)
+
+portfolio_daily_schema = PortfolioDailySchema(many=True)
+
+
+class PortfolioQuerySchema(ma.Schema):
+    days = fields.Integer(load_default=30, validate=validate.Range(min=0, max=366))
+
+portfolio_query_schema = PortfolioQuerySchema()
@@ -0,0 +1,7 @@
+from marshmallow import validate, fields
+from app.extensions import ma
+
+class ProfilerSettingsSchema(ma.Schema):
+    sample_rate = fields.Float(required=True, validate=validate.Range(min=0, max=1))
+
+profiler_settings_schema = ProfilerSettingsSchema()
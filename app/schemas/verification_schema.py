@@ -1,5 +1,6 @@
 from marshmallow import fields, validate, validates, ValidationError
 from app.extensions import ma, db
+from .pagination_schema import KeysetQuerySchema
 from app.models import Verification, User
 
 class VerificationSchema(ma.SQLAlchemyAutoSchema):
@@ -20,3 +21,12 @@ class VerificationSchema(ma.SQLAlchemyAutoSchema):
         if user is None:
             raise ValidationError('Invalid user_id. User does not exist.')
 verification_schema = VerificationSchema()
+
+
+class BulkVerifySchema(ma.Schema):
+    user_ids = fields.List(
+        fields.Integer(validate=validate.Range(min=1)), required=True, validate=validate.Length(min=1, max=5000)
+    )
+
+bulk_verify_schema = BulkVerifySchema()
+verification_queue_query_schema = KeysetQuerySchema()
\ No newline at end of file
@@ -0,0 +1,114 @@
+import time
+from functools import wraps
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt
+from flask_sqlalchemy.session import Session
+from sqlalchemy import inspect
+from sqlalchemy.sql.expression import UpdateBase
+
+REPLICA_BIND = 'replica'
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+READ_YOUR_WRITES_COOKIE = 'tl_read_primary'
+
+# Statements routed to each side, for the system status endpoint
+routing_counts = Counter()
+
+# JWT identity -> time until which that user's reads stay on the primary.
+# Per worker; the cookie covers requests that land on another worker.
+_recent_writers = {}
+
+
+def _identity():
+    try:
+        return get_jwt().get('sub')
+    except RuntimeError:    # no verified JWT in this request (yet)
+        return None
+
+
+def _mark_write():
+    if has_request_context():
+        g.db_wrote = True
+
+
+def _reads_from_primary():
+    if request.method not in READ_METHODS:
+        return True
+    if g.get('db_wrote') or g.get('db_use_primary'):
+        return True
+    if READ_YOUR_WRITES_COOKIE in request.cookies:
+        return True
+    identity = _identity()
+    return identity is not None and _recent_writers.get(identity, 0) > time.monotonic()
+
+
+class RoutingSession(Session):
+    """Session that sends the reads of safe, write-free requests to a replica.
+
+    Replica routing only applies inside a request when a ``replica`` bind is
+    configured. Flushes, Core DML, tables listed in REPLICA_EXCLUDED_TABLES
+    and requests marked with :func:`use_primary` always use the primary, and
+    so does everything else in a request once it has written.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(mapper, clause):
+            routing_counts['replica'] += 1
+            return self._db.engines[REPLICA_BIND]
+        routing_counts['primary'] += 1
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            _mark_write()
+        super().flush(objects)
+
+    def _use_replica(self, mapper, clause):
+        if REPLICA_BIND not in self._db.engines or not has_request_context():
+            return False
+        if self._flushing or isinstance(clause, UpdateBase):
+            _mark_write()
+            return False
+        if mapper is not None:
+            excluded = current_app.config['REPLICA_EXCLUDED_TABLES']
+            if inspect(mapper).local_table.name in excluded:
+                return False
+        return not _reads_from_primary()
+
+
+def use_primary(fn):
+    """Send every statement of the decorated view to the primary."""
+    @wraps(fn)
+    def decorated_function(*args, **kwargs):
+        g.db_use_primary = True
+        return fn(*args, **kwargs)
+    return decorated_function
+
+
+def _reset_routing():
+    g.db_wrote = False
+    g.db_use_primary = False
+
+
+def _remember_writes(response):
+    if not g.get('db_wrote'):
+        return response
+
+    window = current_app.config['READ_YOUR_WRITES_SECONDS']
+    response.set_cookie(READ_YOUR_WRITES_COOKIE, '1', max_age=window, httponly=True, samesite='Lax')
+
+    identity = _identity()
+    if identity is not None:
+        now = time.monotonic()
+        if len(_recent_writers) > 10000:
+            for key, until in list(_recent_writers.items()):
+                if until <= now:
+                    _recent_writers.pop(key, None)
+        _recent_writers[identity] = now + window
+    return response
+
+
+def init_read_routing(app):
+    if REPLICA_BIND in app.config.get('SQLALCHEMY_BINDS', {}):
+        app.before_request(_reset_routing)
+        app.after_request(_remember_writes)
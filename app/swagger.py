@@ -1,5 +1,10 @@
-from flask import Blueprint, jsonify
+import json
+import hashlib
+from functools import lru_cache
+from flask import Blueprint, current_app, request
 from flask_swagger_ui import get_swaggerui_blueprint
+from app.utils.compression import compress, negotiate_encoding, brotli
+from app.utils.metrics import observe_lru
 
 SWAGGER_URL = ''
 API_URL = '/swagger.json'
@@ -14,9 +19,55 @@ swagger_ui_blueprint = get_swaggerui_blueprint(
 
 swagger_blueprint = Blueprint('swagger', __name__)
 
+
 @swagger_blueprint.route(API_URL)
 def swagger_spec():
-    return jsonify({
+    """Serve the pre-encoded spec, honouring If-None-Match and Accept-Encoding."""
+    etag, variants = observe_lru('swagger', encoded_swagger_spec)
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding not in variants or not current_app.config['COMPRESS_ENABLED']:
+        encoding = None
+    tag = etag if encoding is None else f'{etag}-{encoding}'
+
+    response = current_app.response_class(mimetype='application/json')
+    response.set_etag(tag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+
+    if request.if_none_match.contains_weak(tag):
+        response.status_code = 304
+        return response
+
+    response.set_data(variants[encoding])
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@lru_cache(maxsize=None)
+def encoded_swagger_spec():
+    """Serialize the spec once and pre-compress it for every supported encoding.
+
+    Returns the strong ETag of the JSON body and a dict mapping content coding
+    (``None`` for identity) to the encoded bytes.
+    """
+    body = json.dumps(build_swagger_spec(), sort_keys=True, separators=(',', ':')).encode()
+    etag = hashlib.sha256(body).hexdigest()
+
+    # Built once per worker, so spend the CPU on the smallest output
+    variants = {
+        None: body,
+        'gzip': compress(body, 'gzip', {'COMPRESS_LEVEL': 9}),
+    }
+    if brotli is not None:
+        variants['br'] = compress(body, 'br', {'COMPRESS_BR_LEVEL': 11})
+    return etag, variants
+
+
+def build_swagger_spec():
+    return {
         "swagger": "2.0",
         "info": {
             "title": "TrustLend API",
@@ -174,6 +225,12 @@ def swagger_spec():
                         "required": True,
                         "type": "string",
                         "description": "Bearer <JWT>"
+                    },{
+                        "name": "fields",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Comma separated fields to return, e.g. user.email,loan.total_loan. Sub-resources not listed are skipped"
                     }],
                     "responses": {
                         "200": {
@@ -374,6 +431,68 @@ def swagger_spec():
                 },
             },
              # Loan endpoints
+            "/api/v1/verification/queue": {
+                "get": {
+                    "tags": ["Verification"],
+                    "summary": "Verification Queue",
+                    "description": "Lists unverified users oldest first. Pass the returned 'next' cursor as 'after' for the following page. Admin only",
+                    "parameters": [{
+                        "name": "Authorization",
+                        "in": "header",
+                        "required": True,
+                        "type": "string",
+                        "description": "Bearer <JWT>"
+                    },{
+                        "name": "after",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Cursor from the previous page"
+                    },{
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "type": "integer",
+                        "description": "Page size, 1 to 200, 50 by default"
+                    }],
+                    "responses": {
+                        "200": {
+                            "description": "Verification queue retrieved!",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                    }
+                },
+                "patch": {
+                    "tags": ["Verification"],
+                    "summary": "Verify Users",
+                    "description": "Verifies up to 5000 users at once and returns verified, already_verified or not_requested for each user id. Admin only",
+                    "parameters": [{
+                        "name": "Authorization",
+                        "in": "header",
+                        "required": True,
+                        "type": "string",
+                        "description": "Bearer <JWT>"
+                    },{
+                        "name": "body",
+                        "in": "body",
+                        "required": True,
+                        "schema": {"$ref": "#/definitions/BulkVerify"}
+                    }],
+                    "responses": {
+                        "200": {
+                            "description": "Outcome per user id",
+                        },
+                        "400": {
+                            "description": "Validation error with request data",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                    }
+                },
+            },
             "/api/v1/loan/request/{request_loan_id}": {
                 "get": {
                     "tags": ["RequestLoan"],
@@ -390,7 +509,12 @@ def swagger_spec():
                             "in": "header",
                             "required": True,
                             "type": "string",
-                            "description": "Bearer <JWT>"}
+                            "description": "Bearer <JWT>"},{
+                            "name": "fields",
+                            "in": "query",
+                            "required": False,
+                            "type": "string",
+                            "description": "Comma separated fields to return, e.g. amount,approval"}
                     ],
                     "responses": {
                         "200": {
@@ -479,6 +603,127 @@ def swagger_spec():
                     }
                 },
             },
+            "/api/v1/loan/request/import": {
+                "post": {
+                    "tags": ["Loan"],
+                    "summary": "Import Loan Requests",
+                    "description": "Creates pending loan requests from a CSV with user_id, amount and amortization_rate columns, sent as the 'file' form field or as a text/csv body. Valid rows are imported and the others reported by line. Admin only",
+                    "consumes": ["multipart/form-data", "text/csv"],
+                    "parameters": [{
+                        "name": "Authorization",
+                        "in": "header",
+                        "required": True,
+                        "type": "string",
+                        "description": "Bearer <JWT>"
+                    },{
+                        "name": "file",
+                        "in": "formData",
+                        "required": False,
+                        "type": "file",
+                        "description": "CSV of loan requests"
+                    },{
+                        "name": "dry_run",
+                        "in": "query",
+                        "required": False,
+                        "type": "boolean",
+                        "description": "Validate without importing"
+                    }],
+                    "responses": {
+                        "200": {
+                            "description": "Import report with per-row errors",
+                        },
+                        "400": {
+                            "description": "No CSV provided or missing columns",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                    }
+                },
+            },
+            "/api/v1/loan/request/approve-batch": {
+                "post": {
+                    "tags": ["Loan"],
+                    "summary": "Approve Loan Requests",
+                    "description": "Approves up to 5000 loan requests in one transaction and returns the outcome of each id: approved (with loan_id), already_approved or not_found. Admin only",
+                    "parameters": [{
+                        "name": "Authorization",
+                        "in": "header",
+                        "required": True,
+                        "type": "string",
+                        "description": "Bearer <JWT>"
+                    },{
+                        "name": "body",
+                        "in": "body",
+                        "required": True,
+                        "schema": {"$ref": "#/definitions/ApproveBatch"}
+                    }],
+                    "responses": {
+                        "200": {
+                            "description": "Outcome per loan request id",
+                        },
+                        "400": {
+                            "description": "Validation error with request data",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                    }
+                },
+            },
+            "/api/v1/loan/request/pending": {
+                "get": {
+                    "tags": ["Loan"],
+                    "summary": "Pending Loan Requests",
+                    "description": "Lists pending loan requests oldest first with the requesting user and their verification status. Pass the returned 'next' cursor as 'after' for the following page. Admin only",
+                    "parameters": [{
+                        "name": "Authorization",
+                        "in": "header",
+                        "required": True,
+                        "type": "string",
+                        "description": "Bearer <JWT>"
+                    },{
+                        "name": "after",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Cursor from the previous page"
+                    },{
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "type": "integer",
+                        "description": "Page size, 1 to 200, 50 by default"
+                    },{
+                        "name": "min_amount",
+                        "in": "query",
+                        "required": False,
+                        "type": "number"
+                    },{
+                        "name": "max_amount",
+                        "in": "query",
+                        "required": False,
+                        "type": "number"
+                    },{
+                        "name": "amortization_rate",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "enum": ["DAILY", "WEEKLY", "MONTHLY", "YEARLY"]
+                    }],
+                    "responses": {
+                        "200": {
+                            "description": "Pending loan requests retrieved!",
+                        },
+                        "400": {
+                            "description": "Validation error with query parameters",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                    }
+                },
+            },
             "/api/v1/loan": {
                 "get": {
                     "tags": ["Loan"],
@@ -490,6 +735,12 @@ def swagger_spec():
                         "required": True,
                         "type": "string",
                         "description": "Bearer <JWT>"
+                    },{
+                        "name": "fields",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Comma separated fields to return, e.g. amount,paid_off"
                     }],
                     "responses": {
                         "200": {
@@ -517,7 +768,12 @@ def swagger_spec():
                             "in": "header",
                             "required": True,
                             "type": "string",
-                            "description": "Bearer <JWT>"}
+                            "description": "Bearer <JWT>"},{
+                            "name": "fields",
+                            "in": "query",
+                            "required": False,
+                            "type": "string",
+                            "description": "Comma separated fields to return, e.g. amount,paid_off"}
                     ],
                     "responses": {
                         "200": {
@@ -529,8 +785,194 @@ def swagger_spec():
                     }
                 },
             },
+            "/api/v1/export/{table}": {
+                "get": {
+                    "tags": ["Export"],
+                    "summary": "Export a table",
+                    "description": "Streams every row of loans, repayments or loan_balance as CSV or NDJSON. Admin only",
+                    "produces": ["text/csv", "application/x-ndjson"],
+                    "parameters": [{
+                        "name": "table",
+                        "in": "path",
+                        "required": True,
+                        "type": "string",
+                        "enum": ["loans", "repayments", "loan_balance"],
+                        "description": "Table to export"
+                    },{
+                        "name": "Authorization",
+                        "in": "header",
+                        "required": True,
+                        "type": "string",
+                        "description": "Bearer <JWT>"
+                    },{
+                        "name": "format",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "enum": ["csv", "ndjson"],
+                        "description": "Output format, csv by default"
+                    },{
+                        "name": "from",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "format": "date",
+                        "description": "First day to include, e.g. 2024-01-01"
+                    },{
+                        "name": "to",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "format": "date",
+                        "description": "Last day to include, e.g. 2024-12-31"
+                    }],
+                    "responses": {
+                        "200": {
+                            "description": "The exported rows",
+                        },
+                        "400": {
+                            "description": "Validation error with query parameters",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                        "404": {
+                            "description": "No export for the given table",
+                        },
+                    }
+                },
+            },
+            "/api/v1/analytics/portfolio": {
+                "get": {
+                    "tags": ["Analytics"],
+                    "summary": "Portfolio summary",
+                    "description": "Loan, request, repayment and balance aggregates computed from the latest Parquet snapshot. Admin only",
+                    "parameters": [{
+                        "name": "Authorization",
+                        "in": "header",
+                        "required": True,
+                        "type": "string",
+                        "description": "Bearer <JWT>"
+                    }],
+                    "responses": {
+                        "200": {
+                            "description": "Portfolio summary retrieved!",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                        "503": {
+                            "description": "No snapshot has been taken yet",
+                        },
+                    }
+                },
+            },
+            "/api/v1/analytics/summary": {
+                "get": {
+                    "tags": ["Analytics"],
+                    "summary": "Live portfolio totals",
+                    "description": "Totals kept current by approvals and repayments, plus one row per day. Admin only",
+                    "parameters": [
+                        {
+                            "name": "Authorization",
+                            "in": "header",
+                            "required": True,
+                            "type": "string",
+                            "description": "Bearer <JWT>"
+                        },
+                        {
+                            "name": "days",
+                            "in": "query",
+                            "required": False,
+                            "type": "integer",
+                            "description": "Daily rows to include, counting back from today (0-366, default 30)"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Portfolio summary retrieved!",
+                        },
+                        "400": {
+                            "description": "Validation error with query parameters",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                    }
+                },
+            },
+            "/api/v1/loan/balance/at": {
+                "get": {
+                    "tags": ["Loan"],
+                    "summary": "Balance at a past time",
+                    "description": "The borrower's total loan and total paid at `at`, from the latest balance snapshot before it plus the ledger entries after it",
+                    "parameters": [
+                        {
+                            "name": "Authorization",
+                            "in": "header",
+                            "required": True,
+                            "type": "string",
+                            "description": "Bearer <JWT>"
+                        },
+                        {
+                            "name": "at",
+                            "in": "query",
+                            "required": True,
+                            "type": "string",
+                            "format": "date-time",
+                            "description": "ISO 8601 time, e.g. 2024-06-01T00:00:00"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Loan Balance Retrieved!",
+                        },
+                        "400": {
+                            "description": "Validation error with query parameters",
+                        },
+                    }
+                },
+            },
+            "/api/v1/analytics/delinquency": {
+                "get": {
+                    "tags": ["Analytics"],
+                    "summary": "Portfolio at risk",
+                    "description": "Open loans per days-past-due bucket and PAR1/7/30/90 from the last `flask delinquency` run. Admin only",
+                    "parameters": [
+                        {
+                            "name": "Authorization",
+                            "in": "header",
+                            "required": True,
+                            "type": "string",
+                            "description": "Bearer <JWT>"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Portfolio at risk retrieved!",
+                        },
+                        "403": {
+                            "description": "Admin access required.",
+                        },
+                    }
+                },
+            },
         },
         "definitions": {
+            "BulkVerify": {
+                "type": "object",
+                "properties": {
+                    "user_ids": {"type": "array", "items": {"type": "integer"}, "example": [1, 2, 3]}
+                },
+                "required": ["user_ids"]
+            },
+            "ApproveBatch": {
+                "type": "object",
+                "properties": {
+                    "ids": {"type": "array", "items": {"type": "integer"}, "example": [1, 2, 3]}
+                },
+                "required": ["ids"]
+            },
             "UserRegister": {
                 "type": "object",
                 "properties": {
@@ -619,4 +1061,4 @@ def swagger_spec():
                 }
             },
         }
-    })
+    }
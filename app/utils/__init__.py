@@ -1,4 +1,21 @@
 from .paystack import make_payment, verify_payment
 from .jwt import is_token_blacklisted
 from .admin import admin_required
-from .repayment import update_loan_records
\ No newline at end of file
+from .repayment import update_loan_records
+from .fields import requested_fields, requested_resources, dump_selected, load_only_columns
+from .compression import init_compression
+from .query_stats import init_query_stats
+from .metrics import init_metrics
+from .profiler import init_profiler, request_profiler, memory_snapshots, make_profile_token
+from .db import init_pool_metrics, pool_status, engine_statuses, routing_status, init_sqlite, retry_on_lock, use_primary
+from .export import EXPORTS, EXPORT_FORMATS, stream_export
+from .snapshot import SNAPSHOTS, SnapshotUnavailable, take_snapshot, compact_snapshot, portfolio_summary
+from .loan_import import import_loan_requests
+from .interest import loan_interest
+from .approval import approve_loan_requests
+from .pagination import encode_cursor, decode_cursor, keyset_page
+from .warmup import warm_up
+from .portfolio import record_portfolio_change, loan_deltas, compute_portfolio, verify_portfolio, rebuild_portfolio
+from .delinquency import DelinquencyUnavailable, run_delinquency, portfolio_at_risk
+from .accrual import AccrualUnavailable, accrue_interest
+from .ledger import record_entries, balance_at, ledger_balances
\ No newline at end of file
@@ -0,0 +1,196 @@
+import time
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+from sqlalchemy import BigInteger, String, cast, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import Loan, RequestLoan, LoanBalance, InterestAccrual, InterestAccrualRun, LedgerEntry, LedgerEntryKind
+from .interest import TERM_DAYS, divide_half_even, interest_ratio
+from .portfolio import record_portfolio_change
+
+ACCRUAL_CHUNK_USERS = 20000
+
+
+class AccrualUnavailable(Exception):
+    """pyarrow, which the accrual job computes with, is not installed."""
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError:
+        raise AccrualUnavailable('The interest accrual job needs pyarrow, install it with `pip install pyarrow`.')
+    return pyarrow, pyarrow.compute
+
+
+def compute_accruals(loans, accrual_date):
+    """Interest each loan in ``loans`` is owed up to and including ``accrual_date``.
+
+    ``loans`` is an Arrow table of ``id``, ``user_id``, ``amount`` and
+    ``interest_accrued`` (kobo), ``start_at`` and ``amortization_rate``. A
+    loan's flat interest is earned in a straight line over the days its
+    schedule spans: after ``d`` of ``term`` days it has earned
+    ``interest * d / term``, rounded half to even, so the daily postings add
+    up to exactly the interest agreed at approval. Missed days are caught up
+    by the next run. Returns ``loan_id``, ``user_id`` and ``amount`` (kobo)
+    of the loans with interest to post.
+    """
+    pa, pc = _arrow()
+    if not len(loans):
+        return pa.table({name: pa.array([], pa.int64()) for name in ('loan_id', 'user_id', 'amount')})
+
+    rates = list(TERM_DAYS)
+    term = pc.take(pa.array(list(TERM_DAYS.values()), pa.int64()), pc.index_in(loans['amortization_rate'], value_set=pa.array(rates)))
+    numerator, denominator = interest_ratio()
+    interest = divide_half_even(pc, pc.multiply(loans['amount'], numerator), denominator)
+
+    day = pa.scalar(datetime.combine(accrual_date, datetime.min.time()), pa.timestamp('us'))
+    days = pc.min_element_wise(pc.max_element_wise(pc.add(pc.days_between(loans['start_at'], day), 1), 0), term)
+    earned = divide_half_even(pc, pc.multiply(interest, days), term)
+    posting = pc.subtract(earned, loans['interest_accrued'])
+
+    result = pa.table({'loan_id': loans['id'], 'user_id': loans['user_id'], 'amount': posting})
+    return result.filter(pc.greater(posting, 0))
+
+
+def _load_chunk(low, high, accrual_date):
+    """Open loans in kobo of users ``low < user_id <= high`` disbursed by ``accrual_date``."""
+    pa, _ = _arrow()
+    rows = db.session.execute(
+        select(
+            Loan.id, Loan.user_id, cast(func.round(Loan.amount * 100), BigInteger),
+            cast(func.round(Loan.interest_accrued * 100), BigInteger), Loan.start_at,
+            cast(RequestLoan.amortization_rate, String),
+        )
+        .join(RequestLoan, Loan.request_loan_id == RequestLoan.id)
+        .where(
+            Loan.user_id > low, Loan.user_id <= high, Loan.paid_off.is_(False),
+            Loan.start_at < accrual_date + timedelta(days=1),
+        )
+    ).all()
+    columns = list(zip(*rows)) or [[]] * 6
+    return pa.table({
+        'id': pa.array(columns[0], pa.int64()),
+        'user_id': pa.array(columns[1], pa.int64()),
+        'amount': pa.array(columns[2], pa.int64()),
+        'interest_accrued': pa.array(columns[3], pa.int64()),
+        'start_at': pa.array(columns[4], pa.timestamp('us')),
+        'amortization_rate': pa.array(columns[5], pa.string()),
+    })
+
+
+def _post_chunk(postings, low, high, accrual_date, now):
+    """Append a range's postings to the accrual and balance ledgers and apply them with one UPDATE per table."""
+    db.session.execute(insert(InterestAccrual.__table__), [
+        {**row, 'amount': Decimal(row['amount']).scaleb(-2), 'accrual_date': accrual_date, 'created_at': now}
+        for row in postings
+    ])
+
+    ledger = InterestAccrual.__table__.c
+    posted = (ledger.accrual_date == accrual_date, ledger.user_id > low, ledger.user_id <= high)
+    db.session.execute(
+        insert(LedgerEntry.__table__).from_select(
+            ['user_id', 'kind', 'amount', 'loan_id', 'created_at'],
+            select(ledger.user_id, literal(LedgerEntryKind.INTEREST, LedgerEntry.kind.type), ledger.amount, ledger.loan_id, literal(now))
+            .where(*posted),
+        )
+    )
+    loans, balances = Loan.__table__, LoanBalance.__table__
+    db.session.execute(
+        update(loans)
+        .where(loans.c.id.in_(select(ledger.loan_id).where(*posted)))
+        .values(interest_accrued=loans.c.interest_accrued + (
+            select(ledger.amount)
+            .where(ledger.loan_id == loans.c.id, ledger.accrual_date == accrual_date)
+            .scalar_subquery()
+        ))
+    )
+    db.session.execute(
+        update(balances)
+        .where(balances.c.user_id.in_(select(ledger.user_id).where(*posted)))
+        .values(last_updated=now, total_loan=balances.c.total_loan + (
+            select(func.sum(ledger.amount))
+            .where(ledger.user_id == balances.c.user_id, ledger.accrual_date == accrual_date)
+            .scalar_subquery()
+        ))
+    )
+
+
+def _claim_range(accrual_date, low, high):
+    """Move the run's progress from ``low`` to ``high``; False if another process got there first.
+
+    The UPDATE locks the run row until the range commits, so two workers
+    running the same date take turns and never post a range twice.
+    """
+    return db.session.execute(
+        update(InterestAccrualRun.__table__)
+        .where(InterestAccrualRun.accrual_date == accrual_date, InterestAccrualRun.last_user_id == low)
+        .values(last_user_id=high)
+    ).rowcount == 1
+
+
+def _start_run(accrual_date):
+    try:
+        db.session.execute(insert(InterestAccrualRun.__table__).values(
+            accrual_date=accrual_date, last_user_id=0, loans=0, interest=0, started_at=datetime.now(),
+        ))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+    return db.session.get(InterestAccrualRun, accrual_date, populate_existing=True)
+
+
+def accrue_interest(accrual_date=None, chunk_users=ACCRUAL_CHUNK_USERS):
+    """Post every open loan's interest up to and including ``accrual_date``.
+
+    Defaults to yesterday, the last full day. Borrowers are processed in id
+    ranges of ``chunk_users``: each range is loaded with one query, computed
+    with Arrow compute kernels on integer kobo, appended to
+    ``interest_accruals`` and applied to ``loans``, ``loan_balance`` and the
+    portfolio totals with one set-based UPDATE each, all in one transaction
+    together with the run's progress. Running a date again resumes or skips
+    it, so the job is idempotent per date. Returns a report with totals and throughput.
+    """
+    accrual_date = accrual_date or date.today() - timedelta(days=1)
+    started = time.perf_counter()
+    run = _start_run(accrual_date)
+    report = {'accrual_date': accrual_date.isoformat(), 'already_run': run.finished_at is not None, 'loans_scanned': 0}
+
+    last = db.session.scalar(select(func.max(Loan.user_id))) or 0
+    low = run.last_user_id
+    while run.finished_at is None and low < last:
+        high = low + chunk_users
+        if not _claim_range(accrual_date, low, high):
+            db.session.rollback()
+            low = db.session.get(InterestAccrualRun, accrual_date, populate_existing=True).last_user_id
+            continue
+
+        loans = _load_chunk(low, high, accrual_date)
+        postings = compute_accruals(loans, accrual_date).to_pylist()
+        now = datetime.now()
+        if postings:
+            interest = Decimal(sum(row['amount'] for row in postings)).scaleb(-2)
+            _post_chunk(postings, low, high, accrual_date, now)
+            db.session.execute(
+                update(InterestAccrualRun.__table__).where(InterestAccrualRun.accrual_date == accrual_date)
+                .values(loans=InterestAccrualRun.loans + len(postings), interest=InterestAccrualRun.interest + interest)
+            )
+            record_portfolio_change(accrual_date, interest=interest)
+        db.session.commit()
+        report['loans_scanned'] += len(loans)
+        low = high
+
+    db.session.execute(
+        update(InterestAccrualRun.__table__)
+        .where(InterestAccrualRun.accrual_date == accrual_date, InterestAccrualRun.finished_at.is_(None))
+        .values(finished_at=datetime.now())
+    )
+    db.session.commit()
+
+    run = db.session.get(InterestAccrualRun, accrual_date, populate_existing=True)
+    report['loans_accrued'] = run.loans
+    report['interest'] = str(run.interest)
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    report['loans_per_sec'] = round(report['loans_scanned'] / report['seconds']) if report['seconds'] else None
+    return report
@@ -0,0 +1,113 @@
+from decimal import Decimal
+from datetime import datetime
+from collections import defaultdict
+from sqlalchemy import bindparam, insert, select, update
+from app.extensions import db
+from app.models import User, Loan, RequestLoan, LoanBalance, LedgerEntryKind
+from .db import retry_on_lock, upsert_insert
+from .portfolio import record_portfolio_change, loan_deltas
+from .ledger import record_entries
+
+
+def _increment_balances(increments, now):
+    """Add each user's principal in ``increments`` to their balance, creating missing rows.
+
+    One upsert where the database has one, so two batches creating the same
+    borrower's row cannot collide on ``loan_balance.user_id``.
+    """
+    table = LoanBalance.__table__
+    rows = [
+        {'user_id': user_id, 'total_loan': increment, 'total_paid': 0, 'last_updated': now}
+        for user_id, increment in increments.items()
+    ]
+    statement = upsert_insert(table)
+    if statement is not None:
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={'total_loan': table.c.total_loan + statement.excluded.total_loan, 'last_updated': statement.excluded.last_updated},
+        ), rows)
+        return
+
+    existing = set(db.session.scalars(select(table.c.user_id).where(table.c.user_id.in_(increments))))
+    if existing:
+        db.session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam('balance_user_id'))
+            .values(total_loan=table.c.total_loan + bindparam('increment'), last_updated=now),
+            [{'balance_user_id': user_id, 'increment': increments[user_id]} for user_id in existing],
+        )
+    new = [row for row in rows if row['user_id'] not in existing]
+    if new:
+        db.session.execute(insert(table), new)
+
+
+@retry_on_lock
+def approve_loan_requests(request_loan_ids):
+    """Approve many loan requests in one transaction with set-based statements.
+
+    Pending requests are claimed with a single ``UPDATE ... RETURNING``, which
+    locks them and makes a concurrent batch skip them. Loans are inserted in
+    bulk with their ledger entries, each user's balance gets one aggregated
+    increment of principal (or a new row; interest is posted by the accrual
+    job), ``active_loan`` is set for all borrowers in one UPDATE and the
+    portfolio totals get one increment for the whole batch. Returns a dict
+    of request id -> outcome, in the order the ids were given.
+    """
+    ids = list(dict.fromkeys(request_loan_ids))
+    now = datetime.now()
+
+    claimed = db.session.execute(
+        update(RequestLoan.__table__)
+        .where(RequestLoan.id.in_(ids), RequestLoan.approval.is_(False))
+        .values(approval=True)
+        .returning(RequestLoan.id, RequestLoan.user_id, RequestLoan.amount, RequestLoan.amortization_rate)
+    ).all()
+
+    outcomes = {}
+    if len(claimed) < len(ids):
+        claimed_ids = {row.id for row in claimed}
+        approved = set(db.session.scalars(
+            select(RequestLoan.id).where(RequestLoan.id.in_([i for i in ids if i not in claimed_ids]))
+        ))
+        outcomes = {
+            request_loan_id: {'status': 'already_approved' if request_loan_id in approved else 'not_found'}
+            for request_loan_id in ids if request_loan_id not in claimed_ids
+        }
+
+    if claimed:
+        borrowers = {row.user_id for row in claimed}
+        with_open_loans = set(db.session.scalars(
+            select(Loan.user_id.distinct()).where(Loan.user_id.in_(borrowers), Loan.paid_off.is_(False))
+        ))
+
+        loans = db.session.execute(
+            insert(Loan.__table__).returning(Loan.id, Loan.request_loan_id, sort_by_parameter_order=True),
+            [{'amount': row.amount, 'user_id': row.user_id, 'start_at': now, 'request_loan_id': row.id}
+             for row in claimed],
+        ).all()
+        for loan in loans:
+            outcomes[loan.request_loan_id] = {'status': 'approved', 'loan_id': loan.id}
+        requests = {row.id: row for row in claimed}
+        record_entries([
+            {'user_id': requests[loan.request_loan_id].user_id, 'kind': LedgerEntryKind.DISBURSEMENT,
+             'amount': requests[loan.request_loan_id].amount, 'loan_id': loan.id, 'created_at': now}
+            for loan in loans
+        ])
+
+        increments = defaultdict(Decimal)
+        for row in claimed:
+            increments[row.user_id] += row.amount
+
+        _increment_balances(increments, now)
+
+        db.session.execute(
+            update(User.__table__).where(User.id.in_(increments)).values(active_loan=True)
+        )
+
+        record_portfolio_change(now.date(), **loan_deltas(
+            [(row.amount, row.amortization_rate) for row in claimed],
+            new_borrowers=len(borrowers - with_open_loans),
+        ))
+
+    db.session.commit()
+    return {request_loan_id: outcomes[request_loan_id] for request_loan_id in ids}
@@ -0,0 +1,108 @@
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:     # gzip only
+    brotli = None
+
+
+def negotiate_encoding(accept_encodings):
+    """Pick the content coding to use from the request's Accept-Encoding.
+
+    Brotli is preferred over gzip when both are equally acceptable and the
+    brotli module is installed. Returns ``None`` for identity.
+    """
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return accept_encodings.best_match(supported)
+
+
+class _GzipCompressor:
+    def __init__(self, level):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def make_compressor(encoding, config):
+    if encoding == 'br':
+        return _BrotliCompressor(config['COMPRESS_BR_LEVEL'])
+    return _GzipCompressor(config['COMPRESS_LEVEL'])
+
+
+def compress(data, encoding, config):
+    """Compress a complete body with the configured level for ``encoding``."""
+    compressor = make_compressor(encoding, config)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _compress_stream(chunks, compressor):
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        # Closing the original iterable releases stream_with_context and DB cursors
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    """after_request hook compressing eligible responses."""
+    config = current_app.config
+
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return response
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in config['COMPRESS_MIMETYPES']:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        # Size is unknown up front, so streams are always compressed
+        response.response = _compress_stream(response.response, make_compressor(encoding, config))
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+        response.set_data(compress(data, encoding, config))
+
+    response.headers['Content-Encoding'] = encoding
+
+    # A strong ETag identifies the bytes, so each encoding gets its own
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+
+    return response
+
+
+def init_compression(app):
+    if app.config['COMPRESS_ENABLED']:
+        app.after_request(compress_response)
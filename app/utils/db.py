@@ -0,0 +1,135 @@
+import time
+import random
+import weakref
+from functools import wraps
+from collections import Counter
+from flask import current_app
+from sqlalchemy import BigInteger, cast, event, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.session import routing_counts, use_primary
+
+# INSERT constructs with ON CONFLICT support, by dialect name
+_UPSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+# Per-engine pool event counts
+_pool_events = weakref.WeakKeyDictionary()
+
+_POOL_METHODS = {
+    'size': 'size',
+    'checked_in': 'checkedin',
+    'checked_out': 'checkedout',
+    'overflow': 'overflow',
+}
+
+
+def _count(counter, name):
+    def listener(*args):
+        counter[name] += 1
+    return listener
+
+
+def watch_pool(engine):
+    """Count connects, checkouts and invalidations on ``engine``'s pool."""
+    if engine in _pool_events:
+        return
+    counter = _pool_events[engine] = Counter()
+    event.listen(engine, 'connect', _count(counter, 'connects'))
+    event.listen(engine, 'checkout', _count(counter, 'checkouts'))
+    event.listen(engine, 'invalidate', _count(counter, 'invalidations'))
+
+
+def pool_status(engine):
+    """Snapshot of ``engine``'s pool usage.
+
+    Pool classes without sizing (NullPool, StaticPool) only report their
+    class name and event counts.
+    """
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    for key, method in _POOL_METHODS.items():
+        if hasattr(pool, method):
+            status[key] = getattr(pool, method)()
+    status.update(_pool_events.get(engine, {}))
+    return status
+
+
+def init_pool_metrics(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            watch_pool(engine)
+
+
+def routing_status():
+    """Statements sent to the primary and the replica by this worker."""
+    return {'primary': routing_counts['primary'], 'replica': routing_counts['replica']}
+
+
+def engine_statuses():
+    """Pool status of every configured bind, keyed by bind name."""
+    return {
+        bind or 'default': pool_status(engine)
+        for bind, engine in db.engines.items()
+    }
+
+
+def tune_sqlite(engine, pragmas):
+    """Apply ``pragmas`` to every new connection of a SQLite ``engine``."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def init_sqlite(app):
+    if not app.config['SQLITE_TUNED']:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            tune_sqlite(engine, app.config['SQLITE_PRAGMAS'])
+
+
+def is_lock_error(error):
+    message = str(getattr(error, 'orig', error))
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+def retry_on_lock(fn):
+    """Retry a unit of work that ends in a commit when SQLite reports a lock.
+
+    The session is rolled back before each retry, so ``fn`` must redo all of
+    its writes and commit once. Backoff doubles from SQLITE_LOCK_BACKOFF,
+    capped at one second and jittered, for at most SQLITE_LOCK_RETRIES tries.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        retries = current_app.config['SQLITE_LOCK_RETRIES']
+        backoff = current_app.config['SQLITE_LOCK_BACKOFF']
+        attempt = 0
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except OperationalError as e:
+                if attempt >= retries or not is_lock_error(e):
+                    raise
+                db.session.rollback()
+                time.sleep(min(backoff * 2 ** attempt, 1.0) * random.uniform(0.5, 1.0))
+                attempt += 1
+    return wrapper
+
+
+def upsert_insert(table):
+    """An INSERT on ``table`` supporting ``on_conflict_do_update``, or None on other databases."""
+    upsert = _UPSERTS.get(db.engine.dialect.name)
+    return upsert(table) if upsert is not None else None
+
+
+def kobo(column):
+    """SQL expression of a naira ``column`` as an exact integer number of kobo."""
+    return cast(func.round(column * 100), BigInteger)
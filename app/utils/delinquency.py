@@ -0,0 +1,208 @@
+import time
+from decimal import Decimal
+from datetime import date, datetime
+from sqlalchemy import BigInteger, String, cast, delete, func, insert, select
+from app.extensions import db
+from app.models import Loan, RequestLoan, Repayment, LoanDelinquency, AMORTIZATION_SCHEDULES
+from .db import upsert_insert
+from .interest import divide_half_even, interest_ratio
+
+# Portfolio-at-risk thresholds in days past due, highest first
+PAR_BUCKETS = (90, 30, 7, 1)
+DELINQUENCY_CHUNK_USERS = 20000
+_RATES = [rate.value for rate in AMORTIZATION_SCHEDULES]
+_COLUMNS = ('loan_id', 'user_id', 'days_past_due', 'par_bucket', 'arrears', 'outstanding')
+
+
+class DelinquencyUnavailable(Exception):
+    """pyarrow, which the delinquency job computes with, is not installed."""
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError:
+        raise DelinquencyUnavailable('The delinquency job needs pyarrow, install it with `pip install pyarrow`.')
+    return pyarrow, pyarrow.compute
+
+
+def compute_delinquency(loans, paid, as_of):
+    """Days past due of every open loan in ``loans``, with column arrays only.
+
+    ``loans`` is an Arrow table of ``id``, ``user_id``, ``amount`` and
+    ``interest_accrued`` (kobo), ``start_at``, ``amortization_rate`` and
+    ``paid_off`` sorted by user and start date; ``paid`` maps ``user_id`` to
+    approved repayments in kobo. Repayments are not linked to loans, so each
+    borrower's payments settle their loans oldest first. A loan is due in
+    equal instalments of its principal plus contracted interest per
+    ``AMORTIZATION_SCHEDULES``, and is past due from the due date of its
+    oldest unpaid instalment. ``outstanding`` is the principal plus the
+    interest accrued so far less what was allocated to the loan, as in
+    ``loan_balance``.
+    """
+    pa, pc = _arrow()
+    count = len(loans)
+    if not count:
+        return pa.table({name: pa.array([], pa.int64()) for name in _COLUMNS})
+
+    rate_index = pc.index_in(loans['amortization_rate'], value_set=pa.array(_RATES))
+    period = pc.take(pa.array([days for days, _ in AMORTIZATION_SCHEDULES.values()], pa.int64()), rate_index)
+    instalments = pc.take(pa.array([n for _, n in AMORTIZATION_SCHEDULES.values()], pa.int64()), rate_index)
+
+    numerator, denominator = interest_ratio()
+    amount = loans['amount']
+    owed = pc.add(amount, divide_half_even(pc, pc.multiply(amount, numerator), denominator))
+    per_instalment = pc.max_element_wise(pc.divide(owed, instalments), 1)
+
+    as_of_ts = pa.scalar(datetime.combine(as_of, datetime.min.time()), pa.timestamp('us'))
+    elapsed = pc.max_element_wise(pc.days_between(loans['start_at'], as_of_ts), 0)
+    periods_due = pc.min_element_wise(pc.divide(elapsed, period), instalments)
+    due = pc.if_else(pc.equal(periods_due, instalments), owed, pc.multiply(periods_due, per_instalment))
+
+    # Owed on the borrower's earlier loans: running total minus the total at the borrower's first row
+    user_id = loans['user_id'].combine_chunks()
+    before = pc.subtract(pc.cumulative_sum(owed), owed)
+    first = pc.fill_null(pc.not_equal(user_id, pa.concat_arrays([pa.nulls(1, user_id.type), user_id.slice(0, count - 1)])), True)
+    group_start = pc.fill_null_forward(pc.if_else(first, pa.array(range(count), pa.int64()), pa.nulls(count, pa.int64())))
+    before = pc.subtract(before, pc.take(before, group_start))
+
+    user_paid = pc.fill_null(pc.take(paid['paid'], pc.index_in(user_id, value_set=paid['user_id'])), 0)
+    allocated = pc.min_element_wise(pc.max_element_wise(pc.subtract(user_paid, before), 0), owed)
+    arrears = pc.max_element_wise(pc.subtract(due, allocated), 0)
+
+    first_unpaid = pc.min_element_wise(pc.add(pc.divide(allocated, per_instalment), 1), instalments)
+    overdue_days = pc.max_element_wise(pc.subtract(elapsed, pc.multiply(first_unpaid, period)), 0)
+    days_past_due = pc.if_else(pc.greater(arrears, 0), overdue_days, 0)
+
+    bucket = pa.array([0] * count, pa.int64())
+    for threshold in reversed(PAR_BUCKETS):
+        bucket = pc.if_else(pc.greater_equal(days_past_due, threshold), threshold, bucket)
+
+    result = pa.table({
+        'loan_id': loans['id'],
+        'user_id': user_id,
+        'days_past_due': days_past_due,
+        'par_bucket': bucket,
+        'arrears': arrears,
+        'outstanding': pc.max_element_wise(pc.subtract(pc.add(amount, loans['interest_accrued']), allocated), 0),
+    })
+    return result.filter(pc.invert(loans['paid_off']))
+
+
+def _load_chunk(low, high):
+    """Loans and approved repayments in kobo of users ``low < user_id <= high``."""
+    pa, _ = _arrow()
+    loans = db.session.execute(
+        select(
+            Loan.id, Loan.user_id, cast(func.round(Loan.amount * 100), BigInteger),
+            cast(func.round(Loan.interest_accrued * 100), BigInteger), Loan.start_at,
+            cast(RequestLoan.amortization_rate, String), Loan.paid_off,
+        )
+        .join(RequestLoan, Loan.request_loan_id == RequestLoan.id)
+        .where(Loan.user_id > low, Loan.user_id <= high)
+        .order_by(Loan.user_id, Loan.start_at, Loan.id)
+    ).all()
+    columns = list(zip(*loans)) or [[]] * 7
+    loans = pa.table({
+        'id': pa.array(columns[0], pa.int64()),
+        'user_id': pa.array(columns[1], pa.int64()),
+        'amount': pa.array(columns[2], pa.int64()),
+        'interest_accrued': pa.array(columns[3], pa.int64()),
+        'start_at': pa.array(columns[4], pa.timestamp('us')),
+        'amortization_rate': pa.array(columns[5], pa.string()),
+        'paid_off': pa.array(columns[6], pa.bool_()),
+    })
+
+    paid = db.session.execute(
+        select(Repayment.user_id, func.sum(cast(func.round(Repayment.repay_amount * 100), BigInteger)))
+        .where(Repayment.is_approved.is_(True), Repayment.user_id > low, Repayment.user_id <= high)
+        .group_by(Repayment.user_id)
+    ).all()
+    columns = list(zip(*paid)) or [[]] * 2
+    paid = pa.table({'user_id': pa.array(columns[0], pa.int64()), 'paid': pa.array(columns[1], pa.int64())})
+    return loans, paid
+
+
+def _write_chunk(rows, low, high, stamp):
+    """Upsert a chunk's rows and drop those of loans in the range that are no longer open."""
+    table = LoanDelinquency.__table__
+    in_range = (table.c.user_id > low, table.c.user_id <= high)
+    statement = upsert_insert(table)
+    if statement is None:
+        db.session.execute(delete(table).where(*in_range))
+        statement = insert(table)
+    else:
+        statement = statement.on_conflict_do_update(
+            index_elements=['loan_id'],
+            set_={name: statement.excluded[name] for name in table.c.keys() if name != 'loan_id'},
+        )
+    if rows:
+        db.session.execute(statement, rows)
+    db.session.execute(delete(table).where(*in_range, table.c.computed_at < stamp))
+    db.session.commit()
+
+
+def run_delinquency(as_of=None, chunk_users=DELINQUENCY_CHUNK_USERS):
+    """Recompute ``loan_delinquency`` for every open loan as of ``as_of``.
+
+    Borrowers are processed in id ranges of ``chunk_users`` so memory stays
+    flat; each range is loaded with two queries, computed with Arrow compute
+    kernels and written with one bulk upsert and committed; rows the run did
+    not write are deleted at the end. Returns a report with the loans per
+    PAR bucket and throughput.
+    """
+    as_of = as_of or date.today()
+    stamp = datetime.now()
+    started = time.perf_counter()
+    low, last = db.session.execute(select(func.min(Loan.user_id), func.max(Loan.user_id))).one()
+    report = {'as_of': as_of.isoformat(), 'loans': 0, 'open_loans': 0, 'buckets': dict.fromkeys((0, *PAR_BUCKETS[::-1]), 0)}
+
+    low = (low or 1) - 1
+    while True:
+        high = low + chunk_users
+        loans, paid = _load_chunk(low, high)
+        result = compute_delinquency(loans, paid, as_of)
+        rows = [
+            {**row, 'arrears': Decimal(row['arrears']).scaleb(-2), 'outstanding': Decimal(row['outstanding']).scaleb(-2),
+             'as_of': as_of, 'computed_at': stamp}
+            for row in result.select(list(_COLUMNS)).to_pylist()
+        ] if len(result) else []
+        _write_chunk(rows, low, high, stamp)
+
+        report['loans'] += len(loans)
+        report['open_loans'] += len(rows)
+        for row in rows:
+            report['buckets'][row['par_bucket']] += 1
+        low = high
+        if last is None or low >= last:
+            break
+    # Rows of borrowers outside the span scanned, e.g. whose loans were removed
+    db.session.execute(delete(LoanDelinquency.__table__).where(LoanDelinquency.computed_at < stamp))
+    db.session.commit()
+
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    report['loans_per_sec'] = round(report['loans'] / report['seconds']) if report['seconds'] else None
+    return report
+
+
+def portfolio_at_risk():
+    """PAR1/7/30/90: share of open principal outstanding on loans that many days past due."""
+    rows = db.session.execute(
+        select(LoanDelinquency.par_bucket, func.count(), func.sum(LoanDelinquency.outstanding), func.max(LoanDelinquency.as_of))
+        .group_by(LoanDelinquency.par_bucket)
+    ).all()
+    outstanding = {bucket: Decimal(amount or 0) for bucket, _, amount, _ in rows}
+    total = sum(outstanding.values())
+
+    as_of = max((as_of for *_, as_of in rows), default=None)
+    summary = {
+        'as_of': as_of.isoformat() if as_of else None,
+        'open_loans': sum(count for _, count, _, _ in rows),
+        'outstanding': str(total.quantize(Decimal('0.01'))),
+        'loans_by_bucket': {f'PAR{bucket}' if bucket else 'CURRENT': count for bucket, count, _, _ in sorted(rows)},
+    }
+    for threshold in PAR_BUCKETS[::-1]:
+        at_risk = sum(amount for bucket, amount in outstanding.items() if bucket >= threshold)
+        summary[f'par{threshold}'] = round(float(at_risk / total), 4) if total else 0.0
+    return summary
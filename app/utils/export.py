@@ -0,0 +1,78 @@
+import io
+import csv
+import json
+from enum import Enum
+from decimal import Decimal
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select
+from app.extensions import db
+from app.models import Loan, Repayment, LoanBalance
+
+# Exportable tables: model, columns in output order, column the date filters apply to
+EXPORTS = {
+    'loans': (Loan, ('id', 'user_id', 'request_loan_id', 'amount', 'paid_off', 'start_at'), 'start_at'),
+    'repayments': (Repayment, ('id', 'user_id', 'repay_amount', 'is_approved', 'paid_at'), 'paid_at'),
+    'loan_balance': (LoanBalance, ('id', 'user_id', 'total_loan', 'total_paid', 'last_updated'), 'last_updated'),
+}
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+EXPORT_BATCH_SIZE = 2000
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def export_rows(table, start=None, end=None, batch_size=EXPORT_BATCH_SIZE):
+    """Stream ``(columns, rows)`` of an export table as plain tuples.
+
+    ``start`` and ``end`` are inclusive dates. Rows come from a server-side
+    cursor in batches of ``batch_size`` (``yield_per``), and selecting
+    columns rather than entities keeps them out of the identity map.
+    """
+    model, names, date_column = EXPORTS[table]
+    columns = [getattr(model, name) for name in names]
+    query = select(*columns).order_by(model.id)
+    if start is not None:
+        query = query.where(getattr(model, date_column) >= datetime.combine(start, time.min))
+    if end is not None:
+        query = query.where(getattr(model, date_column) < datetime.combine(end + timedelta(days=1), time.min))
+
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    return names, result
+
+
+def _csv_chunks(names, result):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for partition in result.partitions():
+        writer.writerows([_plain(value) for value in row] for row in partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(names, result):
+    for partition in result.partitions():
+        yield ''.join(
+            json.dumps(dict(zip(names, map(_plain, row))), separators=(',', ':')) + '\n'
+            for row in partition
+        )
+
+
+def stream_export(table, fmt, start=None, end=None, batch_size=EXPORT_BATCH_SIZE):
+    """Text chunks of an export in ``csv`` or ``ndjson``, one per fetched batch."""
+    names, result = export_rows(table, start, end, batch_size)
+    chunks = _csv_chunks if fmt == 'csv' else _ndjson_chunks
+    try:
+        yield from chunks(names, result)
+    finally:
+        result.close()
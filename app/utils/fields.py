@@ -0,0 +1,83 @@
+from functools import lru_cache
+from flask import request
+from sqlalchemy.orm import load_only
+from .metrics import observe_lru
+
+
+def _requested_names():
+    raw = request.args.get('fields')
+    if raw is None:
+        return None
+    return [name.strip() for name in raw.split(',') if name.strip()]
+
+
+def requested_fields(schema):
+    """Parse the ``fields`` query parameter against the fields ``schema`` dumps.
+
+    Returns ``None`` when the parameter is absent, otherwise a tuple of field
+    names. Raises ValueError naming any field the schema does not expose.
+    """
+    names = _requested_names()
+    if names is None:
+        return None
+
+    unknown = sorted(set(names) - set(schema.dump_fields))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(names))
+
+
+def requested_resources(**schemas):
+    """Parse ``fields`` for a response made of several named sub-resources.
+
+    ``fields=loan`` selects every field of the ``loan`` sub-resource and
+    ``fields=loan.total_loan`` a single one. Returns ``None`` when the
+    parameter is absent, otherwise a dict mapping each requested sub-resource
+    to its tuple of field names; sub-resources that were not asked for are
+    left out so the caller can skip loading them.
+    """
+    names = _requested_names()
+    if names is None:
+        return None
+
+    selected = {}
+    unknown = []
+    for name in names:
+        resource, _, field = name.partition('.')
+        schema = schemas.get(resource)
+        if schema is None or (field and field not in schema.dump_fields):
+            unknown.append(name)
+            continue
+        fields = selected.setdefault(resource, [])
+        fields.extend([field] if field else schema.dump_fields)
+
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return {resource: tuple(dict.fromkeys(fields)) for resource, fields in selected.items()}
+
+
+@lru_cache(maxsize=128)
+def _schema_only(schema_class, fields):
+    return schema_class(only=fields)
+
+
+def dump_selected(schema, obj, fields, many=False):
+    """Serialize ``obj`` with ``schema``, restricted to ``fields`` if given."""
+    if fields is not None:
+        schema = observe_lru('field_schemas', _schema_only, type(schema), fields)
+    return schema.dump(obj, many=many)
+
+
+def load_only_columns(model, fields):
+    """Build query options that only select the columns backing ``fields``.
+
+    Returns an empty list when ``fields`` is ``None`` so the options can be
+    splatted into any query unconditionally.
+    """
+    if fields is None:
+        return []
+    columns = model.__table__.columns
+    attrs = [getattr(model, name) for name in fields if name in columns]
+    if not attrs:
+        attrs = [getattr(model, column.key) for column in model.__mapper__.primary_key]
+    return [load_only(*attrs)]
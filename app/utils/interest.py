@@ -0,0 +1,33 @@
+from decimal import Decimal
+from app.models import RequestLoan, AMORTIZATION_SCHEDULES
+
+CENT = Decimal('0.01')
+
+# Days a loan's schedule spans, over which its interest accrues
+TERM_DAYS = {rate.value: days * instalments for rate, (days, instalments) in AMORTIZATION_SCHEDULES.items()}
+
+
+def loan_interest(amount):
+    """Flat interest on a loan principal, rounded to kobo."""
+    return (Decimal(amount) * Decimal(str(RequestLoan.INTEREST_RATE))).quantize(CENT)
+
+
+def naira(kobo):
+    """Integer ``kobo`` as a Decimal naira amount."""
+    return Decimal(kobo).scaleb(-2)
+
+
+def interest_ratio():
+    """``RequestLoan.INTEREST_RATE`` as an exact integer ``(numerator, denominator)``."""
+    return Decimal(str(RequestLoan.INTEREST_RATE)).as_integer_ratio()
+
+
+def divide_half_even(pc, numerator, denominator):
+    """Integer ``numerator / denominator`` over Arrow arrays, rounded half to even like Decimal.quantize."""
+    quotient = pc.divide(numerator, denominator)
+    twice_remainder = pc.multiply(pc.subtract(numerator, pc.multiply(quotient, denominator)), 2)
+    round_up = pc.or_(
+        pc.greater(twice_remainder, denominator),
+        pc.and_(pc.equal(twice_remainder, denominator), pc.equal(pc.bit_wise_and(quotient, 1), 1)),
+    )
+    return pc.add(quotient, pc.cast(round_up, 'int64'))
@@ -0,0 +1,18 @@
+import importlib
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Keeps heavy, rarely used dependencies out of worker startup while code
+    (and ``mock.patch``) can still refer to ``module.attribute`` as usual.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attribute):
+        return getattr(importlib.import_module(self._name), attribute)
+
+    def __repr__(self):
+        return f'<lazy module {self._name!r}>'
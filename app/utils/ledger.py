@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, bindparam, case, exists, func, insert, literal, or_, select, union_all, update
+from app.extensions import db
+from app.models import LoanBalance, LedgerEntry, LedgerEntryKind, BalanceSnapshot
+from .db import kobo, upsert_insert
+from .interest import naira
+
+LEDGER_CHUNK_USERS = 20000
+OPENING_BALANCE = 'opening balance'
+
+
+def record_entries(entries):
+    """Append ``entries`` (dicts of user_id, kind, amount and optionally loan_id,
+    repayment_id and note) to the ledger in the caller's transaction."""
+    if entries:
+        db.session.execute(insert(LedgerEntry.__table__), [
+            {'loan_id': None, 'repayment_id': None, 'note': None, 'created_at': datetime.now(), **entry}
+            for entry in entries
+        ])
+
+
+def _latest_snapshots(low, high, at):
+    """Subquery of each user's latest snapshot time up to ``at``."""
+    latest = select(BalanceSnapshot.user_id, func.max(BalanceSnapshot.as_of).label('as_of')) \
+        .where(BalanceSnapshot.user_id > low, BalanceSnapshot.user_id <= high)
+    if at is not None:
+        latest = latest.where(BalanceSnapshot.as_of <= at)
+    return latest.group_by(BalanceSnapshot.user_id).subquery()
+
+
+def _ledger_totals(connection, low, high, at=None):
+    """``(snapshots, tails)`` of users ``low < user_id <= high`` at ``at``, in kobo.
+
+    ``snapshots`` maps a user to the totals of their latest snapshot up to
+    ``at``, ``tails`` to the totals of the entries after it, summed in SQL.
+    """
+    latest = _latest_snapshots(low, high, at)
+    snapshots = {
+        user_id: (loan, paid) for user_id, loan, paid in connection.execute(
+            select(BalanceSnapshot.user_id, kobo(BalanceSnapshot.total_loan), kobo(BalanceSnapshot.total_paid))
+            .join(latest, and_(BalanceSnapshot.user_id == latest.c.user_id, BalanceSnapshot.as_of == latest.c.as_of))
+        )
+    }
+
+    repayment = LedgerEntry.kind == LedgerEntryKind.REPAYMENT
+    amount = kobo(LedgerEntry.amount)
+    tail = (
+        select(
+            LedgerEntry.user_id,
+            func.sum(case((repayment, 0), else_=amount)),
+            func.sum(case((repayment, amount), else_=0)),
+        )
+        .outerjoin(latest, latest.c.user_id == LedgerEntry.user_id)
+        .where(
+            LedgerEntry.user_id > low, LedgerEntry.user_id <= high,
+            or_(latest.c.as_of.is_(None), LedgerEntry.created_at > latest.c.as_of),
+        )
+        .group_by(LedgerEntry.user_id)
+    )
+    if at is not None:
+        tail = tail.where(LedgerEntry.created_at <= at)
+    tails = {user_id: (loan, paid) for user_id, loan, paid in connection.execute(tail)}
+    return snapshots, tails
+
+
+def ledger_balances(connection, low, high, at=None):
+    """``{user_id: (total_loan, total_paid)}`` in kobo from the ledger, at ``at`` or now."""
+    snapshots, tails = _ledger_totals(connection, low, high, at)
+    balances = dict(snapshots)
+    for user_id, (loan, paid) in tails.items():
+        snapshot_loan, snapshot_paid = balances.get(user_id, (0, 0))
+        balances[user_id] = (snapshot_loan + loan, snapshot_paid + paid)
+    return balances
+
+
+def balance_at(user_id, at=None):
+    """A borrower's ``(total_loan, total_paid)`` at ``at`` (default now): latest snapshot plus the entries after it."""
+    loan, paid = ledger_balances(db.session.connection(), user_id - 1, user_id, at).get(user_id, (0, 0))
+    return naira(loan), naira(paid)
+
+
+def snapshot_range(connection, low, high, as_of):
+    """Snapshot the users of a range with entries since their last snapshot; returns how many."""
+    snapshots, tails = _ledger_totals(connection, low, high, as_of)
+    rows = []
+    for user_id, (loan, paid) in tails.items():
+        snapshot_loan, snapshot_paid = snapshots.get(user_id, (0, 0))
+        rows.append({
+            'user_id': user_id, 'as_of': as_of,
+            'total_loan': naira(snapshot_loan + loan), 'total_paid': naira(snapshot_paid + paid),
+        })
+    if rows:
+        connection.execute(insert(BalanceSnapshot.__table__), rows)
+    return len(rows)
+
+
+def snapshot_cutoff():
+    """Latest time a snapshot may cover: entries committed late with an earlier
+    ``created_at`` must not fall behind a snapshot already taken."""
+    return (datetime.now() - timedelta(seconds=current_app.config['LEDGER_SNAPSHOT_LAG_SECONDS'])).replace(microsecond=0)
+
+
+def rebuild_range(connection, low, high):
+    """Rewrite the ``loan_balance`` rows of a range that differ from the ledger.
+
+    The range's balance rows are locked first (on PostgreSQL), so
+    approvals and repayments writing through meanwhile wait and are
+    neither lost nor counted twice. Returns ``(users, rewritten)``.
+    """
+    table = LoanBalance.__table__
+    cached = {
+        user_id: (loan, paid) for user_id, loan, paid in connection.execute(
+            select(table.c.user_id, kobo(table.c.total_loan), kobo(table.c.total_paid))
+            .where(table.c.user_id > low, table.c.user_id <= high)
+            .with_for_update()
+        )
+    }
+    balances = ledger_balances(connection, low, high)
+    for user_id in cached.keys() - balances.keys():
+        balances[user_id] = (0, 0)
+
+    now = datetime.now()
+    changed = [
+        {'balance_user_id': user_id, 'total_loan': naira(loan), 'total_paid': naira(paid), 'last_updated': now}
+        for user_id, (loan, paid) in balances.items() if user_id in cached and cached[user_id] != (loan, paid)
+    ]
+    if changed:
+        connection.execute(
+            update(table).where(table.c.user_id == bindparam('balance_user_id'))
+            .values(total_loan=bindparam('total_loan'), total_paid=bindparam('total_paid'), last_updated=bindparam('last_updated')),
+            changed,
+        )
+    missing = [
+        {'user_id': user_id, 'total_loan': naira(loan), 'total_paid': naira(paid), 'last_updated': now}
+        for user_id, (loan, paid) in balances.items() if user_id not in cached
+    ]
+    if missing:
+        # A missing row can be created meanwhile by an approval; its increment is added to ours
+        statement = upsert_insert(table)
+        if statement is not None:
+            statement = statement.on_conflict_do_update(index_elements=['user_id'], set_={
+                'total_loan': table.c.total_loan + statement.excluded.total_loan,
+                'total_paid': table.c.total_paid + statement.excluded.total_paid,
+                'last_updated': statement.excluded.last_updated,
+            })
+        else:
+            statement = insert(table)
+        connection.execute(statement, missing)
+    return len(balances), len(changed) + len(missing)
+
+
+def backfill_range(connection, low, high):
+    """Open the ledger of users in a range who have a balance but no entries yet.
+
+    Their current ``loan_balance`` becomes an opening adjustment and an
+    opening repayment, with one INSERT ... SELECT. Returns the entries added.
+    """
+    now = datetime.now()
+    balances = LoanBalance.__table__.c
+    without_entries = (
+        balances.user_id > low, balances.user_id <= high,
+        ~exists().where(LedgerEntry.user_id == balances.user_id),
+    )
+    kind = LedgerEntry.kind.type
+    openings = union_all(
+        select(balances.user_id, literal(LedgerEntryKind.ADJUSTMENT, kind), balances.total_loan, literal(OPENING_BALANCE), literal(now))
+        .where(*without_entries, balances.total_loan != 0),
+        select(balances.user_id, literal(LedgerEntryKind.REPAYMENT, kind), balances.total_paid, literal(OPENING_BALANCE), literal(now))
+        .where(*without_entries, balances.total_paid != 0),
+    )
+    return connection.execute(
+        insert(LedgerEntry.__table__).from_select(['user_id', 'kind', 'amount', 'note', 'created_at'], openings)
+    ).rowcount
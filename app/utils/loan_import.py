@@ -0,0 +1,87 @@
+import csv
+from datetime import datetime
+from itertools import islice
+from marshmallow import ValidationError
+from sqlalchemy import insert, select
+from app.extensions import db
+from app.models import User, RequestLoan
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 1000
+IMPORT_COLUMNS = ('user_id', 'amount', 'amortization_rate')
+
+
+def _chunks(reader, size):
+    while True:
+        chunk = list(islice(reader, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_loan_requests(lines, schema, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False):
+    """Create pending loan requests from CSV text, ``chunk_size`` rows at a time.
+
+    ``lines`` is any iterable of CSV lines with a ``user_id,amount,amortization_rate``
+    header, read lazily so that uploads are never held in memory. Every row
+    is loaded once with ``schema``; user existence and pending-request
+    conflicts are checked with one query each per chunk, and the valid rows
+    of a chunk are inserted with a single executemany and committed. A user
+    can only get one request per import, as through the API. Returns a
+    report with the first ``IMPORT_MAX_ERRORS`` row errors by line number.
+    """
+    reader = csv.DictReader(lines)
+    missing = [column for column in IMPORT_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    report = {'dry_run': dry_run, 'processed': 0, 'imported': 0, 'failed': 0, 'errors': []}
+    imported_users = set()
+
+    def fail(line, errors):
+        report['failed'] += 1
+        if len(report['errors']) < IMPORT_MAX_ERRORS:
+            report['errors'].append({'line': line, 'errors': errors})
+
+    # Line 1 is the header; rows are numbered as in the file (ignoring quoted newlines)
+    numbered = enumerate(reader, start=2)
+    for chunk in _chunks(numbered, chunk_size):
+        report['processed'] += len(chunk)
+        loaded = []
+        for line, row in chunk:
+            try:
+                loaded.append((line, schema.load(row)))
+            except ValidationError as e:
+                fail(line, e.messages)
+
+        user_ids = {data['user_id'] for _, data in loaded}
+        existing = set(db.session.scalars(select(User.id).where(User.id.in_(user_ids))))
+        pending = set(db.session.scalars(
+            select(RequestLoan.user_id).where(RequestLoan.user_id.in_(user_ids), RequestLoan.approval.is_(False))
+        ))
+
+        now = datetime.now()
+        rows = []
+        for line, data in loaded:
+            user_id = data['user_id']
+            if user_id not in existing:
+                fail(line, {'user_id': ['No user found with the given ID.']})
+            elif user_id in pending or user_id in imported_users:
+                fail(line, {'user_id': ['User has a pending loan request.']})
+            else:
+                imported_users.add(user_id)
+                rows.append({
+                    **data,
+                    'interest_rate': RequestLoan.INTEREST_RATE,
+                    'approval': False,
+                    'date_requested': now,
+                })
+
+        if rows and not dry_run:
+            db.session.execute(insert(RequestLoan), rows)
+            db.session.commit()
+        else:
+            db.session.rollback()
+        report['imported'] += len(rows)
+
+    return report
@@ -0,0 +1,136 @@
+import os
+import hmac
+import time
+from flask import Response, current_app, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess,
+)
+from app.extensions import db
+from .db import pool_status, routing_status
+
+# Latency buckets in seconds, tuned for API calls rather than page loads
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_COUNT = Counter(
+    'trustlend_http_requests_total', 'HTTP requests served',
+    ['endpoint', 'method', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'trustlend_http_request_duration_seconds', 'HTTP request latency',
+    ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    'trustlend_http_request_db_queries', 'SQL statements per request (needs SQL_INSTRUMENTATION)',
+    ['endpoint'], buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+PAYSTACK_LATENCY = Histogram(
+    'trustlend_paystack_request_duration_seconds', 'Paystack API call latency',
+    ['operation', 'status'], buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    'trustlend_cache_requests_total', 'Cache lookups by result',
+    ['cache', 'result'],
+)
+DB_POOL = Gauge(
+    'trustlend_db_pool_connections', 'Connections per pool state',
+    ['bind', 'state'], multiprocess_mode='livesum',
+)
+DB_STATEMENTS = Counter(
+    'trustlend_db_statements_total', 'Statements routed to each database',
+    ['target'],
+)
+
+_POOL_STATES = ('size', 'checked_in', 'checked_out', 'overflow')
+_POOL_SYNC_SECONDS = 5
+_last_pool_sync = 0.0
+_synced_routing = {'primary': 0, 'replica': 0}
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def observe_lru(cache, func, *args):
+    """Call an lru_cache'd ``func`` and record whether it was a cache hit."""
+    hits = func.cache_info().hits
+    result = func(*args)
+    record_cache(cache, func.cache_info().hits > hits)
+    return result
+
+
+def observe_paystack(operation, call):
+    """Time a Paystack call, labelled with the HTTP status it returned."""
+    started = time.perf_counter()
+    status = 'error'
+    try:
+        response = call()
+        status = str(response.status_code)
+        return response
+    finally:
+        PAYSTACK_LATENCY.labels(operation, status).observe(time.perf_counter() - started)
+
+
+def _sync_db_metrics():
+    """Copy pool and routing stats into the registry, at most every few seconds."""
+    global _last_pool_sync
+    now = time.monotonic()
+    if now - _last_pool_sync < _POOL_SYNC_SECONDS:
+        return
+    _last_pool_sync = now
+
+    for bind, engine in db.engines.items():
+        status = pool_status(engine)
+        for state in _POOL_STATES:
+            if state in status:
+                DB_POOL.labels(bind or 'default', state).set(status[state])
+
+    for target, count in routing_status().items():
+        DB_STATEMENTS.labels(target).inc(count - _synced_routing[target])
+        _synced_routing[target] = count
+
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+
+def _observe_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+
+    endpoint = request.endpoint or 'unmatched'
+    labels = (endpoint, request.method, str(response.status_code))
+    REQUEST_COUNT.labels(*labels).inc()
+    REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - started)
+    if 'db_queries' in g:
+        REQUEST_DB_QUERIES.labels(endpoint).observe(g.db_queries)
+
+    _sync_db_metrics()
+    return response
+
+
+def metrics_view():
+    """Prometheus text exposition of this worker, or of all workers in multiprocess mode."""
+    token = current_app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return Response(status=401)
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    if app.config['METRICS_REQUIRE_TOKEN'] and not app.config['METRICS_TOKEN']:
+        app.logger.warning('/metrics is not served: METRICS_TOKEN is required but not set')
+        return
+
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
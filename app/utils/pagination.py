@@ -0,0 +1,29 @@
+import json
+import base64
+import binascii
+from datetime import datetime
+
+
+def encode_cursor(moment, row_id):
+    """Opaque keyset cursor for the row sorted last on a page."""
+    raw = json.dumps([moment.isoformat(), row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """``(datetime, id)`` from :func:`encode_cursor`; raises ValueError when invalid."""
+    try:
+        moment, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(row_id, int):
+            raise ValueError
+        return datetime.fromisoformat(moment), row_id
+    except (binascii.Error, TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor.')
+
+
+def keyset_page(rows, limit, key):
+    """Split ``limit + 1`` fetched rows into the page and the cursor of the next one."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import NullPool
+from app.extensions import db
+from app.models import User
+from .db import tune_sqlite
+
+DEFAULT_WORKERS = min(os.cpu_count() or 1, 8)
+
+# Engine of a pool worker process, created by _init_worker
+_engine = None
+
+
+def user_ranges(size):
+    """``(low, high]`` user id ranges of ``size`` ids covering every user."""
+    first, last = db.session.execute(select(func.min(User.id), func.max(User.id))).one()
+    if first is None:
+        return []
+    return [(low, min(low + size, last)) for low in range(first - 1, last, size)]
+
+
+def _init_worker(url, connect_args, pragmas):
+    global _engine
+    _engine = create_engine(url, poolclass=NullPool, connect_args=connect_args)
+    if pragmas:
+        tune_sqlite(_engine, pragmas)
+
+
+def _run_range(task, low, high, kwargs):
+    with _engine.begin() as connection:
+        return task(connection, low, high, **kwargs)
+
+
+def map_user_ranges(task, ranges, workers=DEFAULT_WORKERS, **kwargs):
+    """Run ``task(connection, low, high, **kwargs)`` on every range, one transaction each.
+
+    With more than one worker the ranges are spread over a process pool
+    whose processes open their own connections to the app's database, so
+    the ranges are computed and written in parallel; otherwise they run in
+    this process. ``task`` must be a module-level function. Yields
+    ``(low, high, result)`` in range order as results come in.
+    """
+    if workers <= 1 or len(ranges) <= 1:
+        for low, high in ranges:
+            with db.engine.begin() as connection:
+                yield low, high, task(connection, low, high, **kwargs)
+        return
+
+    url = db.engine.url.render_as_string(hide_password=False)
+    connect_args = current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).get('connect_args', {})
+    pragmas = current_app.config['SQLITE_PRAGMAS'] if current_app.config.get('SQLITE_TUNED') else None
+    with ProcessPoolExecutor(min(workers, len(ranges)), initializer=_init_worker, initargs=(url, connect_args, pragmas)) as pool:
+        futures = [pool.submit(_run_range, task, low, high, kwargs) for low, high in ranges]
+        for (low, high), future in zip(ranges, futures):
+            yield low, high, future.result()
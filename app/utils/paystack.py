@@ -1,6 +1,10 @@
-import requests
 from decimal import Decimal
 from app.environment import Environment
+from .metrics import observe_paystack
+from .lazy import LazyModule
+
+# requests (with urllib3) is only imported on the first Paystack call
+requests = LazyModule('requests')
 
 
 base_url = 'https://api.paystack.co/transaction/'
@@ -20,13 +24,13 @@ def make_payment(user, repayment):
         'reference':  reference,
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = observe_paystack('initialize', lambda: requests.post(url, headers=headers, json=data))
     return response
 
 
 def verify_payment(reference):
     url = base_url + f"verify/{reference}"
 
-    response = requests.get(url, headers=headers)
+    response = observe_paystack('verify', lambda: requests.get(url, headers=headers))
 
     return response
@@ -0,0 +1,169 @@
+from decimal import Decimal
+from datetime import datetime
+from collections import defaultdict
+from sqlalchemy import select, update, insert, delete, func
+from app.extensions import db
+from app.models import Loan, RequestLoan, Repayment, InterestAccrual, PortfolioSummary, PortfolioDaily, RATE_COLUMNS
+from .db import upsert_insert
+
+SUMMARY_ID = 1
+SUMMARY_COUNTERS = (
+    'loan_count', 'principal', 'interest', 'open_loan_count', 'open_principal',
+    'repayment_count', 'collected', 'active_borrowers', *RATE_COLUMNS.values(),
+)
+DAILY_COUNTERS = ('loan_count', 'principal', 'interest', 'repayment_count', 'collected')
+
+
+def _increment(model, key, deltas, **values):
+    """Add ``deltas`` to the row of ``model`` at ``key``, creating it if needed."""
+    table = model.__table__
+    statement = upsert_insert(table)
+    if statement is not None:
+        statement = statement.values(**key, **deltas, **values)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={**{name: table.c[name] + statement.excluded[name] for name in deltas}, **values},
+        ))
+        return
+
+    matched = db.session.execute(
+        update(table).where(*[table.c[name] == value for name, value in key.items()])
+        .values(**{name: table.c[name] + delta for name, delta in deltas.items()}, **values)
+    ).rowcount
+    if not matched:
+        db.session.execute(insert(table).values(**key, **deltas, **values))
+
+
+def record_portfolio_change(day, **deltas):
+    """Apply counter ``deltas`` to the portfolio summary and ``day``'s row.
+
+    Runs in the caller's transaction, so the totals commit or roll back
+    together with the loans and repayments they describe.
+    """
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    _increment(PortfolioSummary, {'id': SUMMARY_ID}, deltas, updated_at=datetime.now())
+    daily = {name: value for name, value in deltas.items() if name in DAILY_COUNTERS}
+    if daily:
+        _increment(PortfolioDaily, {'day': day}, daily)
+
+
+def loan_deltas(loans, new_borrowers=0):
+    """Counter deltas for newly disbursed ``(amount, amortization_rate)`` loans."""
+    deltas = defaultdict(int)
+    for amount, rate in loans:
+        amount = Decimal(amount)
+        deltas['loan_count'] += 1
+        deltas['open_loan_count'] += 1
+        deltas['principal'] += amount
+        deltas['open_principal'] += amount
+        deltas[RATE_COLUMNS[rate]] += 1
+    deltas['active_borrowers'] = new_borrowers
+    return dict(deltas)
+
+
+def compute_portfolio():
+    """Recompute the summary and daily counters from the source tables.
+
+    Loans and repayments are grouped down to distinct amounts, without
+    loading rows. Interest is what the accrual job has posted: the summary
+    sums ``loans.interest_accrued`` and each day gets the postings of its
+    accrual date, so the totals agree with ``loan_balance`` and the ledger.
+    Returns ``(summary, daily)`` with ``daily`` keyed by date.
+    """
+    summary = dict.fromkeys(SUMMARY_COUNTERS, 0)
+    daily = defaultdict(lambda: dict.fromkeys(DAILY_COUNTERS, 0))
+
+    loan_day = func.date(Loan.start_at, type_=db.Date)
+    loans = db.session.execute(
+        select(loan_day, RequestLoan.amortization_rate, Loan.paid_off, Loan.amount, func.count())
+        .join(RequestLoan, Loan.request_loan_id == RequestLoan.id)
+        .group_by(loan_day, RequestLoan.amortization_rate, Loan.paid_off, Loan.amount)
+    )
+    for day, rate, paid_off, amount, count in loans:
+        principal = amount * count
+        summary['loan_count'] += count
+        summary['principal'] += principal
+        summary[RATE_COLUMNS[rate]] += count
+        if not paid_off:
+            summary['open_loan_count'] += count
+            summary['open_principal'] += principal
+        daily[day]['loan_count'] += count
+        daily[day]['principal'] += principal
+
+    summary['interest'] = db.session.scalar(select(func.sum(Loan.interest_accrued))) or 0
+    accruals = db.session.execute(
+        select(InterestAccrual.accrual_date, func.sum(InterestAccrual.amount)).group_by(InterestAccrual.accrual_date)
+    )
+    for day, interest in accruals:
+        daily[day]['interest'] += interest
+
+    summary['active_borrowers'] = db.session.scalar(
+        select(func.count(Loan.user_id.distinct())).where(Loan.paid_off.is_(False))
+    )
+
+    repayment_day = func.date(Repayment.paid_at, type_=db.Date)
+    repayments = db.session.execute(
+        select(repayment_day, Repayment.repay_amount, func.count())
+        .where(Repayment.is_approved.is_(True))
+        .group_by(repayment_day, Repayment.repay_amount)
+    )
+    for day, amount, count in repayments:
+        summary['repayment_count'] += count
+        summary['collected'] += amount * count
+        daily[day]['repayment_count'] += count
+        daily[day]['collected'] += amount * count
+
+    return summary, dict(daily)
+
+
+def _stored_portfolio():
+    row = db.session.get(PortfolioSummary, SUMMARY_ID)
+    summary = {name: getattr(row, name) if row else 0 for name in SUMMARY_COUNTERS}
+    daily = {
+        row.day: {name: getattr(row, name) for name in DAILY_COUNTERS}
+        for row in db.session.scalars(select(PortfolioDaily))
+    }
+    return summary, daily
+
+
+def verify_portfolio():
+    """Differences between the stored counters and a full recompute."""
+    expected_summary, expected_daily = compute_portfolio()
+    stored_summary, stored_daily = _stored_portfolio()
+    empty = dict.fromkeys(DAILY_COUNTERS, 0)
+
+    drift = [
+        {'day': None, 'field': name, 'stored': stored_summary[name], 'expected': expected_summary[name]}
+        for name in SUMMARY_COUNTERS if stored_summary[name] != expected_summary[name]
+    ]
+    for day in sorted(expected_daily.keys() | stored_daily.keys()):
+        stored, expected = stored_daily.get(day, empty), expected_daily.get(day, empty)
+        drift.extend(
+            {'day': day, 'field': name, 'stored': stored[name], 'expected': expected[name]}
+            for name in DAILY_COUNTERS if stored[name] != expected[name]
+        )
+    return drift
+
+
+def rebuild_portfolio():
+    """Replace the stored counters with a full recompute, in one transaction.
+
+    The summary row is locked first (on PostgreSQL) so approvals and
+    repayments committing meanwhile wait and are counted exactly once.
+    Returns the number of daily rows written.
+    """
+    _increment(PortfolioSummary, {'id': SUMMARY_ID}, {'loan_count': 0})     # make sure the row exists
+    db.session.execute(select(PortfolioSummary.id).where(PortfolioSummary.id == SUMMARY_ID).with_for_update())
+
+    summary, daily = compute_portfolio()
+    db.session.execute(
+        update(PortfolioSummary.__table__).where(PortfolioSummary.id == SUMMARY_ID)
+        .values(**summary, updated_at=datetime.now())
+    )
+    db.session.execute(delete(PortfolioDaily.__table__))
+    if daily:
+        db.session.execute(insert(PortfolioDaily.__table__), [{'day': day, **row} for day, row in daily.items()])
+    db.session.commit()
+    return len(daily)
@@ -0,0 +1,149 @@
+import os
+import time
+import random
+import pstats
+import cProfile
+import tracemalloc
+from collections import deque
+from itertools import count
+from flask import current_app, g, request
+from itsdangerous import BadData, URLSafeTimedSerializer
+
+PROFILE_HEADER = 'X-Profile-Token'
+_TOKEN_SALT = 'request-profiler'
+
+
+class RequestProfiler:
+    """Per-worker cProfile sampling with a bounded ring buffer of results."""
+
+    def __init__(self, size=50, top=30):
+        self.sample_rate = 0.0
+        self.top = top
+        self.profiles = deque(maxlen=size)
+        self._ids = count(1)
+
+    def configure(self, size, top, sample_rate):
+        self.top = top
+        self.sample_rate = sample_rate
+        self.profiles = deque(self.profiles, maxlen=size)
+
+    def should_profile(self):
+        token = request.headers.get(PROFILE_HEADER)
+        if token:
+            return verify_profile_token(token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def record(self, profiler, response, duration):
+        stats = pstats.Stats(profiler).stats
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top]
+        profile = {
+            'id': next(self._ids),
+            'pid': os.getpid(),
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'recorded_at': time.time(),
+            'stats': [{
+                'function': f'{filename}:{line}({name})',
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'total_time': round(total_time, 6),
+                'cumulative_time': round(cumulative_time, 6),
+            } for (filename, line, name), (primitive_calls, calls, total_time, cumulative_time, _) in rows],
+        }
+        self.profiles.append(profile)
+        return profile
+
+    def clear(self):
+        self.sample_rate = 0.0
+        self.profiles.clear()
+
+
+class MemorySnapshots:
+    """tracemalloc snapshots of this worker, keeping the last two for diffing."""
+
+    def __init__(self):
+        self.snapshots = deque(maxlen=2)
+
+    def take(self, frames):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        self.snapshots.append((time.time(), snapshot))
+        current, peak = tracemalloc.get_traced_memory()
+        return {'pid': os.getpid(), 'snapshots': len(self.snapshots), 'traced_current': current, 'traced_peak': peak}
+
+    def diff(self, limit):
+        """Top allocation growth between the last two snapshots, or None."""
+        if len(self.snapshots) < 2:
+            return None
+        (old_at, old), (new_at, new) = self.snapshots
+        return {
+            'pid': os.getpid(),
+            'seconds_between': round(new_at - old_at, 3),
+            'stats': [{
+                'location': str(stat.traceback[0]),
+                'size': stat.size,
+                'size_diff': stat.size_diff,
+                'count': stat.count,
+                'count_diff': stat.count_diff,
+            } for stat in new.compare_to(old, 'lineno')[:limit]],
+        }
+
+    def stop(self):
+        self.snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+request_profiler = RequestProfiler()
+memory_snapshots = MemorySnapshots()
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=_TOKEN_SALT)
+
+
+def make_profile_token(admin_id):
+    return _serializer().dumps({'admin': admin_id})
+
+
+def verify_profile_token(token):
+    # Without a SECRET_KEY no token was ever issued, and the header must not break the request
+    if not current_app.config['SECRET_KEY']:
+        return False
+    try:
+        _serializer().loads(token, max_age=current_app.config['PROFILER_TOKEN_MAX_AGE'])
+    except BadData:
+        return False
+    return True
+
+
+def _start_profile():
+    if request_profiler.should_profile():
+        g.profile_started = time.perf_counter()
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+def _finish_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    profile = request_profiler.record(profiler, response, time.perf_counter() - g.pop('profile_started'))
+    response.headers['X-Profile-Id'] = f"{profile['pid']}-{profile['id']}"
+    return response
+
+
+def init_profiler(app):
+    request_profiler.configure(
+        app.config['PROFILER_BUFFER_SIZE'], app.config['PROFILER_TOP'], app.config['PROFILER_SAMPLE_RATE']
+    )
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
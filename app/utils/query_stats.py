@@ -0,0 +1,76 @@
+import re
+import time
+import logging
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from app.extensions import db
+
+slow_query_logger = logging.getLogger('trustlend.slow_query')
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w.$])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)'
+_IN_LIST = re.compile(rf'\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)')
+
+
+def normalize_sql(statement):
+    """Collapse whitespace, literals and IN-lists so equal queries log alike."""
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    statement = _STRING.sub('?', statement)
+    statement = _NUMBER.sub('?', statement)
+    return _IN_LIST.sub('(...)', statement)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _make_after_cursor_execute(slow_query_seconds):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        in_request = has_request_context()
+        if in_request:
+            g.db_queries = g.get('db_queries', 0) + 1
+            g.db_time = g.get('db_time', 0.0) + elapsed
+
+        if slow_query_seconds and elapsed >= slow_query_seconds:
+            slow_query_logger.warning(
+                'slow query %.1fms endpoint=%s sql=%s',
+                elapsed * 1000,
+                request.endpoint if in_request else None,
+                normalize_sql(statement),
+            )
+    return after_cursor_execute
+
+
+def _reset_query_stats():
+    g.db_queries = 0
+    g.db_time = 0.0
+
+
+def _add_timing_headers(response):
+    queries = g.get('db_queries', 0)
+    response.headers['X-DB-Queries'] = str(queries)
+    response.headers.add('Server-Timing', f'db;dur={g.get("db_time", 0.0) * 1000:.2f};desc="{queries} queries"')
+    return response
+
+
+def init_query_stats(app):
+    """Count queries and DB time per request and log slow statements.
+
+    Nothing is registered unless SQL_INSTRUMENTATION is on, so the disabled
+    path costs nothing per query.
+    """
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    after_cursor_execute = _make_after_cursor_execute(app.config['SLOW_QUERY_MS'] / 1000)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    app.before_request(_reset_query_stats)
+    if app.config['SQL_TIMING_HEADERS']:
+        app.after_request(_add_timing_headers)
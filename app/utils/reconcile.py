@@ -0,0 +1,135 @@
+from datetime import datetime
+from sqlalchemy import bindparam, func, insert, select, update
+from app.models import Loan, Repayment, LoanBalance, LedgerEntry, LedgerEntryKind
+from .db import kobo, upsert_insert
+from .interest import naira
+from .ledger import ledger_balances
+
+RECONCILIATION = 'reconciliation'
+# Drifted balances listed per range in the report
+DRIFT_SAMPLES = 10
+
+
+def expected_balances(connection, low, high):
+    """``{user_id: (total_loan, total_paid)}`` in kobo from the source tables, with grouped sums.
+
+    ``total_loan`` is the principal plus interest accrued of every loan and
+    ``total_paid`` the approved repayments.
+    """
+    expected = {
+        user_id: (loan, 0) for user_id, loan in connection.execute(
+            select(Loan.user_id, func.sum(kobo(Loan.amount) + kobo(Loan.interest_accrued)))
+            .where(Loan.user_id > low, Loan.user_id <= high)
+            .group_by(Loan.user_id)
+        )
+    }
+    for user_id, paid in connection.execute(
+        select(Repayment.user_id, func.sum(kobo(Repayment.repay_amount)))
+        .where(Repayment.user_id > low, Repayment.user_id <= high, Repayment.is_approved.is_(True))
+        .group_by(Repayment.user_id)
+    ):
+        expected[user_id] = (expected.get(user_id, (0, 0))[0], paid)
+    return expected
+
+
+def _repair(connection, drifted, cached, low, high):
+    """Write the expected balances of ``drifted`` users and post the ledger's difference as entries."""
+    table = LoanBalance.__table__
+    now = datetime.now()
+    rows = [
+        {'balance_user_id': user_id, 'total_loan': naira(loan), 'total_paid': naira(paid), 'last_updated': now}
+        for user_id, (loan, paid) in drifted.items()
+    ]
+    existing = [row for row in rows if row['balance_user_id'] in cached]
+    if existing:
+        connection.execute(
+            update(table).where(table.c.user_id == bindparam('balance_user_id'))
+            .values(total_loan=bindparam('total_loan'), total_paid=bindparam('total_paid'), last_updated=bindparam('last_updated')),
+            existing,
+        )
+    missing = [
+        {'user_id': row['balance_user_id'], 'total_loan': row['total_loan'], 'total_paid': row['total_paid'], 'last_updated': now}
+        for row in rows if row['balance_user_id'] not in cached
+    ]
+    if missing:
+        # A missing row can be created meanwhile by an approval; its increment is added to ours
+        statement = upsert_insert(table)
+        if statement is not None:
+            statement = statement.on_conflict_do_update(index_elements=['user_id'], set_={
+                'total_loan': table.c.total_loan + statement.excluded.total_loan,
+                'total_paid': table.c.total_paid + statement.excluded.total_paid,
+                'last_updated': statement.excluded.last_updated,
+            })
+        else:
+            statement = insert(table)
+        connection.execute(statement, missing)
+
+    ledger = ledger_balances(connection, low, high)
+    entries = []
+    for user_id, (loan, paid) in drifted.items():
+        ledger_loan, ledger_paid = ledger.get(user_id, (0, 0))
+        for kind, difference in ((LedgerEntryKind.ADJUSTMENT, loan - ledger_loan), (LedgerEntryKind.REPAYMENT, paid - ledger_paid)):
+            if difference:
+                entries.append({'user_id': user_id, 'kind': kind, 'amount': naira(difference), 'note': RECONCILIATION, 'created_at': now})
+    if entries:
+        connection.execute(insert(LedgerEntry.__table__), entries)
+
+
+def reconcile_range(connection, low, high, repair=False):
+    """Compare the ``loan_balance`` rows of a range with the source tables.
+
+    Every user with loans, approved repayments or a balance row is checked;
+    with ``repair`` the drifted rows are rewritten in bulk (locked first on
+    PostgreSQL so concurrent write paths wait) and the ledger gets
+    ``reconciliation`` entries so it agrees again. Returns the range's
+    counts, absolute drift in kobo and a few drifted balances.
+    """
+    table = LoanBalance.__table__
+    cached = select(table.c.user_id, kobo(table.c.total_loan), kobo(table.c.total_paid)) \
+        .where(table.c.user_id > low, table.c.user_id <= high)
+    if repair:
+        cached = cached.with_for_update()
+    cached = {user_id: (loan, paid) for user_id, loan, paid in connection.execute(cached)}
+    expected = expected_balances(connection, low, high)
+
+    drifted = {}
+    for user_id in cached.keys() | expected.keys():
+        if cached.get(user_id, (0, 0)) != expected.get(user_id, (0, 0)):
+            drifted[user_id] = expected.get(user_id, (0, 0))
+    if repair and drifted:
+        _repair(connection, drifted, cached, low, high)
+
+    samples = []
+    for user_id in sorted(drifted)[:DRIFT_SAMPLES]:
+        stored, wanted = cached.get(user_id), drifted[user_id]
+        samples.append({
+            'user_id': user_id,
+            'stored': None if stored is None else {'total_loan': str(naira(stored[0])), 'total_paid': str(naira(stored[1]))},
+            'expected': {'total_loan': str(naira(wanted[0])), 'total_paid': str(naira(wanted[1]))},
+        })
+    return {
+        'users': len(cached.keys() | expected.keys()),
+        'drifted': len(drifted),
+        'missing': len(drifted.keys() - cached.keys()),
+        'loan_drift': sum(abs(loan - cached.get(user_id, (0, 0))[0]) for user_id, (loan, _) in drifted.items()),
+        'paid_drift': sum(abs(paid - cached.get(user_id, (0, 0))[1]) for user_id, (_, paid) in drifted.items()),
+        'samples': samples,
+    }
+
+
+def reconcile_report(results, repair, workers, seconds):
+    """Combine per-range results of ``reconcile_range`` into one report."""
+    users = sum(result['users'] for result in results)
+    return {
+        'repair': repair,
+        'workers': workers,
+        'ranges': len(results),
+        'users': users,
+        'drifted': sum(result['drifted'] for result in results),
+        'missing': sum(result['missing'] for result in results),
+        'total_loan_drift': str(naira(sum(result['loan_drift'] for result in results))),
+        'total_paid_drift': str(naira(sum(result['paid_drift'] for result in results))),
+        'samples': [sample for result in results for sample in result['samples']][:DRIFT_SAMPLES],
+        'seconds': round(seconds, 3),
+        'users_per_sec': round(users / seconds) if seconds else None,
+    }
@@ -1,17 +1,49 @@
 from app.extensions import db
 from decimal import Decimal
+from sqlalchemy import update
+from .db import retry_on_lock
+from .portfolio import record_portfolio_change
+from .ledger import record_entries
+from app.models import Repayment, LedgerEntryKind
 
 
+@retry_on_lock
 def update_loan_records(repay, loans, loan_balance):
-    loan_balance.total_paid += Decimal(repay.repay_amount)
-    db.session.commit()
+    # One commit, so a retry after a lock never applies the repayment twice
+    # Claim the repayment first: a reference verified again finds it approved and changes nothing
+    claimed = db.session.execute(
+        update(Repayment.__table__)
+        .where(Repayment.id == repay.id, Repayment.is_approved.is_not(True))
+        .values(is_approved=True)
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        return False
 
+    amount = Decimal(repay.repay_amount)
+    loan_balance.total_paid += amount
     repay.is_approved = True
-    db.session.commit()
+    record_entries([{
+        'user_id': loan_balance.user_id, 'kind': LedgerEntryKind.REPAYMENT, 'amount': amount, 'repayment_id': repay.id,
+    }])
 
+    paid_off = []
     outstanding_balance = loan_balance.total_loan - loan_balance.total_paid 
     if outstanding_balance <= 100:
        
         for loan in loans:
             loan.paid_off = True
-        db.session.commit()
+            paid_off.append(loan.amount)
+
+    # Paying off every open loan makes the borrower inactive
+    record_portfolio_change(
+        repay.paid_at.date(),
+        repayment_count=1,
+        collected=amount,
+        open_loan_count=-len(paid_off),
+        open_principal=-sum(paid_off),
+        active_borrowers=-1 if paid_off else 0,
+    )
+
+    db.session.commit()
+    return True
@@ -0,0 +1,280 @@
+import os
+import json
+import glob
+import shutil
+from decimal import Decimal
+from datetime import datetime, timedelta
+from sqlalchemy import select, or_
+from app.extensions import db
+from app.models import Loan, RequestLoan, Repayment, LoanBalance
+
+# pyarrow is optional and slow to import, so it is loaded by _require_pyarrow()
+pa = pc = ds = pq = None
+_ARROW_TYPES = {}
+
+# Snapshotted tables: model, columns, column the month partition comes from,
+# and the change-tracking column the watermark is kept on
+SNAPSHOTS = {
+    'loans': (Loan, ('id', 'user_id', 'request_loan_id', 'amount', 'paid_off', 'start_at', 'updated_at'),
+              'start_at', 'updated_at'),
+    'requestloans': (RequestLoan, ('id', 'user_id', 'amount', 'interest_rate', 'approval', 'amortization_rate',
+                                   'date_requested', 'updated_at'), 'date_requested', 'updated_at'),
+    'repayments': (Repayment, ('id', 'user_id', 'repay_amount', 'is_approved', 'paid_at', 'updated_at'),
+                   'paid_at', 'updated_at'),
+    'loan_balance': (LoanBalance, ('id', 'user_id', 'total_loan', 'total_paid', 'last_updated'),
+                     'last_updated', 'last_updated'),
+}
+STATE_FILE = '_state.json'
+SNAPSHOT_BATCH_SIZE = 10000
+
+
+class SnapshotUnavailable(Exception):
+    """pyarrow is missing or no snapshot has been taken yet."""
+
+
+def _require_pyarrow():
+    global pa, pc, ds, pq
+    if pa is not None:
+        return
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise SnapshotUnavailable('Snapshots need pyarrow, install it with `pip install pyarrow`.')
+    _ARROW_TYPES.update({
+        datetime: pyarrow.timestamp('us'), bool: pyarrow.bool_(), float: pyarrow.float64(), int: pyarrow.int64(),
+    })
+    pc, ds, pq = pyarrow.compute, pyarrow.dataset, pyarrow.parquet
+    pa = pyarrow
+
+
+def _arrow_schema(model, names):
+    fields = []
+    for name in names:
+        column_type = model.__table__.c[name].type
+        if isinstance(column_type, db.Enum):
+            fields.append((name, pa.string()))
+        elif column_type.python_type is Decimal:
+            fields.append((name, pa.decimal128(column_type.precision, column_type.scale)))
+        else:
+            fields.append((name, _ARROW_TYPES[column_type.python_type]))
+    return pa.schema(fields)
+
+
+def read_state(directory):
+    try:
+        with open(os.path.join(directory, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_state(directory, state):
+    path = os.path.join(directory, STATE_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _months(timestamps):
+    return pc.fill_null(pc.strftime(timestamps, '%Y-%m'), 'unknown')
+
+
+def snapshot_table(directory, table, cutoff, watermark=None, batch_size=SNAPSHOT_BATCH_SIZE):
+    """Append the rows of ``table`` changed in ``(watermark, cutoff]`` as Parquet.
+
+    Rows are written to ``<directory>/<table>/month=YYYY-MM/part-<cutoff>.parquet``
+    and a changed row is appended again rather than rewritten, so readers
+    keep the newest version of each id (see :func:`load_snapshot`). Without
+    a watermark every row is taken. Returns the number of rows written.
+    """
+    _require_pyarrow()
+    model, names, month_column, change_column = SNAPSHOTS[table]
+    schema = _arrow_schema(model, names)
+    changed = getattr(model, change_column)
+    query = select(*[getattr(model, name) for name in names]).where(
+        or_(changed <= cutoff, changed.is_(None))
+    ).order_by(model.id)
+    if watermark is not None:
+        query = query.where(changed > watermark)
+
+    enums = [i for i, name in enumerate(names) if isinstance(model.__table__.c[name].type, db.Enum)]
+    part = f"part-{cutoff.strftime('%Y%m%dT%H%M%S')}.parquet"
+    writers, written = {}, 0
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            columns = list(zip(*partition))
+            for index in enums:
+                columns[index] = [None if v is None else v.value for v in columns[index]]
+            batch = pa.table(columns, schema=schema)
+            months = _months(batch[month_column])
+            for month in pc.unique(months).to_pylist():
+                if month not in writers:
+                    folder = os.path.join(directory, table, f'month={month}')
+                    os.makedirs(folder, exist_ok=True)
+                    # Dot-prefixed until complete, so readers skip half-written parts
+                    writers[month] = pq.ParquetWriter(os.path.join(folder, f'.{part}'), schema)
+                writers[month].write_table(batch.filter(pc.equal(months, month)))
+            written += len(batch)
+    finally:
+        result.close()
+        for writer in writers.values():
+            writer.close()
+
+    for month in writers:
+        folder = os.path.join(directory, table, f'month={month}')
+        os.replace(os.path.join(folder, f'.{part}'), os.path.join(folder, part))
+    return written
+
+
+def take_snapshot(directory, tables=None, lag_seconds=60, full=False):
+    """Snapshot every table incrementally and advance the watermarks.
+
+    The cutoff trails the clock by ``lag_seconds`` so that transactions still
+    in flight when the job starts are picked up by the next run instead of
+    being skipped. ``full`` ignores the watermarks and takes every row.
+    """
+    _require_pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    state = read_state(directory)
+    cutoff = datetime.now().replace(microsecond=0) - timedelta(seconds=lag_seconds)
+
+    counts = {}
+    for table in tables or SNAPSHOTS:
+        watermark = state.get(table, {}).get('watermark')
+        watermark = None if full or watermark is None else datetime.fromisoformat(watermark)
+        if watermark is not None and watermark >= cutoff:
+            counts[table] = 0
+            continue
+        counts[table] = snapshot_table(directory, table, cutoff, watermark)
+        state[table] = {'watermark': cutoff.isoformat(), 'rows': counts[table], 'taken_at': datetime.now().isoformat()}
+        _write_state(directory, state)
+    return counts
+
+
+def _latest_versions(table, version_column):
+    """Keep the newest version of each id, vectorized over the whole table."""
+    if len(table) == 0:
+        return table
+    table = table.sort_by([('id', 'ascending'), (version_column, 'descending')])
+    ids = table['id'].combine_chunks()
+    first = pc.not_equal(ids.slice(1), ids.slice(0, len(ids) - 1))
+    return table.filter(pa.concat_arrays([pa.array([True]), first.fill_null(True)]))
+
+
+def load_snapshot(directory, table):
+    """The snapshot of ``table`` as an Arrow table with one row per id."""
+    _require_pyarrow()
+    _, names, _, change_column = SNAPSHOTS[table]
+    if not glob.glob(os.path.join(directory, table, 'month=*', 'part-*.parquet')):
+        raise SnapshotUnavailable(f'No snapshot of {table} in {directory}.')
+    dataset = ds.dataset(os.path.join(directory, table), format='parquet', partitioning='hive')
+    return _latest_versions(dataset.to_table(columns=list(names)), change_column)
+
+
+def compact_snapshot(directory, table):
+    """Rewrite a table's snapshot with only the newest version of each row."""
+    _, _, month_column, _ = SNAPSHOTS[table]
+    latest = load_snapshot(directory, table)
+    target = os.path.join(directory, table)
+    staging, old = os.path.join(directory, f'.{table}.compacting'), os.path.join(directory, f'.{table}.old')
+    for path in (staging, old):
+        shutil.rmtree(path, ignore_errors=True)
+
+    ds.write_dataset(
+        latest.append_column('month', _months(latest[month_column])), staging, format='parquet',
+        partitioning=ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive'),
+        basename_template='part-compacted-{i}.parquet',
+    )
+    os.replace(target, old)
+    os.replace(staging, target)
+    shutil.rmtree(old)
+    return len(latest)
+
+
+def _widen(array):
+    """Widen decimals before summing, so totals cannot overflow Numeric(10, 2)."""
+    if pa.types.is_decimal(array.type):
+        return array.cast(pa.decimal128(38, array.type.scale))
+    return array
+
+
+def _sum(array):
+    value = pc.sum(_widen(array)).as_py()
+    return str(value) if value is not None else '0'
+
+
+def _by_month(table, date_column, amount_column):
+    months = pc.strftime(table[date_column], '%Y-%m')
+    grouped = pa.table({'month': months, 'amount': _widen(table[amount_column])}).group_by('month').aggregate(
+        [('amount', 'sum'), ('amount', 'count')]
+    ).sort_by('month')
+    return [
+        {'month': month, 'count': count, 'amount': str(amount)}
+        for month, amount, count in zip(
+            grouped['month'].to_pylist(), grouped['amount_sum'].to_pylist(), grouped['amount_count'].to_pylist()
+        )
+    ]
+
+
+_portfolio_cache = {}
+
+
+def portfolio_summary(directory):
+    """Portfolio aggregates computed from the snapshot with Arrow compute kernels.
+
+    Results are cached per process until the snapshot state file changes.
+    """
+    _require_pyarrow()
+    state_path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(state_path):
+        raise SnapshotUnavailable(f'No snapshot in {directory}, run `flask snapshot` first.')
+    mtime = os.path.getmtime(state_path)
+    cached = _portfolio_cache.get(directory)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    loans = load_snapshot(directory, 'loans')
+    requests = load_snapshot(directory, 'requestloans')
+    repayments = load_snapshot(directory, 'repayments')
+    balances = load_snapshot(directory, 'loan_balance')
+
+    approved_repayments = repayments.filter(repayments['is_approved'])
+    open_loans = loans.filter(pc.invert(loans['paid_off']))
+    total_loan = Decimal(_sum(balances['total_loan']))
+    total_paid = Decimal(_sum(balances['total_paid']))
+    rates = requests.group_by('amortization_rate').aggregate([('id', 'count')])
+
+    summary = {
+        'as_of': {table: entry['watermark'] for table, entry in read_state(directory).items()},
+        'loans': {
+            'count': len(loans),
+            'principal': _sum(loans['amount']),
+            'open_count': len(open_loans),
+            'open_principal': _sum(open_loans['amount']),
+            'disbursed_by_month': _by_month(loans, 'start_at', 'amount'),
+        },
+        'requests': {
+            'count': len(requests),
+            'pending': len(requests) - pc.sum(requests['approval']).as_py() if len(requests) else 0,
+            'by_amortization_rate': dict(zip(
+                rates['amortization_rate'].to_pylist(), rates['id_count'].to_pylist()
+            )),
+        },
+        'repayments': {
+            'count': len(repayments),
+            'approved_count': len(approved_repayments),
+            'approved_amount': _sum(approved_repayments['repay_amount']),
+            'collected_by_month': _by_month(approved_repayments, 'paid_at', 'repay_amount'),
+        },
+        'balances': {
+            'total_loan': str(total_loan),
+            'total_paid': str(total_paid),
+            'outstanding': str(total_loan - total_paid),
+        },
+    }
+    _portfolio_cache[directory] = (mtime, summary)
+    return summary
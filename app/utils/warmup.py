@@ -0,0 +1,58 @@
+import time
+import logging
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+from app.extensions import db
+from app.models import User, LoanBalance
+from .jwt import is_token_blacklisted
+
+logger = logging.getLogger('trustlend.warmup')
+
+
+def _prime_pool(engine, connections):
+    """Open up to ``connections`` pooled connections and hand them back."""
+    size = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+    opened = []
+    try:
+        for _ in range(max(1, min(connections, size))):
+            connection = engine.connect()
+            connection.execute(text('SELECT 1'))
+            opened.append(connection)
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+def warm_up(app, connections=None):
+    """Do the first-request work of a worker before it accepts traffic.
+
+    Configures the ORM mappers, opens up to ``connections`` pooled
+    connections on every bind, runs the lookups most requests make so their
+    compiled SQL is cached, and builds the swagger spec. A database that is
+    not reachable or migrated yet is logged, not raised. Returns a report.
+    """
+    started = time.perf_counter()
+    connections = connections or app.config.get('WARMUP_CONNECTIONS', 2)
+    report = {}
+    with app.app_context():
+        configure_mappers()
+        try:
+            for bind, engine in db.engines.items():
+                report[bind or 'default'] = _prime_pool(engine, connections)
+            is_token_blacklisted('warm-up')
+            db.session.get(User, 0)
+            db.session.scalars(db.select(LoanBalance).filter_by(user_id=0)).first()
+        except SQLAlchemyError as e:
+            logger.warning('worker warm-up skipped the database: %s', e)
+        finally:
+            db.session.remove()
+
+        if app.config.get('SWAGGER_ENABLED'):
+            from app.swagger import encoded_swagger_spec
+            encoded_swagger_spec()
+
+    report = {'connections': report, 'seconds': round(time.perf_counter() - started, 3)}
+    logger.info('worker warm-up %s', report)
+    return report
@@ -1,4 +1,7 @@
 from .user import auth
 from .verification import verify
 from .loan import loans
-from .repayment import repayments
\ No newline at end of file
+from .repayment import repayments
+from .system import system
+from .export import exports
+from .analytics import analytics
\ No newline at end of file
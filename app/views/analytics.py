@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+from flask import jsonify, request, Blueprint, current_app
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+from marshmallow import ValidationError
+from sqlalchemy import select
+from app.constants import Status
+from app.extensions import db
+from app.models import PortfolioSummary, PortfolioDaily
+from app.schemas import portfolio_summary_schema, portfolio_daily_schema, portfolio_query_schema
+from app.utils import admin_required, portfolio_summary, portfolio_at_risk, SnapshotUnavailable
+from app.utils.portfolio import SUMMARY_ID, SUMMARY_COUNTERS
+
+analytics = Blueprint('analytics', __name__)
+
+
+class PortfolioView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """Portfolio aggregates from the latest Parquet snapshot. Admin only"""
+        try:
+            summary = portfolio_summary(current_app.config['SNAPSHOT_DIR'])
+        except SnapshotUnavailable as e:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_503_SERVICE_UNAVAILABLE,
+                'error': 'Snapshot Unavailable',
+                'message': str(e)
+            }), Status.HTTP_503_SERVICE_UNAVAILABLE
+
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Portfolio summary retrieved!',
+            'data': summary
+        }), Status.HTTP_200_OK
+
+portfolio_view = PortfolioView.as_view('portfolio_view')
+analytics.add_url_rule('/portfolio', view_func=portfolio_view, methods=['GET'])
+
+
+
+class PortfolioSummaryView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """Live portfolio totals and the last ``days`` daily rows. Admin only"""
+        try:
+            args = portfolio_query_schema.load(request.args)
+        except ValidationError as e:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'errors': e.messages,
+                'message': 'Validation error with query parameters'
+            }), Status.HTTP_400_BAD_REQUEST
+
+        # Both reads are primary key lookups, whatever the size of the portfolio
+        summary = db.session.get(PortfolioSummary, SUMMARY_ID) or PortfolioSummary(**dict.fromkeys(SUMMARY_COUNTERS, 0))
+        daily = db.session.scalars(
+            select(PortfolioDaily)
+            .where(PortfolioDaily.day > date.today() - timedelta(days=args['days']))
+            .order_by(PortfolioDaily.day)
+        ) if args['days'] else []
+
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Portfolio summary retrieved!',
+            'data': {
+                'summary': portfolio_summary_schema.dump(summary),
+                'daily': portfolio_daily_schema.dump(daily),
+            }
+        }), Status.HTTP_200_OK
+
+portfolio_summary_view = PortfolioSummaryView.as_view('portfolio_summary_view')
+analytics.add_url_rule('/summary', view_func=portfolio_summary_view, methods=['GET'])
+
+
+
+class DelinquencyView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """Portfolio at risk from the last delinquency run. Admin only"""
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Portfolio at risk retrieved!',
+            'data': portfolio_at_risk()
+        }), Status.HTTP_200_OK
+
+delinquency_view = DelinquencyView.as_view('delinquency_view')
+analytics.add_url_rule('/delinquency', view_func=delinquency_view, methods=['GET'])
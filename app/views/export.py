@@ -0,0 +1,45 @@
+from datetime import date
+from flask import jsonify, Blueprint, request, current_app, stream_with_context
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+from app.constants import Status
+from app.schemas import export_query_schema
+from app.utils import admin_required, EXPORTS, EXPORT_FORMATS, stream_export
+
+exports = Blueprint('exports', __name__)
+
+
+class ExportView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def get(self, table):
+        """Stream a full table as CSV or NDJSON, optionally limited to a date range. Admin only"""
+        if table not in EXPORTS:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_404_NOT_FOUND,
+                'error': 'Export Not Found',
+                'message': f"Exports are available for: {', '.join(EXPORTS)}"
+            }), Status.HTTP_404_NOT_FOUND
+
+        errors = export_query_schema.validate(request.args)
+        if errors:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'errors': errors,
+                'message': 'Validation error with query parameters'
+            }), Status.HTTP_400_BAD_REQUEST
+
+        query = export_query_schema.load(request.args)
+        fmt = query['format']
+        filename = f'{table}-{date.today().isoformat()}.{fmt}'
+        return current_app.response_class(
+            stream_with_context(stream_export(table, fmt, query['start'], query['end'])),
+            mimetype=EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
+
+export_view = ExportView.as_view('export_view')
+exports.add_url_rule('/<string:table>', view_func=export_view, methods=['GET'])
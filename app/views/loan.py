@@ -1,13 +1,23 @@
+import io
+import csv
 from datetime import datetime
 from flask import jsonify, request, Blueprint
 from flask.views import MethodView
-from app.models import Loan, RequestLoan, User, LoanBalance
+from sqlalchemy import select, tuple_
+from app.models import Loan, RequestLoan, User, LoanBalance, Verification, LedgerEntryKind
 from app.extensions import db
-from decimal import Decimal
-from app.utils import admin_required
+from app.utils import (
+    admin_required, requested_fields, dump_selected, load_only_columns, import_loan_requests,
+    approve_loan_requests, keyset_page, record_portfolio_change, loan_deltas, record_entries,
+    balance_at,
+)
 from app.constants import Status
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from app.schemas import loan_schema, request_loan_schema, edit_request_loan_schema, loan_balance_schema
+from marshmallow import ValidationError
+from app.schemas import (
+    loan_schema, request_loan_schema, edit_request_loan_schema, loan_balance_schema, request_loan_import_schema,
+    approve_batch_schema, pending_request_loan_query_schema, balance_at_query_schema,
+)
 
 loans = Blueprint('loans', __name__)
 
@@ -16,7 +26,19 @@ class RequestLoanView(MethodView):
     @jwt_required()
     def get(self, request_loan_id):
         """Retrieve Request Loan by ID"""
-        request_loan = db.session.get(RequestLoan, request_loan_id)
+        try:
+            fields = requested_fields(request_loan_schema)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'error': 'Invalid Fields',
+                'message': str(e)
+            }), Status.HTTP_400_BAD_REQUEST
+
+        request_loan = db.session.get(
+            RequestLoan, request_loan_id, options=load_only_columns(RequestLoan, fields)
+        )
         if request_loan is None:
             return jsonify({
                 'success': False,
@@ -25,7 +47,7 @@ class RequestLoanView(MethodView):
                 'message': 'No requested loan with the given ID'
             }), Status.HTTP_404_NOT_FOUND
         
-        serialized_data = request_loan_schema.dump(request_loan)
+        serialized_data = dump_selected(request_loan_schema, request_loan, fields)
         return jsonify({
             'success': True,
             'status': Status.HTTP_200_OK,
@@ -140,6 +162,11 @@ class RequestLoanView(MethodView):
             load_data = edit_request_loan_schema.load(data, instance=request_loan, partial=True)
             db.session.add(load_data)
 
+            # A borrower without open loans becomes active with this one
+            has_open_loan = db.session.scalar(
+                select(Loan.id).where(Loan.user_id == request_loan.user_id, Loan.paid_off.is_(False)).limit(1)
+            ) is not None
+
             # Create the loan and link it to the request
             loan = Loan(
                 amount=request_loan.amount,
@@ -148,19 +175,20 @@ class RequestLoanView(MethodView):
                 request_loan_id=request_loan.id
             )
             db.session.add(loan)
+            db.session.flush()
+            record_entries([{
+                'user_id': loan.user_id, 'kind': LedgerEntryKind.DISBURSEMENT, 'amount': loan.amount, 'loan_id': loan.id,
+            }])
 
-            # Calculate interest
-            interest = request_loan.amount * Decimal(RequestLoan.INTEREST_RATE)
-
-            # Add loan to LoanBalance
+            # Add the principal to LoanBalance; interest is posted daily by the accrual job
             loan_balance = LoanBalance.query.filter_by(user_id=request_loan.user_id).first()
             if loan_balance:
-                loan_balance.total_loan += request_loan.amount + interest
+                loan_balance.total_loan += request_loan.amount
                 loan_balance.last_updated = datetime.now()
             else:
                 loan_balance = LoanBalance(
                     user_id=request_loan.user_id,
-                    total_loan=request_loan.amount + interest,
+                    total_loan=request_loan.amount,
                     total_paid=0.00,
                     last_updated=datetime.now()
                 )
@@ -171,6 +199,11 @@ class RequestLoanView(MethodView):
             user.active_loan = True
             db.session.add(user)
 
+            # Keep the portfolio totals in step
+            record_portfolio_change(loan.start_at.date(), **loan_deltas(
+                [(request_loan.amount, request_loan.amortization_rate)], new_borrowers=0 if has_open_loan else 1
+            ))
+
             # Commit the transaction
             db.session.commit()
 
@@ -205,11 +238,178 @@ loans.add_url_rule('request', view_func=request_loan_view, methods=['POST'])
 loans.add_url_rule('request/<int:request_loan_id>', view_func=request_loan_view, methods=['GET', 'PATCH'])
 
 
+class RequestLoanImportView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def post(self):
+        """Bulk create loan requests from a CSV upload. Admin Only"""
+        upload = request.files.get('file')
+        if upload is not None:
+            stream = upload.stream
+        elif request.mimetype == 'text/csv':
+            stream = io.BufferedReader(request.stream)
+        else:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'error': 'No CSV Provided',
+                'message': 'Upload a CSV as the "file" form field or send it as a text/csv body'
+            }), Status.HTTP_400_BAD_REQUEST
+
+        lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+        try:
+            report = import_loan_requests(lines, request_loan_import_schema, dry_run=dry_run)
+        except (ValueError, csv.Error) as e:     # UnicodeDecodeError is a ValueError
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'error': 'Invalid CSV',
+                'message': str(e)
+            }), Status.HTTP_400_BAD_REQUEST
+
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': f"{report['imported']} loan requests imported, {report['failed']} rows failed",
+            'data': report
+        }), Status.HTTP_200_OK
+
+request_loan_import_view = RequestLoanImportView.as_view('request_loan_import_view')
+loans.add_url_rule('request/import', view_func=request_loan_import_view, methods=['POST'])
+
+
+class ApproveBatchView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def post(self):
+        """Approve many loan requests in one transaction. Admin Only"""
+        data = request.get_json()
+        errors = approve_batch_schema.validate(data)
+        if errors:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'errors': errors,
+                'message': 'Validation error with request data'
+            }), Status.HTTP_400_BAD_REQUEST
+
+        try:
+            outcomes = approve_loan_requests(data['ids'])
+        except Exception as e:
+            db.session.rollback()   # Roll back the transaction on error
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_500_INTERNAL_SERVER_ERROR,
+                'error': str(e),
+                'message': 'An error occurred while processing the request',
+            }), Status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        approved = sum(outcome['status'] == 'approved' for outcome in outcomes.values())
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': f'{approved} of {len(outcomes)} loan requests approved',
+            'data': [{'id': request_loan_id, **outcome} for request_loan_id, outcome in outcomes.items()]
+        }), Status.HTTP_200_OK
+
+approve_batch_view = ApproveBatchView.as_view('approve_batch_view')
+loans.add_url_rule('request/approve-batch', view_func=approve_batch_view, methods=['POST'])
+
+
+class PendingRequestLoanView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """List pending loan requests oldest first, with the requesting user. Admin Only"""
+        errors = pending_request_loan_query_schema.validate(request.args)
+        if errors:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'errors': errors,
+                'message': 'Validation error with query parameters'
+            }), Status.HTTP_400_BAD_REQUEST
+        args = pending_request_loan_query_schema.load(request.args)
+
+        # One round trip: the pending index drives the scan, the user is joined in and only
+        # their latest verification is read, so a user with several never repeats a request
+        is_verified = (
+            select(Verification.is_verified)
+            .where(Verification.user_id == RequestLoan.user_id)
+            .order_by(Verification.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                RequestLoan.id, RequestLoan.amount, RequestLoan.amortization_rate, RequestLoan.date_requested,
+                User.id.label('user_id'), User.full_name, User.email, is_verified.label('is_verified'),
+            )
+            .join(User, User.id == RequestLoan.user_id)
+            .where(RequestLoan.approval.is_(False))
+            .order_by(RequestLoan.date_requested, RequestLoan.id)
+            .limit(args['limit'] + 1)
+        )
+        if args['after'] is not None:
+            query = query.where(tuple_(RequestLoan.date_requested, RequestLoan.id) > args['after'])
+        if 'min_amount' in args:
+            query = query.where(RequestLoan.amount >= args['min_amount'])
+        if 'max_amount' in args:
+            query = query.where(RequestLoan.amount <= args['max_amount'])
+        if 'amortization_rate' in args:
+            query = query.where(RequestLoan.amortization_rate == args['amortization_rate'])
+
+        rows, next_cursor = keyset_page(
+            db.session.execute(query).all(), args['limit'], lambda row: (row.date_requested, row.id)
+        )
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Pending loan requests retrieved!',
+            'data': {
+                'requests': [{
+                    'id': row.id,
+                    'amount': str(row.amount),
+                    'amortization_rate': row.amortization_rate.value,
+                    'date_requested': row.date_requested.isoformat(),
+                    'user': {
+                        'id': row.user_id,
+                        'full_name': row.full_name,
+                        'email': row.email,
+                        'is_verified': row.is_verified,
+                    },
+                } for row in rows],
+                'next': next_cursor,
+            }
+        }), Status.HTTP_200_OK
+
+pending_request_loan_view = PendingRequestLoanView.as_view('pending_request_loan_view')
+loans.add_url_rule('request/pending', view_func=pending_request_loan_view, methods=['GET'])
+
+
 
 class LoanView(MethodView):
 
     @jwt_required()
     def get(self, loan_id=None):
+        try:
+            fields = requested_fields(loan_schema)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'error': 'Invalid Fields',
+                'message': str(e)
+            }), Status.HTTP_400_BAD_REQUEST
+
         if loan_id:
             user_id = get_jwt_identity()
             user = db.session.get(User, user_id)
@@ -223,7 +423,8 @@ class LoanView(MethodView):
                 }), Status.HTTP_404_NOT_FOUND
 
             # Ensure user accesses only their loan
-            loan = Loan.query.filter_by(id=loan_id, user_id=user_id).first()
+            loan = Loan.query.options(*load_only_columns(Loan, fields)) \
+                .filter_by(id=loan_id, user_id=user_id).first()
 
             if loan is None:
                 return jsonify({
@@ -234,7 +435,7 @@ class LoanView(MethodView):
                 }), Status.HTTP_404_NOT_FOUND
             
             # serialize data
-            loan_data = loan_schema.dump(loan)
+            loan_data = dump_selected(loan_schema, loan, fields)
             return jsonify({
                 'success': True,
                 'status': Status.HTTP_200_OK,
@@ -261,7 +462,8 @@ class LoanView(MethodView):
             per_page = request.args.get('per_page', 5, type=int)
 
             # Paginate loans
-            paginated_loans = Loan.query.filter_by(user_id=user_id).paginate(page=page, per_page=per_page, error_out=False)
+            paginated_loans = Loan.query.options(*load_only_columns(Loan, fields)) \
+                .filter_by(user_id=user_id).paginate(page=page, per_page=per_page, error_out=False)
             
             if not paginated_loans.items:
                 return jsonify({
@@ -272,7 +474,7 @@ class LoanView(MethodView):
                 }), Status.HTTP_404_NOT_FOUND
 
             # Serialize loans
-            serialized_data = loan_schema.dump(paginated_loans, many=True)
+            serialized_data = dump_selected(loan_schema, paginated_loans, fields, many=True)
             return jsonify({
                 'success': True,
                 'status': Status.HTTP_200_OK,
@@ -300,6 +502,16 @@ class LoanBalanceAPI(MethodView):
 
     @jwt_required()
     def get(self):
+        try:
+            fields = requested_fields(loan_balance_schema)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'error': 'Invalid Fields',
+                'message': str(e)
+            }), Status.HTTP_400_BAD_REQUEST
+
         user_id = get_jwt_identity()
         user = db.session.get(User, user_id)
 
@@ -311,10 +523,11 @@ class LoanBalanceAPI(MethodView):
                 'message': 'No user found with the given ID',
             }), Status.HTTP_404_NOT_FOUND    
 
-        loan_balance = LoanBalance.query.filter_by(user_id=user_id).first() 
+        loan_balance = LoanBalance.query.options(*load_only_columns(LoanBalance, fields)) \
+            .filter_by(user_id=user_id).first()
 
         # serialize
-        loan_data = loan_balance_schema.dump(loan_balance)
+        loan_data = dump_selected(loan_balance_schema, loan_balance, fields)
         return jsonify({
             'success': True,
             'status': Status.HTTP_200_OK,
@@ -325,3 +538,37 @@ class LoanBalanceAPI(MethodView):
     
 loan_balance_view = LoanBalanceAPI.as_view('loan_balance_view')
 loans.add_url_rule('/balance', view_func=loan_balance_view, methods=['GET'])
+
+
+class LoanBalanceAtAPI(MethodView):
+
+    @jwt_required()
+    def get(self):
+        """The borrower's balance at a past time, read from the ledger"""
+        try:
+            args = balance_at_query_schema.load(request.args)
+        except ValidationError as e:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'errors': e.messages,
+                'message': 'Validation error with query parameters'
+            }), Status.HTTP_400_BAD_REQUEST
+
+        # Latest snapshot before `at` plus the entries after it
+        total_loan, total_paid = balance_at(get_jwt_identity(), args['at'])
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Loan Balance Retrieved!',
+            'data': {
+                'at': args['at'].isoformat(),
+                'total_loan': str(total_loan),
+                'total_paid': str(total_paid),
+                'outstanding': str(total_loan - total_paid),
+            }
+        }), Status.HTTP_200_OK
+
+loan_balance_at_view = LoanBalanceAtAPI.as_view('loan_balance_at_view')
+loans.add_url_rule('/balance/at', view_func=loan_balance_at_view, methods=['GET'])
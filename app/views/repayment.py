@@ -3,7 +3,7 @@ from flask.views import MethodView
 from app.models import Repayment, User, Loan, LoanBalance
 from app.extensions import db
 from app.constants import Status
-from app.utils import make_payment, verify_payment, update_loan_records
+from app.utils import make_payment, verify_payment, update_loan_records, use_primary
 from app.schemas import repayment_schema
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
@@ -94,6 +94,7 @@ class VerifyPaystackPayment(MethodView):
     """GET user verified payment to Paystack API"""
 
     @jwt_required()
+    @use_primary    # the balance read here is written back by update_loan_records
     def get(self, reference):
         """Verify Paystack Payment"""
         user_id = get_jwt_identity()
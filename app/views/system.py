@@ -0,0 +1,173 @@
+from flask import jsonify, Blueprint, request, current_app
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.constants import Status
+from app.schemas import profiler_settings_schema
+from app.utils import (
+    admin_required, engine_statuses, routing_status, request_profiler, memory_snapshots,
+    make_profile_token,
+)
+
+system = Blueprint('system', __name__)
+
+
+class DatabaseStatusView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """Connection pool usage per database bind and the primary/replica split. Admin only"""
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Database status retrieved!',
+            'data': {
+                'pools': engine_statuses(),
+                'routing': routing_status(),
+            }
+        }), Status.HTTP_200_OK
+
+database_status_view = DatabaseStatusView.as_view('database_status_view')
+system.add_url_rule('/db', view_func=database_status_view, methods=['GET'])
+
+
+class ProfilerView(MethodView):
+    """Sampled cProfile results of the worker that serves the request"""
+
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """List recorded profiles, newest first. Admin only"""
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Profiles retrieved!',
+            'data': {
+                'sample_rate': request_profiler.sample_rate,
+                'profiles': list(reversed(request_profiler.profiles)),
+            }
+        }), Status.HTTP_200_OK
+
+    @jwt_required()
+    @admin_required
+    def put(self):
+        """Set the share of requests to profile. Admin only"""
+        data = request.get_json()
+        errors = profiler_settings_schema.validate(data)
+        if errors:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'errors': errors,
+                'message': 'Validation error with request data'
+            }), Status.HTTP_400_BAD_REQUEST
+
+        request_profiler.sample_rate = profiler_settings_schema.load(data)['sample_rate']
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Profiler updated!',
+            'data': {'sample_rate': request_profiler.sample_rate}
+        }), Status.HTTP_200_OK
+
+    @jwt_required()
+    @admin_required
+    def delete(self):
+        """Stop sampling and clear recorded profiles. Admin only"""
+        request_profiler.clear()
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Profiler stopped and cleared!',
+        }), Status.HTTP_200_OK
+
+profiler_view = ProfilerView.as_view('profiler_view')
+system.add_url_rule('/profiler', view_func=profiler_view, methods=['GET', 'PUT', 'DELETE'])
+
+
+class ProfileTokenView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def post(self):
+        """Issue a signed X-Profile-Token that profiles any request carrying it. Admin only"""
+        if not current_app.config.get('SECRET_KEY'):
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_503_SERVICE_UNAVAILABLE,
+                'error': None,
+                'message': 'SECRET_KEY is not configured'
+            }), Status.HTTP_503_SERVICE_UNAVAILABLE
+
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_201_CREATED,
+            'error': None,
+            'message': 'Profile token created!',
+            'data': {
+                'header': 'X-Profile-Token',
+                'token': make_profile_token(get_jwt_identity()),
+                'expires_in': current_app.config['PROFILER_TOKEN_MAX_AGE'],
+            }
+        }), Status.HTTP_201_CREATED
+
+profile_token_view = ProfileTokenView.as_view('profile_token_view')
+system.add_url_rule('/profiler/token', view_func=profile_token_view, methods=['POST'])
+
+
+class TracemallocView(MethodView):
+    """tracemalloc snapshots of the worker that serves the request"""
+
+    @jwt_required()
+    @admin_required
+    def post(self):
+        """Take a snapshot, starting tracing on first use. Admin only"""
+        summary = memory_snapshots.take(current_app.config['TRACEMALLOC_FRAMES'])
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_201_CREATED,
+            'error': None,
+            'message': 'Snapshot taken!',
+            'data': summary
+        }), Status.HTTP_201_CREATED
+
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """Diff the last two snapshots. Admin only"""
+        limit = request.args.get('limit', 25, type=int)
+        diff = memory_snapshots.diff(limit)
+        if diff is None:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_404_NOT_FOUND,
+                'error': None,
+                'message': 'Take two snapshots before diffing.'
+            }), Status.HTTP_404_NOT_FOUND
+
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Snapshot diff retrieved!',
+            'data': diff
+        }), Status.HTTP_200_OK
+
+    @jwt_required()
+    @admin_required
+    def delete(self):
+        """Stop tracing and drop snapshots. Admin only"""
+        memory_snapshots.stop()
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Tracing stopped!',
+        }), Status.HTTP_200_OK
+
+tracemalloc_view = TracemallocView.as_view('tracemalloc_view')
+system.add_url_rule('/tracemalloc', view_func=tracemalloc_view, methods=['GET', 'POST', 'DELETE'])
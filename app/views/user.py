@@ -4,6 +4,7 @@ from app.schemas import user_register_schema, user_login_schema, user_update_sch
 from app.models import User, TokenBlacklist, LoanBalance
 from app.extensions import db
 from app.constants import Status
+from app.utils import requested_resources, dump_selected, load_only_columns, retry_on_lock
 from werkzeug.security import check_password_hash
 from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required, create_access_token, create_refresh_token
 
@@ -115,8 +116,22 @@ class UserView(MethodView):
     @jwt_required()
     def get(self):
         """Get user details"""
+        try:
+            resources = requested_resources(user=user_register_schema, loan=loan_balance_schema)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'error': 'Invalid Fields',
+                'message': str(e)
+            }), Status.HTTP_400_BAD_REQUEST
+
+        if resources is None:
+            resources = {'user': None, 'loan': None}
+
         user_id = get_jwt_identity()
-        user = db.session.get(User, user_id)
+        user_fields = resources.get('user', ())
+        user = db.session.get(User, user_id, options=load_only_columns(User, user_fields))
         if user is None:
             return jsonify({
                 'success': False,
@@ -124,21 +139,24 @@ class UserView(MethodView):
                 'error': 'User Not Found',
                 'message': 'No user found with the given ID',
             }), Status.HTTP_404_NOT_FOUND
-        
-        # Query for loan balance
-        loan_balance = LoanBalance.query.filter_by(user_id=user_id).first()
 
-        user_data = user_register_schema.dump(user) 
-        loan_data = loan_balance_schema.dump(loan_balance)
+        data = {}
+        if 'user' in resources:
+            data['user'] = dump_selected(user_register_schema, user, user_fields)
+
+        # Only query the loan balance when it was asked for
+        if 'loan' in resources:
+            loan_fields = resources['loan']
+            loan_balance = LoanBalance.query.options(*load_only_columns(LoanBalance, loan_fields)) \
+                .filter_by(user_id=user_id).first()
+            data['loan'] = dump_selected(loan_balance_schema, loan_balance, loan_fields)
+
         return jsonify({
             'success': True,
             'status': Status.HTTP_200_OK,
             'error': None,
             'message': 'User fetched successfully',
-            'data': {
-                'user': user_data,
-                'loan': loan_data
-            }
+            'data': data
         }), Status.HTTP_200_OK
     
     @jwt_required()
@@ -184,6 +202,7 @@ auth.add_url_rule('/detail', view_func=user_view, methods=['GET', 'PUT'])
 class LogoutView(MethodView):
 
     @jwt_required()
+    @retry_on_lock
     def post(self): 
         """Logout user and invalidate the token"""
 
@@ -5,8 +5,9 @@ from app.constants import Status
 from app.extensions import db
 from app.models import User, Verification
 from marshmallow import ValidationError
-from app.utils import admin_required
-from app.schemas import verification_schema
+from sqlalchemy import select, tuple_, update
+from app.utils import admin_required, keyset_page
+from app.schemas import verification_schema, bulk_verify_schema, verification_queue_query_schema
 
 verify = Blueprint('verify', __name__)
 
@@ -116,7 +117,7 @@ class VerificationView(MethodView):
                 'message': 'User has not requested for verification.'
             }), Status.HTTP_404_NOT_FOUND
         
-        if data.get('is_verified') == False:
+        if data.get('is_verified') is not True:
             return jsonify({
                 'success': False,
                 'status': Status.HTTP_400_BAD_REQUEST,
@@ -134,7 +135,7 @@ class VerificationView(MethodView):
             }), Status.HTTP_208_ALREADY_REPORTED
         
         # Approve verification
-        verification.is_verified = data.get('is_verified')
+        verification.is_verified = True
         db.session.commit()
 
         # serialize verification data
@@ -154,3 +155,96 @@ verify.add_url_rule('', view_func=verify_view, methods=['GET', 'POST'])
 verify.add_url_rule('/<int:user_id>', view_func=verify_view, methods=['PATCH'])
 
 
+class VerificationQueueView(MethodView):
+
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """List unverified users oldest first. Admins only"""
+        errors = verification_queue_query_schema.validate(request.args)
+        if errors:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'errors': errors,
+                'message': 'Validation error with query parameters'
+            }), Status.HTTP_400_BAD_REQUEST
+        args = verification_queue_query_schema.load(request.args)
+
+        query = (
+            select(
+                Verification.id, Verification.address, Verification.bvn, Verification.date_verified,
+                User.id.label('user_id'), User.full_name, User.email,
+            )
+            .join(User, User.id == Verification.user_id)
+            .where(Verification.is_verified.is_(False))
+            .order_by(Verification.date_verified, Verification.id)
+            .limit(args['limit'] + 1)
+        )
+        if args['after'] is not None:
+            query = query.where(tuple_(Verification.date_verified, Verification.id) > args['after'])
+
+        rows, next_cursor = keyset_page(
+            db.session.execute(query).all(), args['limit'], lambda row: (row.date_verified, row.id)
+        )
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': 'Verification queue retrieved!',
+            'data': {
+                'verifications': [{
+                    'id': row.id,
+                    'address': row.address,
+                    'bvn': row.bvn,
+                    'date_requested': row.date_verified.isoformat(),
+                    'user': {'id': row.user_id, 'full_name': row.full_name, 'email': row.email},
+                } for row in rows],
+                'next': next_cursor,
+            }
+        }), Status.HTTP_200_OK
+
+    @jwt_required()
+    @admin_required
+    def patch(self):
+        """Verify many users with a single UPDATE. Admins only"""
+        data = request.get_json()
+        errors = bulk_verify_schema.validate(data)
+        if errors:
+            return jsonify({
+                'success': False,
+                'status': Status.HTTP_400_BAD_REQUEST,
+                'errors': errors,
+                'message': 'Validation error with request data'
+            }), Status.HTTP_400_BAD_REQUEST
+
+        user_ids = list(dict.fromkeys(data['user_ids']))
+        verified = set(db.session.scalars(
+            update(Verification.__table__)
+            .where(Verification.user_id.in_(user_ids), Verification.is_verified.is_(False))
+            .values(is_verified=True)
+            .returning(Verification.user_id)
+        ))
+        # Only the ids that were not just verified need a second look
+        requested = set()
+        if len(verified) < len(user_ids):
+            requested = set(db.session.scalars(
+                select(Verification.user_id).where(Verification.user_id.in_(set(user_ids) - verified))
+            ))
+        db.session.commit()
+
+        results = [{
+            'user_id': user_id,
+            'status': 'verified' if user_id in verified else
+                      'already_verified' if user_id in requested else 'not_requested',
+        } for user_id in user_ids]
+        return jsonify({
+            'success': True,
+            'status': Status.HTTP_200_OK,
+            'error': None,
+            'message': f'{len(verified)} of {len(user_ids)} users verified',
+            'data': results
+        }), Status.HTTP_200_OK
+
+verification_queue_view = VerificationQueueView.as_view('verification_queue_view')
+verify.add_url_rule('/queue', view_func=verification_queue_view, methods=['GET', 'PATCH'])
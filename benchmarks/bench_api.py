@@ -0,0 +1,279 @@
+"""End-to-end load test of the API over HTTP with a stubbed Paystack.
+
+Boots ``create_app`` against a freshly seeded database, serves it from a
+threaded werkzeug server and drives a weighted mix of sign-ins, reads, loan
+requests with admin approval, and repayment initialization plus
+verification from concurrent clients. Reports req/s and p50/p95/p99 per
+endpoint; ``--json`` saves the run, ``--compare`` diffs two saved runs.
+
+    python -m benchmarks.bench_api --clients 16 --seconds 30 --json before.json
+    python -m benchmarks.bench_api --compare before.json after.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from unittest import mock
+import requests
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+from app import create_app
+from app.extensions import db
+from app.models import User, Loan, RequestLoan, LoanBalance, Verification
+from app.environment import TestingEnvironment, engine_options
+from .common import latency_summary, write_results
+
+PASSWORD = 'benchpass123'
+
+# Relative weight of each client action; approval and verification follow
+# their request/initialization step rather than being picked on their own.
+WORKLOAD = {
+    'sign_in': 1,
+    'user_detail': 3,
+    'loan_balance': 4,
+    'loan_list': 4,
+    'verification': 2,
+    'request_loan': 2,
+    'repayment': 2,
+}
+
+
+def make_config(url):
+    class BenchEnvironment(TestingEnvironment):
+        TESTING = False
+        SECRET_KEY = 'bench-secret'
+        JWT_SECRET_KEY = 'bench-jwt-secret'
+        JWT_ACCESS_TOKEN_EXPIRES = False
+        SQLALCHEMY_DATABASE_URI = url
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(url)
+    return BenchEnvironment
+
+
+class _PaystackResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class StubPaystack:
+    """Stands in for the ``requests`` module used by ``app.utils.paystack``."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def post(self, url, headers=None, json=None):
+        time.sleep(self.latency)
+        return _PaystackResponse({'status': True, 'data': {
+            'authorization_url': f"https://checkout.paystack.test/{json['reference']}",
+            'reference': json['reference'],
+        }})
+
+    def get(self, url, headers=None):
+        time.sleep(self.latency)
+        return _PaystackResponse({'status': True, 'data': {
+            'status': 'success', 'reference': url.rsplit('/', 1)[-1],
+        }})
+
+
+def seed(users):
+    """One admin plus ``users`` verified borrowers, each with an active loan."""
+    db.drop_all()
+    db.create_all()
+    password = generate_password_hash(PASSWORD)
+    now = datetime.now()
+
+    db.session.add(User(id=1, full_name='Admin', email='admin@example.com', password=password, is_admin=True))
+    for i in range(2, users + 2):
+        db.session.add(User(
+            id=i, full_name=f'User {i}', email=f'user{i}@example.com',
+            password=password, active_loan=True,
+        ))
+        db.session.add(Verification(user_id=i, address='1 Bench Street', bvn='12345678901', is_verified=True))
+        db.session.add(RequestLoan(
+            id=i, user_id=i, amount=1000000, interest_rate=RequestLoan.INTEREST_RATE,
+            approval=True, amortization_rate='MONTHLY', date_requested=now,
+        ))
+        db.session.add(Loan(id=i, user_id=i, amount=1000000, request_loan_id=i, start_at=now))
+        db.session.add(LoanBalance(user_id=i, total_loan=1050000, total_paid=0, last_updated=now))
+    db.session.commit()
+
+
+class Client:
+    """One virtual borrower issuing requests and timing them per endpoint."""
+
+    def __init__(self, base_url, user_id, headers, admin_headers, rng):
+        self.base_url = base_url
+        self.user_id = user_id
+        self.headers = headers
+        self.admin_headers = admin_headers
+        self.rng = rng
+        self.http = requests.Session()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def call(self, name, method, path, headers, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, headers=headers, **kwargs)
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 'error'
+        self.latencies[name].append(time.perf_counter() - started)
+        self.statuses[name][status] += 1
+        return response
+
+    def sign_in(self):
+        self.call('sign_in', 'POST', '/api/v1/user/sign-in', None,
+                  json={'email': f'user{self.user_id}@example.com', 'password': PASSWORD})
+
+    def user_detail(self):
+        self.call('user_detail', 'GET', '/api/v1/user/detail', self.headers)
+
+    def loan_balance(self):
+        self.call('loan_balance', 'GET', '/api/v1/loan/balance', self.headers)
+
+    def loan_list(self):
+        self.call('loan_list', 'GET', '/api/v1/loan', self.headers)
+
+    def verification(self):
+        self.call('verification', 'GET', '/api/v1/verification', self.headers)
+
+    def request_loan(self):
+        response = self.call('request_loan', 'POST', '/api/v1/loan/request', self.headers,
+                             json={'amount': 5000, 'amortization_rate': 'MONTHLY'})
+        if response is not None and response.status_code == 201:
+            request_loan_id = response.json()['data']['id']
+            self.call('approve_loan', 'PATCH', f'/api/v1/loan/request/{request_loan_id}',
+                      self.admin_headers, json={'approval': True})
+
+    def repayment(self):
+        response = self.call('repayment_init', 'POST', '/api/v1/repayment', self.headers,
+                             json={'repay_amount': 100})
+        if response is not None and response.status_code == 200:
+            reference = response.json()['data']['repayment']['id']
+            self.call('repayment_verify', 'GET', f'/api/v1/repayment/{reference}', self.headers)
+
+    def run(self, deadline):
+        actions = list(WORKLOAD)
+        weights = [WORKLOAD[action] for action in actions]
+        while time.perf_counter() < deadline:
+            getattr(self, self.rng.choices(actions, weights)[0])()
+        self.http.close()
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = create_app(make_config(url))
+        with app.app_context():
+            seed(args.users)
+            tokens = {i: create_access_token(identity=i) for i in range(1, args.users + 2)}
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+
+        rng = random.Random(args.seed)
+        admin_headers = {'Authorization': f'Bearer {tokens[1]}'}
+        borrowers = rng.sample(range(2, args.users + 2), args.clients)
+        clients = [
+            Client(base_url, user_id, {'Authorization': f'Bearer {tokens[user_id]}'},
+                   admin_headers, random.Random(rng.random()))
+            for user_id in borrowers
+        ]
+
+        with mock.patch('app.utils.paystack.requests', StubPaystack(args.paystack_latency / 1000)):
+            started = time.perf_counter()
+            deadline = started + args.seconds
+            threads = [threading.Thread(target=client.run, args=(deadline,)) for client in clients]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        server.shutdown()
+        with app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+
+    latencies, statuses = defaultdict(list), defaultdict(lambda: defaultdict(int))
+    for client in clients:
+        for name, values in client.latencies.items():
+            latencies[name].extend(values)
+        for name, counts in client.statuses.items():
+            for status, count in counts.items():
+                statuses[name][str(status)] += count
+
+    results = {name: {**latency_summary(values, elapsed), 'statuses': dict(statuses[name])}
+               for name, values in sorted(latencies.items())}
+    results['total'] = latency_summary([v for values in latencies.values() for v in values], elapsed)
+    return results
+
+
+def print_results(results):
+    print(f"{'endpoint':<18} {'count':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for name, result in results.items():
+        print(f"{name:<18} {result['count']:>7} {result['req_per_sec']:>9} {result['p50_ms']:>9} "
+              f"{result['p95_ms']:>9} {result['p99_ms']:>9}  {result.get('statuses', '')}")
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    print(f"{'endpoint':<18} {'req/s':>20} {'p50 ms':>20} {'p95 ms':>20} {'p99 ms':>20}")
+    for name in new['results']:
+        before, after = old['results'].get(name), new['results'][name]
+        if before is None:
+            continue
+        cells = []
+        for key in ('req_per_sec', 'p50_ms', 'p95_ms', 'p99_ms'):
+            a, b = before[key], after[key]
+            change = f'{(b - a) / a * 100:+.1f}%' if a and b is not None else 'n/a'
+            cells.append(f'{a}->{b} {change}'.rjust(20))
+        print(f"{name:<18} {' '.join(cells)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', help='URL of a scratch database; its tables are dropped (default: temp SQLite)')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--paystack-latency', type=float, default=0, help='simulated Paystack latency in ms')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='diff two saved runs and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.clients > args.users:
+        parser.error('--clients cannot exceed --users')
+
+    results = run(args)
+    print_results(results)
+    if args.json:
+        write_results(args.json, results, clients=args.clients, seconds=args.seconds,
+                      users=args.users, paystack_latency_ms=args.paystack_latency,
+                      database=(args.database or 'sqlite').split(':')[0])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Per-request approvals versus one approve-batch call.
+
+Seeds pending loan requests, approves a sample of them one PATCH at a time
+and then approves the rest with a single ``POST /api/v1/loan/request/approve-batch``,
+both through the Flask test client so only server-side cost is measured.
+
+    python -m benchmarks.bench_batch_approval --requests 5000
+    python -m benchmarks.bench_batch_approval --database postgresql://localhost/trustlend_bench
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import insert
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models import User, RequestLoan, LoanBalance
+from app.environment import TestingEnvironment, engine_options
+from .common import write_results
+
+
+def make_config(url):
+    class BenchEnvironment(TestingEnvironment):
+        TESTING = False
+        SECRET_KEY = 'bench-secret'
+        JWT_SECRET_KEY = 'bench-jwt-secret'
+        SQLALCHEMY_DATABASE_URI = url
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(url)
+    return BenchEnvironment
+
+
+def seed(requests):
+    """An admin plus one pending request per borrower; half the borrowers already have a balance."""
+    db.drop_all()
+    db.create_all()
+    now = datetime.now()
+    db.session.execute(insert(User), [
+        {'id': i, 'full_name': f'User {i}', 'email': f'user{i}@example.com', 'password': 'x', 'is_admin': i == 1}
+        for i in range(1, requests + 2)
+    ])
+    db.session.execute(insert(LoanBalance), [
+        {'user_id': i, 'total_loan': 0, 'total_paid': 0} for i in range(2, requests + 2, 2)
+    ])
+    db.session.execute(insert(RequestLoan), [
+        {'id': i, 'user_id': i + 1, 'amount': 10000 + i, 'interest_rate': RequestLoan.INTEREST_RATE,
+         'approval': False, 'amortization_rate': 'MONTHLY', 'date_requested': now}
+        for i in range(1, requests + 1)
+    ])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', help='URL of a scratch database; its tables are dropped (default: temp SQLite)')
+    parser.add_argument('--requests', type=int, default=5000, help='requests approved by the batch call')
+    parser.add_argument('--single', type=int, default=500, help='requests approved one PATCH at a time')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = create_app(make_config(url))
+        client = app.test_client()
+        with app.app_context():
+            seed(args.single + args.requests)
+            headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+
+        started = time.perf_counter()
+        for request_loan_id in range(1, args.single + 1):
+            response = client.patch(f'/api/v1/loan/request/{request_loan_id}', headers=headers, json={'approval': True})
+            assert response.status_code == 200, response.json
+        single_seconds = time.perf_counter() - started
+
+        ids = list(range(args.single + 1, args.single + args.requests + 1))
+        started = time.perf_counter()
+        response = client.post('/api/v1/loan/request/approve-batch', headers=headers, json={'ids': ids})
+        batch_seconds = time.perf_counter() - started
+        assert response.status_code == 200, response.json
+        assert all(result['status'] == 'approved' for result in response.json['data'])
+
+        with app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+
+    single_rate = args.single / single_seconds
+    results = {
+        'single': {'approvals': args.single, 'seconds': round(single_seconds, 3),
+                   'approvals_per_sec': round(single_rate, 1)},
+        'batch': {'approvals': args.requests, 'seconds': round(batch_seconds, 3),
+                  'approvals_per_sec': round(args.requests / batch_seconds, 1)},
+    }
+    print(f"one by one: {single_rate:>10.1f} approvals/s "
+          f"({args.requests / single_rate:.1f}s projected for {args.requests})")
+    print(f"batch:      {args.requests / batch_seconds:>10.1f} approvals/s "
+          f"({batch_seconds:.2f}s for {args.requests})")
+
+    if args.json:
+        write_results(args.json, results, database=(args.database or 'sqlite').split(':')[0])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Bytes on the wire versus CPU cost of response compression.
+
+Builds loan-list pages shaped like ``GET /api/v1/loan`` responses plus the
+swagger document, then compresses each with gzip and brotli at several
+levels.
+
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --json results.json
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from app import create_app
+from app.environment import TestingEnvironment
+from app.utils.compression import compress, brotli
+
+GZIP_LEVELS = [1, 4, 6, 9]
+BROTLI_LEVELS = [1, 4, 6, 11]
+
+
+def loan_page(per_page, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    loans = [{
+        'id': i + 1,
+        'amount': f'{rng.randint(5_000, 2_000_000)}.{rng.randint(0, 99):02d}',
+        'paid_off': rng.random() < 0.3,
+        'start_at': (start + timedelta(minutes=rng.randint(0, 500_000))).isoformat(),
+    } for i in range(per_page)]
+    return {
+        'success': True,
+        'status': 200,
+        'error': None,
+        'message': 'Loans retrieved!',
+        'data': loans,
+        'page_info': {
+            'total': 10_000, 'pages': 10_000 // per_page, 'current_page': 1,
+            'next_page': 2, 'prev_page': None, 'has_next': True,
+            'has_prev': False, 'per_page': per_page,
+        },
+    }
+
+
+def payloads(app):
+    with app.app_context():
+        pages = {
+            f'loans_per_page_{n}': app.json.dumps(loan_page(n)).encode()
+            for n in (5, 20, 100, 500)
+        }
+    pages['swagger'] = app.test_client().get('/swagger.json').data
+    return pages
+
+
+def measure(data, encoding, level, config, min_seconds):
+    config = dict(config, COMPRESS_LEVEL=level, COMPRESS_BR_LEVEL=level)
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        body = compress(data, encoding, config)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+    return len(body), elapsed / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--min-seconds', type=float, default=0.2, help='time spent per measurement')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    app = create_app(TestingEnvironment)
+    results = []
+    for name, data in payloads(app).items():
+        results.append({'payload': name, 'encoding': 'identity', 'level': None,
+                        'bytes': len(data), 'ratio': 1.0, 'us_per_op': 0.0})
+        variants = [('gzip', level) for level in GZIP_LEVELS]
+        if brotli is not None:
+            variants += [('br', level) for level in BROTLI_LEVELS]
+        for encoding, level in variants:
+            size, us = measure(data, encoding, level, app.config, args.min_seconds)
+            results.append({'payload': name, 'encoding': encoding, 'level': level,
+                            'bytes': size, 'ratio': round(len(data) / size, 2),
+                            'us_per_op': round(us, 1)})
+
+    print(f"{'payload':<22}{'encoding':<10}{'level':>6}{'bytes':>10}{'ratio':>8}{'us/op':>10}")
+    for row in results:
+        print(f"{row['payload']:<22}{row['encoding']:<10}{row['level'] or '-':>6}"
+              f"{row['bytes']:>10}{row['ratio']:>8}{row['us_per_op']:>10}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Mixed read/write throughput against SQLite and, optionally, Postgres.
+
+Each thread pushes its own app context and loops over balance lookups and
+balance updates, the statements behind ``LoanBalanceAPI.get`` and
+``update_loan_records``.
+
+    python -m benchmarks.bench_db_throughput
+    python -m benchmarks.bench_db_throughput --postgres postgresql://localhost/trustlend_bench
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from sqlalchemy import update
+from app import create_app
+from app.extensions import db
+from app.models import User, LoanBalance
+from app.environment import TestingEnvironment, engine_options
+from app.utils import pool_status
+
+
+def make_config(url):
+    class BenchEnvironment(TestingEnvironment):
+        TESTING = False
+        SQLALCHEMY_DATABASE_URI = url
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(url)
+    return BenchEnvironment
+
+
+def seed(users):
+    db.drop_all()
+    db.create_all()
+    db.session.add_all(
+        User(id=i, full_name=f'User {i}', email=f'user{i}@example.com', password='x')
+        for i in range(1, users + 1)
+    )
+    db.session.add_all(
+        LoanBalance(user_id=i, total_loan=100000, total_paid=0)
+        for i in range(1, users + 1)
+    )
+    db.session.commit()
+
+
+def worker(app, users, write_ratio, deadline, seed_value, results):
+    rng = random.Random(seed_value)
+    reads = writes = errors = 0
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            user_id = rng.randint(1, users)
+            try:
+                if rng.random() < write_ratio:
+                    db.session.execute(
+                        update(LoanBalance)
+                        .where(LoanBalance.user_id == user_id)
+                        .values(total_paid=LoanBalance.total_paid + 1)
+                    )
+                    db.session.commit()
+                    writes += 1
+                else:
+                    LoanBalance.query.filter_by(user_id=user_id).first()
+                    db.session.rollback()
+                    reads += 1
+            except Exception:
+                db.session.rollback()
+                errors += 1
+        db.session.remove()
+    results.append((reads, writes, errors))
+
+
+def run(name, url, args):
+    app = create_app(make_config(url))
+    with app.app_context():
+        seed(args.users)
+
+    results = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [
+        threading.Thread(target=worker, args=(app, args.users, args.write_ratio, deadline, i, results))
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reads, writes, errors = (sum(column) for column in zip(*results))
+    with app.app_context():
+        pool = pool_status(db.engine)
+        db.drop_all()
+        db.engine.dispose()
+
+    return {
+        'database': name,
+        'threads': args.threads,
+        'ops_per_sec': round((reads + writes) / args.seconds, 1),
+        'reads_per_sec': round(reads / args.seconds, 1),
+        'writes_per_sec': round(writes / args.seconds, 1),
+        'errors': errors,
+        'pool': pool,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postgres', help='URL of a scratch Postgres database; its tables are dropped')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    targets = []
+    with tempfile.TemporaryDirectory() as tmp:
+        targets.append(('sqlite', f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
+        if args.postgres:
+            targets.append(('postgres', args.postgres))
+        results = [run(name, url, args) for name, url in targets]
+
+    for result in results:
+        print(f"{result['database']:<10} {result['ops_per_sec']:>10} ops/s "
+              f"({result['reads_per_sec']} reads/s, {result['writes_per_sec']} writes/s, "
+              f"{result['errors']} errors) pool={result['pool']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Concurrent SQLite write throughput, default journaling versus tuned mode.
+
+Every thread runs the write pattern of ``update_loan_records`` plus the token
+insert of ``LogoutView``: bump a ``LoanBalance``, add a ``TokenBlacklist``
+row and commit. The default mode runs with rollback journaling and no lock
+retries; the tuned mode uses the WAL pragmas and ``retry_on_lock``.
+
+    python -m benchmarks.bench_sqlite_writes --threads 8 --seconds 10
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from sqlalchemy import update
+from app import create_app
+from app.extensions import db
+from app.models import User, LoanBalance, TokenBlacklist
+from app.environment import TestingEnvironment
+from app.utils import retry_on_lock
+
+
+def make_config(url, tuned):
+    class BenchEnvironment(TestingEnvironment):
+        TESTING = False
+        SQLALCHEMY_DATABASE_URI = url
+        SQLITE_TUNED = tuned
+        SQLITE_LOCK_RETRIES = 5 if tuned else 0
+    return BenchEnvironment
+
+
+@retry_on_lock
+def write(user_id):
+    db.session.execute(
+        update(LoanBalance)
+        .where(LoanBalance.user_id == user_id)
+        .values(total_paid=LoanBalance.total_paid + 1)
+    )
+    db.session.add(TokenBlacklist(jti=str(uuid.uuid4())))
+    db.session.commit()
+
+
+def worker(app, users, deadline, seed_value, results):
+    rng = random.Random(seed_value)
+    commits = errors = 0
+    latencies = []
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                write(rng.randint(1, users))
+                commits += 1
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                db.session.rollback()
+                errors += 1
+        db.session.remove()
+    results.append((commits, errors, latencies))
+
+
+def run(mode, tmp, args):
+    url = f"sqlite:///{os.path.join(tmp, f'{mode}.db')}"
+    app = create_app(make_config(url, tuned=mode == 'tuned'))
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            User(id=i, full_name=f'User {i}', email=f'user{i}@example.com', password='x')
+            for i in range(1, args.users + 1)
+        )
+        db.session.add_all(LoanBalance(user_id=i, total_loan=1000, total_paid=0) for i in range(1, args.users + 1))
+        db.session.commit()
+
+    results = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [
+        threading.Thread(target=worker, args=(app, args.users, deadline, i, results))
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        db.engine.dispose()
+
+    commits = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    latencies = sorted(l for r in results for l in r[2])
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else None
+    return {
+        'mode': mode,
+        'threads': args.threads,
+        'commits_per_sec': round(commits / args.seconds, 1),
+        'lock_errors': errors,
+        'p99_ms': round(p99, 2) if p99 is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run(mode, tmp, args) for mode in ('default', 'tuned')]
+
+    for result in results:
+        print(f"{result['mode']:<8} {result['commits_per_sec']:>10} commits/s  "
+              f"{result['lock_errors']:>5} lock errors  p99 {result['p99_ms']} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
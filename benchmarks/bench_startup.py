@@ -0,0 +1,122 @@
+"""Worker startup time and memory of create_app(ProductionEnvironment).
+
+Every run starts a fresh interpreter, as a gunicorn worker would, and times
+the app import plus ``create_app`` and reads the process RSS afterwards.
+The full app is measured against an API-only worker with the admin panel
+and swagger docs switched off (``ADMIN_ENABLED``, ``SWAGGER_ENABLED``).
+``--top`` lists the slowest imports from ``python -X importtime``.
+
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --top 15
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+from .common import write_results
+
+CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+from app import create_app
+from app.environment import ProductionEnvironment
+imported = time.perf_counter()
+app = create_app(ProductionEnvironment)
+created = time.perf_counter()
+
+rss_kb = None
+try:
+    with open('/proc/self/status') as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+except OSError:     # not Linux, fall back to the peak
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'rss_kb': rss_kb,
+    'modules': len(sys.modules),
+}))
+"""
+
+VARIANTS = {
+    'full': {'ADMIN_ENABLED': 'true', 'SWAGGER_ENABLED': 'true'},
+    'api_only': {'ADMIN_ENABLED': 'false', 'SWAGGER_ENABLED': 'false'},
+}
+
+
+def child_env(database_url, variant):
+    return {
+        **os.environ,
+        **VARIANTS[variant],
+        'DATABASE_URL': database_url,
+        'SECRET_KEY': 'bench-secret',
+        'JWT_SECRET_KEY': 'bench-jwt-secret',
+    }
+
+
+def run_once(database_url, variant):
+    output = subprocess.check_output([sys.executable, '-c', CHILD], env=child_env(database_url, variant), text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(database_url, variant, top):
+    """``(self_us, cumulative_us, module)`` of the ``top`` slowest imports by self time."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD], env=child_env(database_url, variant),
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, module = line[len('import time:'):].split('|')
+        rows.append((int(own), int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def summarize(samples):
+    total = [s['import_ms'] + s['create_app_ms'] for s in samples]
+    return {
+        'runs': len(samples),
+        'startup_ms_median': round(statistics.median(total), 1),
+        'startup_ms_min': round(min(total), 1),
+        'import_ms_median': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'create_app_ms_median': round(statistics.median(s['create_app_ms'] for s in samples), 1),
+        'rss_mb_median': round(statistics.median(s['rss_kb'] for s in samples) / 1024, 1),
+        'modules': samples[-1]['modules'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters per variant')
+    parser.add_argument('--top', type=int, default=0, help='also list the N slowest imports of an API-only worker')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run_once(url, 'full')     # warm the bytecode cache
+        for name in VARIANTS:
+            results[name] = summarize([run_once(url, name) for _ in range(args.runs)])
+        slowest = slowest_imports(url, 'api_only', args.top) if args.top else []
+
+    print(f"{'variant':<10}{'startup ms':>12}{'import ms':>11}{'create ms':>11}{'rss MB':>9}{'modules':>9}")
+    for name, row in results.items():
+        print(f"{name:<10}{row['startup_ms_median']:>12}{row['import_ms_median']:>11}"
+              f"{row['create_app_ms_median']:>11}{row['rss_mb_median']:>9}{row['modules']:>9}")
+    if slowest:
+        print(f"\n{'self ms':>8}{'cumulative ms':>15}  module")
+        for own, cumulative, module in slowest:
+            print(f"{own / 1000:>8.1f}{cumulative / 1000:>15.1f}  {module}")
+
+    if args.json:
+        write_results(args.json, results, runs=args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+# Gunicorn loads ./gunicorn.conf.py automatically.
+import os
+import glob
+
+
+def on_starting(server):
+    """Clear metric files left behind by a previous master."""
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, '*.db')):
+            os.remove(path)
+
+
+def post_worker_init(worker):
+    """Warm the worker up before it accepts connections, when WARMUP_ENABLED is set."""
+    app = worker.wsgi
+    config = getattr(app, 'config', {})
+    if config.get('WARMUP_ENABLED'):
+        from app.utils import warm_up
+        warm_up(app)
+
+
+def child_exit(server, worker):
+    """Stop counting a dead worker's live gauges in /metrics."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
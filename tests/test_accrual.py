@@ -0,0 +1,123 @@
+import json
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from sqlalchemy import func
+from app import create_app, db
+from app.models import User, RequestLoan, Loan, LoanBalance, InterestAccrual
+from app.environment import TestingEnvironment
+from app.utils import accrue_interest, loan_interest
+import app.utils.accrual as accrual
+
+START = date(2024, 5, 1)
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def add_loan(amount, rate: str, start: date, paid_off=False) -> int:
+    """One borrower with one loan and its principal-only balance."""
+    user = User(email=f'borrower{User.query.count()}@example.com', password='testpass123', full_name='Borrower')
+    db.session.add(user)
+    db.session.flush()
+    start_at = datetime.combine(start, datetime.min.time()) + timedelta(hours=15)
+    request_loan = RequestLoan(
+        interest_rate=0.05, amount=amount, approval=True, amortization_rate=rate, date_requested=start_at, user_id=user.id,
+    )
+    db.session.add(request_loan)
+    db.session.flush()
+    loan = Loan(amount=amount, user_id=user.id, start_at=start_at, request_loan_id=request_loan.id, paid_off=paid_off)
+    db.session.add_all([loan, LoanBalance(user_id=user.id, total_loan=amount, total_paid=0)])
+    db.session.commit()
+    return loan.id
+
+def balance(loan_id: int) -> Decimal:
+    return LoanBalance.query.filter_by(user_id=db.session.get(Loan, loan_id).user_id).one().total_loan
+
+
+def test_interest_accrues_daily_to_the_agreed_total(app: Flask):
+    monthly = add_loan(1000, 'MONTHLY', START)     # 50.00 over 180 days
+    daily = add_loan(300, 'DAILY', START)          # 15.00 over 30 days
+    repaid = add_loan(500, 'WEEKLY', START, paid_off=True)
+    later = add_loan(700, 'YEARLY', START + timedelta(days=20))
+
+    report = accrue_interest(START, chunk_users=2)
+    assert report['loans_scanned'] == 2
+    assert report['loans_accrued'] == 2
+    assert report['interest'] == '0.78'     # 0.28 (50 / 180, half-even) + 0.50
+    assert balance(monthly) == Decimal('1000.28')
+
+    # Days the job missed are caught up; the daily loan is fully accrued by day 30
+    report = accrue_interest(START + timedelta(days=39))
+    assert report['loans_accrued'] == 3
+    assert db.session.get(Loan, monthly).interest_accrued == Decimal('11.11')     # 40 / 180 of 50.00
+    assert db.session.get(Loan, daily).interest_accrued == loan_interest(300)
+    assert balance(daily) == Decimal('315.00')
+    assert db.session.get(Loan, repaid).interest_accrued == 0
+    assert db.session.get(Loan, later).interest_accrued == Decimal('0.96')     # 20 / 730 of 35.00
+
+    assert accrue_interest(START + timedelta(days=40))['loans_accrued'] == 2
+    ledger = dict(
+        db.session.query(InterestAccrual.loan_id, func.sum(InterestAccrual.amount)).group_by(InterestAccrual.loan_id)
+    )
+    assert {loan.id: loan.interest_accrued for loan in Loan.query if loan.interest_accrued} == ledger
+
+
+def test_accrual_is_idempotent_per_date(app: Flask):
+    loan_id = add_loan(1000, 'WEEKLY', START)
+    accrue_interest(START + timedelta(days=5))
+
+    report = accrue_interest(START + timedelta(days=5))
+    assert report['already_run'] is True
+    assert report['loans_accrued'] == 1
+
+    # An earlier date run late posts nothing, the later run already covered it
+    assert accrue_interest(START + timedelta(days=2))['loans_accrued'] == 0
+    assert InterestAccrual.query.count() == 1
+    assert balance(loan_id) == Decimal('1000') + db.session.get(Loan, loan_id).interest_accrued
+
+
+def test_interrupted_run_resumes(app: Flask, monkeypatch):
+    loan_ids = [add_loan(1000, 'DAILY', START) for _ in range(3)]
+    post_chunk = accrual._post_chunk
+    calls = []
+
+    def failing_post_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError('connection lost')
+        post_chunk(*args)
+
+    monkeypatch.setattr(accrual, '_post_chunk', failing_post_chunk)
+    with pytest.raises(RuntimeError):
+        accrue_interest(START, chunk_users=1)
+    db.session.rollback()
+    monkeypatch.setattr(accrual, '_post_chunk', post_chunk)
+
+    report = accrue_interest(START, chunk_users=1)
+    assert report['already_run'] is False
+    assert report['loans_scanned'] == 2
+    assert report['loans_accrued'] == 3
+    assert [balance(loan_id) for loan_id in loan_ids] == [Decimal('1001.67')] * 3
+
+
+def test_accrue_interest_command(app: Flask):
+    add_loan(1000, 'MONTHLY', START)
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['accrue-interest', '--date', START.isoformat(), '--json'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)['interest'] == '0.28'
+
+    result = runner.invoke(args=['accrue-interest', '--date', START.isoformat()])
+    assert result.exit_code == 0, result.output
+    assert 'already accrued' in result.output
+
@@ -0,0 +1,98 @@
+import pytest
+from datetime import datetime
+from flask import Flask
+from flask.testing import FlaskClient
+from sqlalchemy import insert, inspect
+from app import create_app, db
+from app.models import User, Verification, Loan, RequestLoan, Repayment, TokenBlacklist, LoanBalance
+from app.environment import TestingEnvironment
+
+ROWS = 60
+
+
+class InstrumentedEnvironment(TestingEnvironment):
+    SQL_INSTRUMENTATION = True
+    SQL_TIMING_HEADERS = True
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=InstrumentedEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """Create a test client for the app."""
+    return app.test_client()
+
+@pytest.fixture
+def rows(app: Flask):
+    """A full page of every model, each row with its own borrower."""
+    now = datetime.now()
+    ids = range(1, ROWS + 1)
+    db.session.execute(insert(User), [
+        {'id': i, 'full_name': f'User {i}', 'email': f'user{i}@example.com', 'password': 'x'} for i in ids
+    ])
+    db.session.execute(insert(Verification), [
+        {'user_id': i, 'address': 'Lagos', 'bvn': '12345678901', 'date_verified': now} for i in ids
+    ])
+    db.session.execute(insert(RequestLoan), [
+        {'id': i, 'user_id': i, 'amount': 1000, 'interest_rate': 0.05, 'approval': True,
+         'amortization_rate': 'MONTHLY', 'date_requested': now} for i in ids
+    ])
+    db.session.execute(insert(Loan), [
+        {'user_id': i, 'amount': 1000, 'request_loan_id': i, 'start_at': now} for i in ids
+    ])
+    db.session.execute(insert(LoanBalance), [{'user_id': i, 'total_loan': 1050, 'total_paid': 0} for i in ids])
+    db.session.execute(insert(Repayment), [
+        {'user_id': i, 'repay_amount': 100, 'is_approved': True, 'paid_at': now} for i in ids
+    ])
+    db.session.execute(insert(TokenBlacklist), [{'jti': f'jti-{i}', 'created_at': now} for i in ids])
+    db.session.commit()
+    db.session.expunge_all()
+
+
+# Large tables skip the COUNT(*) and page with Next/Prev only
+@pytest.mark.parametrize('endpoint, max_queries', [
+    ('user', 2),
+    ('verification', 2),
+    ('requestloan', 1),
+    ('loan', 1),
+    ('tokenblacklist', 1),
+    ('loanbalance', 1),
+    ('repayment', 1),
+])
+def test_admin_list_query_count(client: FlaskClient, rows, endpoint: str, max_queries: int):
+    response = client.get(f'/admin/{endpoint}/')
+
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Queries']) <= max_queries
+
+
+def test_admin_list_shows_borrower(client: FlaskClient, rows):
+    response = client.get('/admin/repayment/?page_size=20')
+
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Queries']) == 1
+    assert b'user1@example.com' in response.data
+
+
+def test_admin_disabled(tmp_path):
+    class ApiOnlyEnvironment(TestingEnvironment):
+        ADMIN_ENABLED = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'api.db'}"
+
+    app = create_app(ApiOnlyEnvironment)
+
+    assert app.test_client().get('/admin/').status_code == 404
+    # Schema creation is left to migrations
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+        db.engine.dispose()
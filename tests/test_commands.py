@@ -0,0 +1,69 @@
+import pytest
+from decimal import Decimal
+from flask import Flask
+from sqlalchemy import func
+from app import create_app, db
+from app.environment import TestingEnvironment
+from app.models import User, Loan, RequestLoan, LoanBalance, Repayment
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def runner(app: Flask):
+    return app.test_cli_runner()
+
+
+def snapshot():
+    return (
+        [(u.id, u.email, u.active_loan) for u in User.query.order_by(User.id)],
+        [(r.id, r.amount, r.approval, r.amortization_rate) for r in RequestLoan.query.order_by(RequestLoan.id)],
+        [(r.id, r.repay_amount, r.user_id) for r in Repayment.query.order_by(Repayment.id)],
+    )
+
+
+def test_seed_is_consistent(runner):
+    result = runner.invoke(args=['seed', '--users', '200', '--chunk-size', '64'])
+    assert result.exit_code == 0, result.output
+    assert 'Loaded' in result.output
+
+    assert User.query.count() == 200
+    assert LoanBalance.query.count() == 200
+    assert Loan.query.count() == RequestLoan.query.filter_by(approval=True).count()
+
+    paid = dict(
+        db.session.query(Repayment.user_id, func.sum(Repayment.repay_amount))
+        .filter(Repayment.is_approved.is_(True))
+        .group_by(Repayment.user_id)
+    )
+    for balance in LoanBalance.query:
+        assert balance.total_paid == Decimal(paid.get(balance.user_id, 0)).quantize(Decimal('0.01'))
+
+
+def test_seed_is_deterministic(runner):
+    runner.invoke(args=['seed', '--users', '50', '--seed', '7', '--now', '2024-06-01'])
+    first = snapshot()
+
+    result = runner.invoke(args=['seed', '--users', '50', '--seed', '7', '--now', '2024-06-01', '--chunk-size', '13', '--reset'])
+    assert result.exit_code == 0, result.output
+    assert snapshot() == first
+
+
+def test_seed_appends_after_existing_rows(runner):
+    runner.invoke(args=['seed', '--users', '20'])
+    result = runner.invoke(args=['seed', '--users', '20'])
+
+    assert result.exit_code == 0, result.output
+    assert User.query.count() == 40
+    assert db.session.query(func.count(func.distinct(LoanBalance.user_id))).scalar() == 40
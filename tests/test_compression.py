@@ -0,0 +1,87 @@
+import gzip
+import brotli
+import pytest
+from flask import Flask, Response
+from flask.testing import FlaskClient
+from app import create_app, db
+from app.environment import TestingEnvironment
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+
+    @app.route('/test/stream')
+    def stream():
+        return Response((f'{{"row": {i}}}\n' for i in range(1000)), mimetype='application/x-ndjson')
+
+    @app.route('/test/small')
+    def small():
+        return {'success': True}
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """A test client for the app"""
+    return app.test_client()
+
+
+def test_gzip_negotiated(client: FlaskClient):
+    plain = client.get('/swagger.json')
+    response = client.get('/swagger.json', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert int(response.headers['Content-Length']) < len(plain.data)
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_brotli_preferred(client: FlaskClient):
+    plain = client.get('/swagger.json')
+    response = client.get('/swagger.json', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == plain.data
+
+
+def test_identity_without_accept_encoding(client: FlaskClient):
+    response = client.get('/swagger.json')
+    assert 'Content-Encoding' not in response.headers
+
+    response = client.get('/swagger.json', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_small_response_not_compressed(client: FlaskClient):
+    response = client.get('/test/small', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.json == {'success': True}
+
+
+def test_streamed_response_compressed(client: FlaskClient):
+    response = client.get('/test/stream', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert len(lines) == 1000
+    assert lines[-1] == '{"row": 999}'
+
+
+def test_compression_disabled(app: Flask):
+    class NoCompression(TestingEnvironment):
+        COMPRESS_ENABLED = False
+
+    client = create_app(NoCompression).test_client()
+    response = client.get('/swagger.json', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,132 @@
+import json
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, RequestLoan, Loan, Repayment, LoanDelinquency
+from app.environment import TestingEnvironment
+from app.utils import accrue_interest, run_delinquency
+
+AS_OF = date(2024, 6, 1)
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """Create a test client for the app."""
+    return app.test_client()
+
+def add_loan(user: User, amount, rate: str, days_ago: int, paid_off=False) -> Loan:
+    start = datetime.combine(AS_OF, datetime.min.time()) - timedelta(days=days_ago) + timedelta(hours=9)
+    request_loan = RequestLoan(
+        interest_rate=0.05, amount=amount, approval=True, amortization_rate=rate, date_requested=start, user_id=user.id,
+    )
+    db.session.add(request_loan)
+    db.session.flush()
+    loan = Loan(amount=amount, user_id=user.id, start_at=start, request_loan_id=request_loan.id, paid_off=paid_off)
+    db.session.add(loan)
+    db.session.flush()
+    return loan
+
+@pytest.fixture
+def loans(app: Flask) -> dict:
+    late, current, repaid = [
+        User(email=f'user{i}@example.com', password='testpass123', full_name=f'User {i}') for i in range(3)
+    ]
+    db.session.add_all([late, current, repaid])
+    db.session.flush()
+    loans = {
+        # 1050 owed in 6 monthly instalments of 175; one paid, the second was due on day 60
+        'monthly': add_loan(late, 1000, 'MONTHLY', 100),
+        # 735 owed in 12 weekly instalments of 61.25; the borrower's payments all went to the older loan
+        'weekly': add_loan(late, 700, 'WEEKLY', 10),
+        # 315 owed in 30 daily instalments of 10.50, five due and paid
+        'daily': add_loan(current, 300, 'DAILY', 5),
+        'repaid': add_loan(repaid, 100, 'MONTHLY', 200, paid_off=True),
+    }
+    db.session.add_all([
+        Repayment(user_id=late.id, repay_amount=175, is_approved=True, paid_at=datetime(2024, 3, 20)),
+        Repayment(user_id=late.id, repay_amount=500, is_approved=False, paid_at=datetime(2024, 4, 20)),
+        Repayment(user_id=current.id, repay_amount=60, is_approved=True, paid_at=datetime(2024, 5, 31)),
+    ])
+    db.session.commit()
+    # Interest accrued up to the day before: 27.78, 4.17 and 2.50 on the open loans
+    accrue_interest(AS_OF - timedelta(days=1))
+    return {name: loan.id for name, loan in loans.items()}
+
+
+def test_delinquency_buckets(loans: dict):
+    report = run_delinquency(AS_OF, chunk_users=2)
+
+    assert report['loans'] == 4
+    assert report['open_loans'] == 3
+    assert report['buckets'] == {0: 1, 1: 1, 7: 0, 30: 1, 90: 0}
+
+    rows = {row.loan_id: row for row in LoanDelinquency.query}
+    assert set(rows) == {loans['monthly'], loans['weekly'], loans['daily']}
+    monthly, weekly, daily = rows[loans['monthly']], rows[loans['weekly']], rows[loans['daily']]
+    assert (monthly.days_past_due, monthly.par_bucket) == (40, 30)
+    # Arrears follow the contracted schedule, outstanding the interest accrued so far
+    assert (monthly.arrears, monthly.outstanding) == (Decimal('350.00'), Decimal('852.78'))
+    assert (weekly.days_past_due, weekly.par_bucket, weekly.arrears) == (3, 1, Decimal('61.25'))
+    assert (daily.days_past_due, daily.par_bucket, daily.arrears) == (0, 0, Decimal('0.00'))
+
+
+def test_delinquency_rerun_drops_paid_off_loans(loans: dict):
+    run_delinquency(AS_OF)
+    db.session.get(Loan, loans['weekly']).paid_off = True
+    db.session.commit()
+
+    report = run_delinquency(AS_OF)
+
+    assert report['open_loans'] == 2
+    assert db.session.get(LoanDelinquency, loans['weekly']) is None
+
+
+def test_delinquency_rerun_drops_rows_outside_the_loan_span(loans: dict):
+    run_delinquency(AS_OF)
+    # Only the first borrower has loans left, the others' ids are no longer scanned
+    for name in ('daily', 'repaid'):
+        db.session.delete(db.session.get(Loan, loans[name]))
+    db.session.commit()
+
+    report = run_delinquency(AS_OF, chunk_users=1)
+
+    assert report['open_loans'] == 2
+    assert {row.loan_id for row in LoanDelinquency.query} == {loans['monthly'], loans['weekly']}
+
+
+def test_delinquency_command_and_endpoint(app: Flask, client: FlaskClient, loans: dict):
+    result = app.test_cli_runner().invoke(args=['delinquency', '--as-of', AS_OF.isoformat(), '--json'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)['open_loans'] == 3
+
+    admin = User(email='admin@example.com', password='testpass123', full_name='Admin', is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+    response = client.get('/api/v1/analytics/delinquency', headers={
+        'Authorization': f'Bearer {create_access_token(identity=admin.id)}'
+    })
+
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['as_of'] == AS_OF.isoformat()
+    assert data['loans_by_bucket'] == {'CURRENT': 1, 'PAR1': 1, 'PAR30': 1}
+    # 852.78 + 704.17 of 1799.45 outstanding is at least a day late, 852.78 at least 30 days
+    assert data['outstanding'] == '1799.45'
+    assert data['par1'] == round(1556.95 / 1799.45, 4)
+    assert data['par30'] == round(852.78 / 1799.45, 4)
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Repayment
+from app.environment import TestingEnvironment
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """Create a test client for the app."""
+    return app.test_client()
+
+@pytest.fixture
+def admin(app: Flask) -> User:
+    user = User(email='admin@example.com', password='testpass123', full_name='Admin', is_admin=True)
+    db.session.add(user)
+    db.session.add_all(
+        Repayment(repay_amount=100 + day, is_approved=day % 2 == 0, paid_at=datetime(2024, 3, day, 12), user=user)
+        for day in range(1, 11)
+    )
+    db.session.commit()
+    return user
+
+def auth(user: User) -> dict:
+    return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+
+def test_export_csv(client: FlaskClient, admin: User):
+    response = client.get('/api/v1/export/repayments', headers=auth(admin))
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.is_streamed
+    assert 'attachment; filename="repayments-' in response.headers['Content-Disposition']
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 10
+    assert rows[0] == {
+        'id': '1', 'user_id': str(admin.id), 'repay_amount': '101.00',
+        'is_approved': 'False', 'paid_at': '2024-03-01T12:00:00',
+    }
+
+
+def test_export_ndjson_date_range(client: FlaskClient, admin: User):
+    response = client.get(
+        '/api/v1/export/repayments?format=ndjson&from=2024-03-03&to=2024-03-05', headers=auth(admin)
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['paid_at'] for row in rows] == [
+        '2024-03-03T12:00:00', '2024-03-04T12:00:00', '2024-03-05T12:00:00',
+    ]
+    assert rows[0]['repay_amount'] == '103.00'
+
+
+def test_export_validation(client: FlaskClient, admin: User):
+    response = client.get('/api/v1/export/repayments?format=xml', headers=auth(admin))
+    assert response.status_code == 400
+    assert 'format' in response.json['errors']
+
+    response = client.get('/api/v1/export/repayments?from=2024-03-05&to=2024-03-01', headers=auth(admin))
+    assert response.status_code == 400
+
+    response = client.get('/api/v1/export/user', headers=auth(admin))
+    assert response.status_code == 404
+
+
+def test_export_admin_only(client: FlaskClient, admin: User):
+    user = User(email='user@example.com', password='testpass123', full_name='User')
+    db.session.add(user)
+    db.session.commit()
+
+    response = client.get('/api/v1/export/loans', headers=auth(user))
+    assert response.status_code == 403
+
+
+def test_export_command(app: Flask, admin: User, tmp_path):
+    output = tmp_path / 'repayments.csv'
+    result = app.test_cli_runner().invoke(args=[
+        'export', 'repayments', '--from', '2024-03-09', '--output', str(output),
+    ])
+
+    assert result.exit_code == 0, result.output
+    rows = list(csv.DictReader(output.open()))
+    assert [row['id'] for row in rows] == ['9', '10']
@@ -0,0 +1,198 @@
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import User, RequestLoan, Loan, LoanBalance, Repayment, LedgerEntry, LedgerEntryKind, BalanceSnapshot
+from app.environment import TestingEnvironment
+from app.utils import accrue_interest, update_loan_records, ledger_balances, balance_at
+import app.utils.ledger as ledger
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """Create a test client for the app."""
+    return app.test_client()
+
+@pytest.fixture
+def headers(app: Flask) -> dict:
+    admin = User(email='admin@example.com', password='testpass123', full_name='Admin', is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+
+def request_loans(*amounts) -> list:
+    """Pending monthly requests of ``amounts``, one borrower each."""
+    ids = []
+    for i, amount in enumerate(amounts):
+        user = User(email=f'borrower{i}@example.com', password='testpass123', full_name=f'Borrower {i}')
+        db.session.add(user)
+        db.session.flush()
+        request_loan = RequestLoan(
+            interest_rate=0.05, amortization_rate='MONTHLY', amount=amount, approval=False,
+            date_requested=datetime.now(), user_id=user.id,
+        )
+        db.session.add(request_loan)
+        db.session.flush()
+        ids.append(request_loan.id)
+    db.session.commit()
+    return ids
+
+def cached_balances() -> dict:
+    return {b.user_id: (int(b.total_loan * 100), int(b.total_paid * 100)) for b in LoanBalance.query}
+
+
+def test_write_paths_append_to_the_ledger(client: FlaskClient, headers: dict):
+    first, second, third = request_loans(1000, 2000, 300)
+    client.patch(f'/api/v1/loan/request/{first}', headers=headers, json={'approval': True})
+    client.post('/api/v1/loan/request/approve-batch', headers=headers, json={'ids': [second, third]})
+
+    accrue_interest(date.today())
+    borrower = db.session.get(RequestLoan, second).user_id
+    repayment = Repayment(user_id=borrower, repay_amount=500, paid_at=datetime.now())
+    db.session.add(repayment)
+    db.session.commit()
+    update_loan_records(
+        repayment,
+        Loan.query.filter_by(user_id=borrower, paid_off=False),
+        LoanBalance.query.filter_by(user_id=borrower).first(),
+    )
+
+    kinds = sorted((entry.kind.value, entry.amount) for entry in LedgerEntry.query)
+    assert kinds == [
+        ('DISBURSEMENT', Decimal('300.00')), ('DISBURSEMENT', Decimal('1000.00')), ('DISBURSEMENT', Decimal('2000.00')),
+        ('INTEREST', Decimal('0.08')), ('INTEREST', Decimal('0.28')), ('INTEREST', Decimal('0.56')),
+        ('REPAYMENT', Decimal('500.00')),
+    ]
+    assert ledger_balances(db.session.connection(), 0, 100) == cached_balances()
+
+
+def test_repayment_is_posted_once(client: FlaskClient, headers: dict):
+    loan_id, = request_loans(1000)
+    client.patch(f'/api/v1/loan/request/{loan_id}', headers=headers, json={'approval': True})
+    borrower = db.session.get(RequestLoan, loan_id).user_id
+    repayment = Repayment(user_id=borrower, repay_amount=400, paid_at=datetime.now())
+    db.session.add(repayment)
+    db.session.commit()
+
+    # The same Paystack reference verified twice
+    results = [
+        update_loan_records(
+            repayment,
+            Loan.query.filter_by(user_id=borrower, paid_off=False),
+            LoanBalance.query.filter_by(user_id=borrower).first(),
+        )
+        for _ in range(2)
+    ]
+
+    assert results == [True, False]
+    assert LedgerEntry.query.filter_by(kind=LedgerEntryKind.REPAYMENT).count() == 1
+    assert LoanBalance.query.filter_by(user_id=borrower).one().total_paid == Decimal('400.00')
+    assert balance_at(borrower) == (Decimal('1000.00'), Decimal('400.00'))
+
+
+def test_balance_at_reads_snapshot_and_tail(app: Flask):
+    user = User(email='borrower@example.com', password='testpass123', full_name='Borrower')
+    db.session.add(user)
+    db.session.flush()
+    day = datetime(2024, 1, 1)
+    db.session.add_all([
+        LedgerEntry(user_id=user.id, kind=LedgerEntryKind.DISBURSEMENT, amount=1000, created_at=day),
+        LedgerEntry(user_id=user.id, kind=LedgerEntryKind.INTEREST, amount=Decimal('10.50'), created_at=day + timedelta(days=1)),
+        LedgerEntry(user_id=user.id, kind=LedgerEntryKind.REPAYMENT, amount=400, created_at=day + timedelta(days=2)),
+        LedgerEntry(user_id=user.id, kind=LedgerEntryKind.ADJUSTMENT, amount=-5, created_at=day + timedelta(days=3)),
+    ])
+    db.session.commit()
+    expected = {at: balance_at(user.id, at) for at in (day - timedelta(days=1), day + timedelta(days=2), None)}
+    assert expected[None] == (Decimal('1005.50'), Decimal('400.00'))
+
+    # A snapshot taken after the second entry changes where the sums start, not the result
+    result = app.test_cli_runner().invoke(args=['ledger', 'snapshot'])
+    assert result.exit_code == 0, result.output
+    db.session.add(BalanceSnapshot(user_id=user.id, as_of=day + timedelta(days=1), total_loan=1010.5, total_paid=0))
+    db.session.commit()
+
+    assert {at: balance_at(user.id, at) for at in expected} == expected
+    assert BalanceSnapshot.query.count() == 2
+
+
+def test_rebuild_balances_in_parallel(app: Flask, client: FlaskClient, headers: dict):
+    client.post('/api/v1/loan/request/approve-batch', headers=headers, json={'ids': request_loans(100, 200, 300, 400)})
+    expected = cached_balances()
+    first, second = list(expected)[:2]
+    LoanBalance.query.filter_by(user_id=first).one().total_loan += 7
+    db.session.delete(LoanBalance.query.filter_by(user_id=second).one())
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['ledger', 'rebuild-balances', '--chunk-users', '2', '--workers', '2'])
+
+    assert result.exit_code == 0, result.output
+    assert '2 of 4 balances rewritten' in result.output
+    db.session.expire_all()
+    assert cached_balances() == expected
+
+
+def test_rebuild_adds_to_a_balance_row_created_meanwhile(app: Flask, monkeypatch):
+    user = User(email='borrower@example.com', password='testpass123', full_name='Borrower')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(LedgerEntry(user_id=user.id, kind=LedgerEntryKind.DISBURSEMENT, amount=1000))
+    db.session.commit()
+    read_ledger = ledger.ledger_balances
+
+    def approval_meanwhile(connection, *args):
+        # An approval creates the row after the range's rows were locked and read
+        connection.execute(insert(LoanBalance.__table__).values(user_id=user.id, total_loan=200, total_paid=0))
+        return read_ledger(connection, *args)
+
+    monkeypatch.setattr(ledger, 'ledger_balances', approval_meanwhile)
+    with db.engine.begin() as connection:
+        assert ledger.rebuild_range(connection, 0, user.id) == (1, 1)
+
+    assert LoanBalance.query.filter_by(user_id=user.id).one().total_loan == Decimal('1200.00')
+
+
+def test_backfill_opens_legacy_balances(app: Flask):
+    user = User(email='legacy@example.com', password='testpass123', full_name='Legacy')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(LoanBalance(user_id=user.id, total_loan=Decimal('1050.00'), total_paid=Decimal('200.00')))
+    db.session.commit()
+    runner = app.test_cli_runner()
+
+    assert '2 opening entries' in runner.invoke(args=['ledger', 'backfill']).output
+    assert '0 opening entries' in runner.invoke(args=['ledger', 'backfill']).output
+    assert balance_at(user.id) == (Decimal('1050.00'), Decimal('200.00'))
+    assert '0 of 1 balances rewritten' in runner.invoke(args=['ledger', 'rebuild-balances']).output
+
+
+def test_balance_at_endpoint(client: FlaskClient, headers: dict):
+    loan_id, = request_loans(1000)
+    client.patch(f'/api/v1/loan/request/{loan_id}', headers=headers, json={'approval': True})
+    borrower = db.session.get(User, db.session.get(RequestLoan, loan_id).user_id)
+    borrower_headers = {'Authorization': f'Bearer {create_access_token(identity=borrower.id)}'}
+
+    response = client.get('/api/v1/loan/balance/at?at=2000-01-01T00:00:00', headers=borrower_headers)
+    assert response.status_code == 200
+    assert response.json['data']['total_loan'] == '0.00'
+
+    at = (datetime.now() + timedelta(minutes=1)).isoformat()
+    response = client.get(f'/api/v1/loan/balance/at?at={at}', headers=borrower_headers)
+    assert response.json['data']['outstanding'] == '1000.00'
+
+    assert client.get('/api/v1/loan/balance/at', headers=borrower_headers).status_code == 400
@@ -151,3 +151,51 @@ def test_get_loans_no_user(client: FlaskClient):
 def test_get_loans_no_auth(client: FlaskClient):
     response = client.get('/api/v1/loan')
     assert response.status_code == 401  # Unauthorized
+
+
+def test_get_loans_with_sparse_fields(client: FlaskClient, test_user: User):
+    token = get_jwt_token(test_user)
+
+    request_loan = RequestLoan(
+        interest_rate=5.0,
+        amortization_rate='WEEKLY',
+        amount=1000.0,
+        approval=True,
+        date_requested=datetime.now(),
+        user_id=test_user.id
+    )
+    db.session.add(request_loan)
+    db.session.commit()
+
+    loan = Loan(amount=5000, user_id=test_user.id, request_loan_id=request_loan.id)
+    db.session.add(loan)
+    db.session.commit()
+
+    response = client.get(
+        '/api/v1/loan?fields=amount,paid_off',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    json_data = response.get_json()
+
+    assert response.status_code == 200
+    assert json_data['data'] == [{'amount': '5000.00', 'paid_off': False}]
+
+    response = client.get(
+        f'/api/v1/loan/{loan.id}?fields=id',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    assert response.get_json()['data'] == {'id': loan.id}
+
+
+def test_get_loans_with_unknown_fields(client: FlaskClient, test_user: User):
+    token = get_jwt_token(test_user)
+
+    response = client.get(
+        '/api/v1/loan?fields=amount,password',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    json_data = response.get_json()
+
+    assert response.status_code == 400
+    assert json_data['success'] is False
+    assert json_data['message'] == 'Unknown fields: password'
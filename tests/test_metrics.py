@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User
+from app.environment import TestingEnvironment
+from app.utils import make_payment
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """A test client for the app"""
+    return app.test_client()
+
+@pytest.fixture
+def headers(app: Flask):
+    user = User(email='test@example.com', password='testpassword', full_name='Test User')
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+
+def sample(client, line_prefix):
+    body = client.get('/metrics').data.decode()
+    for line in body.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+def test_request_metrics(client: FlaskClient, headers: dict):
+    name = 'trustlend_http_requests_total{endpoint="loans.loan_balance_view",method="GET",status="200"}'
+    before = sample(client, name)
+
+    client.get('/api/v1/loan/balance', headers=headers)
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert sample(client, name) == before + 1
+    assert 'trustlend_http_request_duration_seconds_bucket{endpoint="loans.loan_balance_view"' in response.data.decode()
+
+
+def test_pool_and_cache_metrics(client: FlaskClient):
+    client.get('/swagger.json')
+    client.get('/swagger.json')
+    body = client.get('/metrics').data.decode()
+
+    assert 'trustlend_cache_requests_total{cache="swagger",result="hit"}' in body
+    assert 'trustlend_db_pool_connections{bind="default",state="checked_out"}' in body
+
+
+def test_paystack_metrics(client: FlaskClient, headers: dict):
+    name = 'trustlend_paystack_request_duration_seconds_count{operation="initialize",status="200"}'
+    before = sample(client, name)
+
+    with patch('app.utils.paystack.requests.post', return_value=MagicMock(status_code=200)):
+        make_payment(User.query.first(), {'repay_amount': '100.00', 'id': 1})
+
+    assert sample(client, name) == before + 1
+
+
+def test_metrics_token(app: Flask, client: FlaskClient):
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+
+def test_metrics_need_a_token_in_production():
+    class TokenRequiredEnvironment(TestingEnvironment):
+        METRICS_REQUIRE_TOKEN = True
+        METRICS_TOKEN = None
+
+    assert create_app(config=TokenRequiredEnvironment).test_client().get('/metrics').status_code == 404
+
+    TokenRequiredEnvironment.METRICS_TOKEN = 'scrape-secret'
+    assert create_app(config=TokenRequiredEnvironment).test_client().get('/metrics').status_code == 401
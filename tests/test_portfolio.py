@@ -0,0 +1,120 @@
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, RequestLoan, Loan, LoanBalance, Repayment, PortfolioSummary
+from app.environment import TestingEnvironment
+from app.utils import accrue_interest, update_loan_records, verify_portfolio
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """Create a test client for the app."""
+    return app.test_client()
+
+@pytest.fixture
+def headers(app: Flask) -> dict:
+    admin = User(email='admin@example.com', password='testpass123', full_name='Admin', is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+
+def request_loans(*loans) -> list:
+    """Pending requests of ``(amount, amortization_rate)``, one borrower each."""
+    ids = []
+    for i, (amount, rate) in enumerate(loans):
+        user = User(email=f'borrower{i}@example.com', password='testpass123', full_name=f'Borrower {i}')
+        db.session.add(user)
+        db.session.flush()
+        request_loan = RequestLoan(
+            interest_rate=0.05, amortization_rate=rate, amount=amount, approval=False,
+            date_requested=datetime.now(), user_id=user.id,
+        )
+        db.session.add(request_loan)
+        db.session.flush()
+        ids.append(request_loan.id)
+    db.session.commit()
+    return ids
+
+
+def test_write_paths_keep_portfolio_current(client: FlaskClient, headers: dict):
+    first, second, third = request_loans((1000, 'MONTHLY'), ('10.10', 'WEEKLY'), (500, 'MONTHLY'))
+
+    response = client.patch(f'/api/v1/loan/request/{first}', headers=headers, json={'approval': True})
+    assert response.status_code == 200
+    response = client.post('/api/v1/loan/request/approve-batch', headers=headers, json={'ids': [second, third]})
+    assert response.status_code == 200
+    # Interest reaches the totals as it accrues, not at approval
+    accrue_interest(date.today())
+
+    # The first borrower pays everything back
+    borrower = db.session.get(RequestLoan, first).user_id
+    repayment = Repayment(user_id=borrower, repay_amount=1050, paid_at=datetime.now())
+    db.session.add(repayment)
+    db.session.commit()
+    update_loan_records(
+        repayment,
+        Loan.query.filter_by(user_id=borrower, paid_off=False),
+        LoanBalance.query.filter_by(user_id=borrower).first(),
+    )
+
+    assert verify_portfolio() == []
+
+    response = client.get('/api/v1/analytics/summary', headers=headers)
+    assert response.status_code == 200
+    summary = response.json['data']['summary']
+    assert summary['loan_count'] == 3
+    assert summary['principal'] == '1510.10'
+    assert summary['interest'] == '0.43'     # a day of 50.00, 0.50 and 25.00: 0.28 + 0.01 + 0.14
+    assert summary['open_loan_count'] == 2
+    assert summary['open_principal'] == '510.10'
+    assert summary['collected'] == '1050.00'
+    assert summary['active_borrowers'] == 2
+    assert (summary['monthly_loans'], summary['weekly_loans'], summary['daily_loans']) == (2, 1, 0)
+    assert response.json['data']['daily'] == [{
+        'day': date.today().isoformat(), 'loan_count': 3, 'principal': '1510.10', 'interest': '0.43',
+        'repayment_count': 1, 'collected': '1050.00',
+    }]
+
+
+def test_empty_portfolio(client: FlaskClient, headers: dict):
+    response = client.get('/api/v1/analytics/summary?days=0', headers=headers)
+
+    assert response.status_code == 200
+    assert response.json['data']['summary']['loan_count'] == 0
+    assert response.json['data']['daily'] == []
+
+    response = client.get('/api/v1/analytics/summary?days=1000', headers=headers)
+    assert response.status_code == 400
+
+
+def test_rebuild_portfolio_command(app: Flask, client: FlaskClient, headers: dict):
+    loan_id, = request_loans((2000, 'YEARLY'))
+    client.patch(f'/api/v1/loan/request/{loan_id}', headers=headers, json={'approval': True})
+    db.session.get(PortfolioSummary, 1).principal = Decimal('1.00')
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['rebuild-portfolio', '--check'])
+    assert result.exit_code == 1
+    assert 'principal' in result.output
+
+    result = runner.invoke(args=['rebuild-portfolio'])
+    assert result.exit_code == 0, result.output
+    assert verify_portfolio() == []
+    assert runner.invoke(args=['rebuild-portfolio', '--check']).exit_code == 0
@@ -0,0 +1,73 @@
+import logging
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User
+from app.environment import TestingEnvironment
+from app.utils.query_stats import normalize_sql
+
+
+class InstrumentedEnvironment(TestingEnvironment):
+    SQL_INSTRUMENTATION = True
+    SQL_TIMING_HEADERS = True
+    SLOW_QUERY_MS = 0.000001    # every statement counts as slow
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=InstrumentedEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """A test client for the app"""
+    return app.test_client()
+
+@pytest.fixture
+def headers(app: Flask):
+    user = User(email='test@example.com', password='testpassword', full_name='Test User')
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+
+def test_query_headers(client: FlaskClient, headers: dict):
+    response = client.get('/api/v1/user/detail', headers=headers)
+
+    assert response.status_code == 200
+    # token blacklist check, user and loan balance
+    assert response.headers['X-DB-Queries'] == '3'
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+    assert 'desc="3 queries"' in response.headers['Server-Timing']
+
+
+def test_slow_query_log(client: FlaskClient, headers: dict, caplog):
+    with caplog.at_level(logging.WARNING, logger='trustlend.slow_query'):
+        client.get('/api/v1/loan/balance', headers=headers)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any('endpoint=loans.loan_balance_view' in message and 'loan_balance' in message for message in messages)
+
+
+def test_disabled_by_default(headers: dict):
+    client = create_app(TestingEnvironment).test_client()
+    response = client.get('/swagger.json')
+
+    assert 'X-DB-Queries' not in response.headers
+    assert 'Server-Timing' not in response.headers
+
+
+def test_normalize_sql():
+    statement = """SELECT user.id FROM user
+        WHERE user.email = 'a@b.c' AND user.id IN (?, ?, ?) LIMIT 10 OFFSET ?"""
+
+    assert normalize_sql(statement) == 'SELECT user.id FROM user WHERE user.email = ? AND user.id IN (...) LIMIT ? OFFSET ?'
@@ -0,0 +1,92 @@
+import json
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from flask import Flask
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, RequestLoan, Loan, LoanBalance, LedgerEntry, LedgerEntryKind
+from app.environment import TestingEnvironment
+from app.utils import balance_at
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def borrowers(app: Flask) -> list:
+    """Four borrowers with a 1000 loan each, approved through the batch endpoint."""
+    admin = User(email='admin@example.com', password='testpass123', full_name='Admin', is_admin=True)
+    db.session.add(admin)
+    ids = []
+    for i in range(4):
+        user = User(email=f'borrower{i}@example.com', password='testpass123', full_name=f'Borrower {i}')
+        db.session.add(user)
+        db.session.flush()
+        request_loan = RequestLoan(
+            interest_rate=0.05, amortization_rate='WEEKLY', amount=1000, approval=False,
+            date_requested=datetime.now(), user_id=user.id,
+        )
+        db.session.add(request_loan)
+        db.session.flush()
+        ids.append(request_loan.id)
+    db.session.commit()
+
+    client = app.test_client()
+    response = client.post(
+        '/api/v1/loan/request/approve-batch', json={'ids': ids},
+        headers={'Authorization': f'Bearer {create_access_token(identity=admin.id)}'},
+    )
+    assert response.status_code == 200
+    return [db.session.get(RequestLoan, request_loan_id).user_id for request_loan_id in ids]
+
+def reconcile(app: Flask, *args):
+    result = app.test_cli_runner(mix_stderr=False).invoke(args=['reconcile-balances', '--chunk-users', '2', *args])
+    return result.exit_code, json.loads(result.stdout)
+
+
+def test_reconcile_finds_and_repairs_drift(app: Flask, borrowers: list):
+    first, second, third, _ = borrowers
+    assert reconcile(app)[0] == 0
+
+    LoanBalance.query.filter_by(user_id=first).one().total_paid = Decimal('25.00')
+    db.session.delete(LoanBalance.query.filter_by(user_id=second).one())
+    # An approval that failed halfway: the loan exists, neither balance nor ledger has it
+    request_loan = RequestLoan(
+        interest_rate=0.05, amortization_rate='DAILY', amount=300, approval=True, date_requested=datetime.now(), user_id=third,
+    )
+    db.session.add(request_loan)
+    db.session.flush()
+    db.session.add(Loan(amount=300, user_id=third, start_at=datetime.now(), request_loan_id=request_loan.id))
+    db.session.commit()
+
+    exit_code, report = reconcile(app)
+    assert exit_code == 1
+    assert (report['users'], report['drifted'], report['missing']) == (4, 3, 1)
+    assert report['total_loan_drift'] == '1300.00'
+    assert report['total_paid_drift'] == '25.00'
+    assert [sample['user_id'] for sample in report['samples']] == [first, second, third]
+    assert report['samples'][1]['stored'] is None
+
+    exit_code, report = reconcile(app, '--repair', '--workers', '2')
+    assert exit_code == 0
+    assert report['drifted'] == 3
+
+    exit_code, report = reconcile(app)
+    assert (exit_code, report['drifted']) == (0, 0)
+    db.session.expire_all()
+    assert LoanBalance.query.filter_by(user_id=third).one().total_loan == Decimal('1300.00')
+    # The ledger was corrected too, so a cache rebuild agrees with the repair
+    correction, = LedgerEntry.query.filter_by(note='reconciliation')
+    assert (correction.user_id, correction.kind, correction.amount) == (third, LedgerEntryKind.ADJUSTMENT, Decimal('300.00'))
+    assert balance_at(third) == (Decimal('1300.00'), Decimal('0.00'))
+    assert '0 of 4 balances rewritten' in app.test_cli_runner().invoke(args=['ledger', 'rebuild-balances']).output
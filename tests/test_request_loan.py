@@ -1,12 +1,15 @@
+import io
 import json
 import pytest
 from flask import Flask
 from flask.testing import FlaskClient
 from app import create_app, db
-from app.models import User, RequestLoan
+from app.models import User, RequestLoan, Loan, LoanBalance, Verification
 from app.environment import TestingEnvironment
 from datetime import datetime
+from decimal import Decimal
 from flask_jwt_extended import create_access_token
+from sqlalchemy import text
 
 
 @pytest.fixture
@@ -180,3 +183,165 @@ def test_put_request_loan_already_approved(client: FlaskClient, test_user: User)
     response_data = response.json
     assert response_data['success'] == False
     assert response_data['error'] == 'Loan Request Already Approved'
+
+
+def make_borrowers(count: int) -> list:
+    users = [
+        User(email=f'borrower{i}@example.com', password='testpass123', full_name=f'Borrower {i}')
+        for i in range(count)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+def test_import_request_loans(client: FlaskClient, test_user: User):
+    """Test bulk CSV import with per-row errors."""
+    token = get_jwt_token(test_user)
+    first, second, third = make_borrowers(3)
+    db.session.add(RequestLoan(
+        interest_rate=5.0, amortization_rate='MONTHLY', amount=100, approval=False,
+        date_requested=datetime.now(), user_id=third,
+    ))
+    db.session.commit()
+
+    csv_data = '\n'.join([
+        'user_id,amount,amortization_rate',
+        f'{first},1500.50,WEEKLY',
+        f'{second},abc,MONTHLY',
+        f'{first},200,DAILY',           # second request for the same user
+        f'{third},300,MONTHLY',         # already has a pending request
+        '9999,400,YEARLY',              # no such user
+        f'{second},250,MONTHLY',
+    ])
+    response = client.post(
+        '/api/v1/loan/request/import',
+        headers={'Authorization': f'Bearer {token}'},
+        data=csv_data,
+        content_type='text/csv'
+    )
+
+    assert response.status_code == 200
+    report = response.json['data']
+    assert (report['processed'], report['imported'], report['failed']) == (6, 2, 4)
+    assert [error['line'] for error in report['errors']] == [3, 4, 5, 6]
+    assert 'amount' in report['errors'][0]['errors']
+
+    imported = RequestLoan.query.filter(RequestLoan.user_id.in_([first, second])).order_by(RequestLoan.user_id).all()
+    assert [(r.user_id, str(r.amount), r.approval) for r in imported] == [
+        (first, '1500.50', False), (second, '250.00', False),
+    ]
+    assert imported[0].interest_rate == RequestLoan.INTEREST_RATE
+
+def test_import_request_loans_upload_dry_run(client: FlaskClient, test_user: User):
+    """Test a multipart upload in dry-run mode and a bad header."""
+    token = get_jwt_token(test_user)
+    (borrower,) = make_borrowers(1)
+
+    response = client.post(
+        '/api/v1/loan/request/import?dry_run=true',
+        headers={'Authorization': f'Bearer {token}'},
+        data={'file': (io.BytesIO(f'user_id,amount,amortization_rate\n{borrower},100,WEEKLY\n'.encode()), 'loans.csv')},
+    )
+    assert response.status_code == 200
+    assert response.json['data']['imported'] == 1
+    assert RequestLoan.query.count() == 0
+
+    response = client.post(
+        '/api/v1/loan/request/import',
+        headers={'Authorization': f'Bearer {token}'},
+        data='user,amount\n1,100\n',
+        content_type='text/csv'
+    )
+    assert response.status_code == 400
+    assert 'amortization_rate' in response.json['message']
+
+def test_approve_batch(client: FlaskClient, test_user: User):
+    """Test bulk approval with mixed outcomes and aggregated balances."""
+    token = get_jwt_token(test_user)
+    first, second = make_borrowers(2)
+    db.session.add(LoanBalance(user_id=first, total_loan=50, total_paid=0))
+    requests = [
+        RequestLoan(interest_rate=5.0, amortization_rate='WEEKLY', amount=amount, approval=approval,
+                    date_requested=datetime.now(), user_id=user_id)
+        for user_id, amount, approval in [(first, 1000, False), (first, 200, False), (second, 300, False), (second, 400, True)]
+    ]
+    db.session.add_all(requests)
+    db.session.commit()
+    ids = [r.id for r in requests]
+
+    response = client.post(
+        '/api/v1/loan/request/approve-batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'ids': ids + [9999, ids[0]]}
+    )
+
+    assert response.status_code == 200
+    results = response.json['data']
+    assert [(r['id'], r['status']) for r in results] == [
+        (ids[0], 'approved'), (ids[1], 'approved'), (ids[2], 'approved'),
+        (ids[3], 'already_approved'), (9999, 'not_found'),
+    ]
+    loans = {loan.request_loan_id: loan for loan in Loan.query}
+    assert results[0]['loan_id'] == loans[ids[0]].id
+    assert set(loans) == set(ids[:3])
+
+    balances = {b.user_id: b.total_loan for b in LoanBalance.query}
+    # Principal only, interest is posted by the accrual job
+    assert balances == {first: Decimal('1250.00'), second: Decimal('300.00')}
+    assert all(db.session.get(User, user_id).active_loan for user_id in (first, second))
+    assert all(r.approval for r in RequestLoan.query)
+
+    response = client.post(
+        '/api/v1/loan/request/approve-batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'ids': []}
+    )
+    assert response.status_code == 400
+
+def test_pending_request_loans(client: FlaskClient, test_user: User):
+    """Test the keyset-paginated review queue and its filters."""
+    token = get_jwt_token(test_user)
+    borrowers = make_borrowers(5)
+    # A rejected first attempt and a verified resubmission: the request is still listed once
+    db.session.add(Verification(user_id=borrowers[0], address='1 Test Street', bvn='12345678901', is_verified=False))
+    db.session.add(Verification(user_id=borrowers[0], address='1 Test Street', bvn='12345678901', is_verified=True))
+    for i, user_id in enumerate(borrowers):
+        db.session.add(RequestLoan(
+            interest_rate=5.0, amortization_rate='WEEKLY' if i % 2 else 'MONTHLY', amount=1000 * (i + 1),
+            approval=i == 4, date_requested=datetime(2024, 1, 1 + i % 2), user_id=user_id,
+        ))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get('/api/v1/loan/request/pending?limit=2', headers=headers)
+    assert response.status_code == 200
+    page = response.json['data']
+    assert [r['amount'] for r in page['requests']] == ['1000.00', '3000.00']
+    assert page['requests'][0]['user'] == {
+        'id': borrowers[0], 'full_name': 'Borrower 0', 'email': 'borrower0@example.com', 'is_verified': True,
+    }
+    assert page['requests'][1]['user']['is_verified'] is None
+
+    response = client.get(f"/api/v1/loan/request/pending?limit=2&after={page['next']}", headers=headers)
+    page = response.json['data']
+    assert [r['amount'] for r in page['requests']] == ['2000.00', '4000.00']
+    assert page['next'] is None
+
+    response = client.get('/api/v1/loan/request/pending?amortization_rate=WEEKLY&min_amount=3000', headers=headers)
+    assert [r['amount'] for r in response.json['data']['requests']] == ['4000.00']
+
+    response = client.get('/api/v1/loan/request/pending?after=not-a-cursor', headers=headers)
+    assert response.status_code == 400
+
+def test_pending_request_loans_use_index(app: Flask):
+    """The review queue query is served by the partial pending index."""
+    plan = db.session.execute(text(
+        'EXPLAIN QUERY PLAN SELECT requestloans.id, (SELECT is_verified FROM verifications '
+        'WHERE verifications.user_id = requestloans.user_id ORDER BY verifications.id DESC LIMIT 1) '
+        'FROM requestloans JOIN user ON user.id = requestloans.user_id '
+        "WHERE approval IS 0 AND (date_requested, requestloans.id) > ('2024-01-01', 1) "
+        'ORDER BY date_requested, requestloans.id LIMIT 51'
+    )).all()
+    details = ' | '.join(row[-1] for row in plan)
+    assert 'USING INDEX ix_requestloans_pending' in details
+    assert 'AUTOMATIC' not in details and 'TEMP B-TREE' not in details
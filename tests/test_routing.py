@@ -0,0 +1,86 @@
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, LoanBalance
+from app.environment import TestingEnvironment
+from app.session import routing_counts, _recent_writers
+
+
+class ReplicaEnvironment(TestingEnvironment):
+    SQLALCHEMY_BINDS = {'replica': 'sqlite:///test_replica.db'}
+
+
+@pytest.fixture
+def app():
+    """Create a test app whose replica is a second SQLite database."""
+    _recent_writers.clear()
+    app = create_app(config=ReplicaEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        replica = db.engines['replica']
+        db.create_all()
+        db.metadata.create_all(replica)
+
+        # The same user on both sides, with a lagging balance on the replica
+        for engine, total_loan in ((db.engine, 1000), (replica, 500)):
+            with engine.begin() as conn:
+                conn.execute(User.__table__.insert(), {
+                    'id': 1, 'email': 'test@example.com', 'full_name': 'Test User', 'password': 'x'
+                })
+                conn.execute(LoanBalance.__table__.insert(), {
+                    'user_id': 1, 'total_loan': total_loan, 'total_paid': 0
+                })
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(replica)
+        # Binds register metadata on the shared extension, keep other tests unaware
+        db.metadatas.pop('replica', None)
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """A test client for the app"""
+    return app.test_client()
+
+@pytest.fixture
+def headers(app: Flask):
+    return {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+
+
+def balance(client, headers):
+    response = client.get('/api/v1/loan/balance', headers=headers)
+    return response.json['data']['total_loan']
+
+
+def test_reads_go_to_replica(client: FlaskClient, headers: dict):
+    before = routing_counts['replica']
+
+    assert balance(client, headers) == '500.00'
+    assert routing_counts['replica'] > before
+
+
+def test_read_your_writes_after_write(client: FlaskClient, headers: dict):
+    response = client.put('/api/v1/user/detail', json={'full_name': 'Updated User'}, headers=headers)
+
+    assert response.status_code == 200
+    assert 'tl_read_primary' in response.headers['Set-Cookie']
+    assert balance(client, headers) == '1000.00'
+
+
+def test_read_your_writes_without_cookie(app: Flask, headers: dict):
+    client = app.test_client(use_cookies=False)
+    client.put('/api/v1/user/detail', json={'full_name': 'Updated User'}, headers=headers)
+
+    assert balance(client, headers) == '1000.00'
+
+
+def test_revoked_tokens_checked_on_primary(client: FlaskClient, headers: dict):
+    client.post('/api/v1/user/sign-out', headers=headers)
+
+    # The revocation only exists on the primary
+    fresh_client = client.application.test_client()
+    response = fresh_client.get('/api/v1/user/detail', headers=headers)
+    assert response.status_code == 401
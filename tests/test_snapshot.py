@@ -0,0 +1,93 @@
+import pytest
+from datetime import datetime, timedelta
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Loan, RequestLoan, LoanBalance, Repayment
+from app.environment import TestingEnvironment
+from app.utils import take_snapshot, compact_snapshot
+from app.utils.snapshot import load_snapshot
+
+PAST = datetime(2024, 5, 1)
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    app.config['SNAPSHOT_DIR'] = str(tmp_path / 'snapshots')
+    app.config['SNAPSHOT_LAG_SECONDS'] = 0
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """Create a test client for the app."""
+    return app.test_client()
+
+@pytest.fixture
+def admin(app: Flask) -> User:
+    user = User(email='admin@example.com', password='testpass123', full_name='Admin', is_admin=True)
+    db.session.add(user)
+    db.session.commit()
+    for i, month in enumerate((3, 3, 4), start=1):
+        start = datetime(2024, month, 10)
+        db.session.add(RequestLoan(
+            id=i, user_id=user.id, amount=1000 * i, interest_rate=0.05, approval=True,
+            amortization_rate='MONTHLY', date_requested=start, updated_at=PAST,
+        ))
+        db.session.add(Loan(id=i, user_id=user.id, amount=1000 * i, request_loan_id=i, start_at=start, updated_at=PAST))
+    db.session.add(Repayment(user_id=user.id, repay_amount=500, is_approved=True, paid_at=PAST, updated_at=PAST))
+    db.session.add(Repayment(user_id=user.id, repay_amount=700, is_approved=False, paid_at=PAST, updated_at=PAST))
+    db.session.add(LoanBalance(user_id=user.id, total_loan=6300, total_paid=500, last_updated=PAST))
+    db.session.commit()
+    return user
+
+
+def test_snapshot_is_incremental(app: Flask, admin: User):
+    directory = app.config['SNAPSHOT_DIR']
+    assert take_snapshot(directory, lag_seconds=60) == {'loans': 3, 'requestloans': 3, 'repayments': 2, 'loan_balance': 1}
+    assert take_snapshot(directory, lag_seconds=60)['loans'] == 0
+
+    # A change made after the first cutoff is picked up by the next run
+    loan = db.session.get(Loan, 2)
+    loan.paid_off = True
+    loan.updated_at = datetime.now() - timedelta(seconds=30)
+    db.session.commit()
+    assert take_snapshot(directory, lag_seconds=0)['loans'] == 1
+
+    loans = load_snapshot(directory, 'loans')
+    assert loans['id'].to_pylist() == [1, 2, 3]
+    assert loans['paid_off'].to_pylist() == [False, True, False]
+
+    assert compact_snapshot(directory, 'loans') == 3
+    assert load_snapshot(directory, 'loans')['paid_off'].to_pylist() == [False, True, False]
+
+
+def test_portfolio_summary(client: FlaskClient, app: Flask, admin: User):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+
+    response = client.get('/api/v1/analytics/portfolio', headers=headers)
+    assert response.status_code == 503
+
+    result = app.test_cli_runner().invoke(args=['snapshot'])
+    assert result.exit_code == 0, result.output
+
+    response = client.get('/api/v1/analytics/portfolio', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['loans']['count'] == 3
+    assert data['loans']['principal'] == '6000.00'
+    assert data['loans']['disbursed_by_month'] == [
+        {'month': '2024-03', 'count': 2, 'amount': '3000.00'},
+        {'month': '2024-04', 'count': 1, 'amount': '3000.00'},
+    ]
+    assert data['requests']['by_amortization_rate'] == {'MONTHLY': 3}
+    assert data['repayments']['approved_amount'] == '500.00'
+    assert data['balances']['outstanding'] == '5800.00'
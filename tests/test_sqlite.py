@@ -0,0 +1,89 @@
+import pytest
+import sqlite3
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.environment import TestingEnvironment
+from app.utils import retry_on_lock
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SQLITE_LOCK_BACKOFF'] = 0
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def locked_error():
+    return OperationalError('COMMIT', {}, sqlite3.OperationalError('database is locked'))
+
+
+def test_pragmas_applied(app: Flask):
+    pragmas = {
+        name: db.session.execute(text(f'PRAGMA {name}')).scalar()
+        for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size')
+    }
+
+    assert pragmas == {
+        'journal_mode': 'wal',
+        'synchronous': 1,       # NORMAL
+        'busy_timeout': 5000,
+        'cache_size': -64000,
+    }
+
+
+def test_untuned_sqlite():
+    class Untuned(TestingEnvironment):
+        SQLITE_TUNED = False
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+    app = create_app(Untuned)
+    with app.app_context():
+        assert db.session.execute(text('PRAGMA cache_size')).scalar() != -64000
+
+
+def test_retry_on_lock_retries(app: Flask):
+    calls = []
+
+    @retry_on_lock
+    def write():
+        calls.append(1)
+        if len(calls) < 3:
+            raise locked_error()
+        return 'done'
+
+    assert write() == 'done'
+    assert len(calls) == 3
+
+
+def test_retry_on_lock_is_bounded(app: Flask):
+    app.config['SQLITE_LOCK_RETRIES'] = 2
+    calls = []
+
+    @retry_on_lock
+    def write():
+        calls.append(1)
+        raise locked_error()
+
+    with pytest.raises(OperationalError):
+        write()
+    assert len(calls) == 3
+
+
+def test_retry_on_lock_ignores_other_errors(app: Flask):
+    calls = []
+
+    @retry_on_lock
+    def write():
+        calls.append(1)
+        raise OperationalError('SELECT', {}, sqlite3.OperationalError('no such table: loans'))
+
+    with pytest.raises(OperationalError):
+        write()
+    assert len(calls) == 1
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+from flask import Flask
+from app import create_app, db
+from app.environment import TestingEnvironment
+from app.utils import warm_up
+
+# Cumulative `import app` time from `python -X importtime`, with headroom for
+# slow CI machines; override with IMPORT_BUDGET_MS
+IMPORT_BUDGET_MS = int(os.environ.get('IMPORT_BUDGET_MS', 2500))
+# Only needed by the admin panel, swagger docs, Paystack, snapshots and `flask db`
+DEFERRED_MODULES = ('flask_admin', 'flask_swagger_ui', 'requests', 'pyarrow', 'alembic', 'flask_migrate')
+
+WORKER = """
+import json, sys
+from app import create_app
+from app.environment import ProductionEnvironment
+create_app(ProductionEnvironment)
+print(json.dumps(sorted(name for name in sys.modules if name.split('.')[0] in {modules!r})))
+"""
+
+
+def start_worker(tmp_path, *args, **env):
+    """Start a fresh interpreter that builds an API-only production app."""
+    return subprocess.run(
+        [sys.executable, *args, '-c', WORKER.format(modules=set(DEFERRED_MODULES))],
+        env={
+            **os.environ,
+            'DATABASE_URL': f"sqlite:///{tmp_path / 'worker.db'}",
+            'ADMIN_ENABLED': 'false',
+            'SWAGGER_ENABLED': 'false',
+            **env,
+        },
+        capture_output=True, text=True, check=True,
+    )
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_worker_defers_optional_imports(tmp_path):
+    result = start_worker(tmp_path)
+
+    assert json.loads(result.stdout.splitlines()[-1]) == []
+
+
+def test_import_time_budget(tmp_path):
+    result = start_worker(tmp_path, '-X', 'importtime')
+
+    cumulative = next(
+        int(line.split('|')[1]) for line in result.stderr.splitlines()
+        if line.startswith('import time:') and line.split('|')[2].strip() == 'app'
+    )
+    assert cumulative / 1000 < IMPORT_BUDGET_MS
+
+
+def test_warm_up(app: Flask):
+    report = warm_up(app)
+
+    assert report['connections'] == {'default': 2}
+    assert report['seconds'] >= 0
+
+
+def test_warm_up_without_tables(app: Flask, caplog):
+    db.drop_all()
+
+    report = warm_up(app)
+
+    assert report['connections'] == {'default': 2}
+    assert 'skipped the database' in caplog.text
@@ -0,0 +1,48 @@
+import gzip
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from app import create_app, db
+from app.environment import TestingEnvironment
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """A test client for the app"""
+    return app.test_client()
+
+
+def test_swagger_served_with_strong_etag(client: FlaskClient):
+    response = client.get('/swagger.json')
+    etag, weak = response.get_etag()
+
+    assert response.status_code == 200
+    assert etag and not weak
+    assert response.json['info']['title'] == 'TrustLend API'
+
+    response = client.get('/swagger.json', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_swagger_precompressed_variant(client: FlaskClient):
+    plain = client.get('/swagger.json')
+    response = client.get('/swagger.json', headers={'Accept-Encoding': 'gzip'})
+    etag, _ = response.get_etag()
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert etag == f'{plain.get_etag()[0]}-gzip'
+    assert gzip.decompress(response.data) == plain.data
+
+    response = client.get('/swagger.json', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
@@ -0,0 +1,135 @@
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User
+from app.environment import TestingEnvironment, engine_options
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app(config=TestingEnvironment)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['JWT_SECRET_KEY'] = 'test_jwt_secret_key'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """A test client for the app"""
+    return app.test_client()
+
+def make_headers(is_admin):
+    user = User(
+        email=f'user{User.query.count()}@example.com',
+        password='testpass123',
+        full_name='Test User',
+        is_admin=is_admin
+    )
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+@pytest.fixture
+def admin_headers(app: Flask):
+    return make_headers(is_admin=True)
+
+@pytest.fixture
+def user_headers(app: Flask):
+    return make_headers(is_admin=False)
+
+
+def test_database_status(client: FlaskClient, admin_headers: dict):
+    response = client.get('/api/v1/system/db', headers=admin_headers)
+
+    assert response.status_code == 200
+    pool = response.json['data']['pools']['default']
+    assert pool['pool'] == 'QueuePool'
+    assert pool['checkouts'] >= 1
+    assert 'checked_out' in pool
+
+
+def test_database_status_admin_only(client: FlaskClient, user_headers: dict):
+    response = client.get('/api/v1/system/db', headers=user_headers)
+    assert response.status_code == 403
+
+
+def test_engine_options_per_worker_type(monkeypatch):
+    assert engine_options('sqlite:///prod.db') == {}
+
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'gevent')
+    options = engine_options('postgresql://localhost/trustlend')
+    assert options['pool_size'] == 20
+    assert options['pool_pre_ping'] is True
+    assert options['connect_args'] == {'options': '-c statement_timeout=30000'}
+
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'gthread')
+    monkeypatch.setenv('GUNICORN_THREADS', '8')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '0')
+    options = engine_options('postgresql://localhost/trustlend')
+    assert options['pool_size'] == 8
+    assert options['max_overflow'] == 0
+
+
+def test_profiler_sampling(client: FlaskClient, admin_headers: dict):
+    response = client.put('/api/v1/system/profiler', json={'sample_rate': 1}, headers=admin_headers)
+    assert response.status_code == 200
+
+    response = client.get('/swagger.json')
+    assert 'X-Profile-Id' in response.headers
+
+    client.put('/api/v1/system/profiler', json={'sample_rate': 0}, headers=admin_headers)
+    response = client.get('/api/v1/system/profiler', headers=admin_headers)
+    profiles = response.json['data']['profiles']
+
+    assert any(profile['endpoint'] == 'swagger.swagger_spec' for profile in profiles)
+    assert profiles[0]['stats'][0]['cumulative_time'] >= profiles[0]['stats'][-1]['cumulative_time']
+
+    client.delete('/api/v1/system/profiler', headers=admin_headers)
+    assert client.get('/api/v1/system/profiler', headers=admin_headers).json['data']['profiles'] == []
+
+
+def test_profiler_signed_header(client: FlaskClient, admin_headers: dict):
+    response = client.post('/api/v1/system/profiler/token', headers=admin_headers)
+    token = response.json['data']['token']
+
+    assert 'X-Profile-Id' in client.get('/swagger.json', headers={'X-Profile-Token': token}).headers
+    assert 'X-Profile-Id' not in client.get('/swagger.json', headers={'X-Profile-Token': 'forged'}).headers
+    client.delete('/api/v1/system/profiler', headers=admin_headers)
+
+
+def test_profiler_header_without_secret_key(app: Flask, client: FlaskClient):
+    app.config['SECRET_KEY'] = None
+
+    response = client.get('/swagger.json', headers={'X-Profile-Token': 'anything'})
+
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+
+
+def test_profiler_validation(client: FlaskClient, admin_headers: dict, user_headers: dict):
+    response = client.put('/api/v1/system/profiler', json={'sample_rate': 2}, headers=admin_headers)
+    assert response.status_code == 400
+
+    response = client.put('/api/v1/system/profiler', json={'sample_rate': 1}, headers=user_headers)
+    assert response.status_code == 403
+
+
+def test_tracemalloc_diff(client: FlaskClient, admin_headers: dict):
+    assert client.get('/api/v1/system/tracemalloc', headers=admin_headers).status_code == 404
+
+    client.post('/api/v1/system/tracemalloc', headers=admin_headers)
+    leak = [bytearray(1024) for _ in range(100)]
+    client.post('/api/v1/system/tracemalloc', headers=admin_headers)
+
+    response = client.get('/api/v1/system/tracemalloc?limit=5', headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json['data']['stats']) <= 5
+
+    client.delete('/api/v1/system/tracemalloc', headers=admin_headers)
+    del leak
@@ -188,6 +188,26 @@ class TestUserView:
         assert response.json['data']['user']['email'] == user.email
         assert response.json['data']['user']['full_name'] == user.full_name
     
+    def test_get_user_details_sparse_fields(self, client: FlaskClient, user: User, auth_headers: dict):
+        """Test that sub-resources not named in fields are left out."""
+        response = client.get('/api/v1/user/detail?fields=user.email', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json['data'] == {'user': {'email': user.email}}
+
+        response = client.get('/api/v1/user/detail?fields=loan', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert 'user' not in response.json['data']
+        assert 'loan' in response.json['data']
+
+    def test_get_user_details_unknown_fields(self, client: FlaskClient, auth_headers: dict):
+        """Test that unknown fields are rejected."""
+        response = client.get('/api/v1/user/detail?fields=user.password', headers=auth_headers)
+
+        assert response.status_code == 400
+        assert response.json['error'] == 'Invalid Fields'
+    
     def test_update_user_details(self, client: FlaskClient, user: User, auth_headers: dict):
         """Test updating user details."""
         update_data = {
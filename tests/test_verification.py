@@ -6,6 +6,9 @@ from app import create_app, db
 from app.models import User, Verification
 from flask_jwt_extended import create_access_token
 from app.environment import TestingEnvironment
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 
 
 @pytest.fixture
@@ -89,4 +92,68 @@ def test_verification_post(client):
         "address": "123 Main St"
     }
     response = client.post('api/v1/verification', headers=headers, data=json.dumps(incomplete_data))
-    assert response.status_code == 400
\ No newline at end of file
+    assert response.status_code == 400
+
+def test_verification_queue(client):
+    admin = User(email="admin@example.com", password="hashedpassword", full_name='Admin', is_admin=True)
+    users = [User(email=f"user{i}@example.com", password="hashedpassword", full_name=f'User {i}') for i in range(4)]
+    db.session.add_all([admin] + users)
+    db.session.commit()
+    for i, user in enumerate(users[:3]):
+        db.session.add(Verification(
+            address="123 Main St", bvn="12345678901", user_id=user.id,
+            is_verified=i == 2, date_verified=datetime(2024, 1, 3 - i),
+        ))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+
+    response = client.get('api/v1/verification/queue?limit=1', headers=headers)
+    assert response.status_code == 200
+    page = response.json['data']
+    assert [v['user']['id'] for v in page['verifications']] == [users[1].id]
+
+    response = client.get(f"api/v1/verification/queue?after={page['next']}", headers=headers)
+    page = response.json['data']
+    assert [v['user']['id'] for v in page['verifications']] == [users[0].id]
+    assert page['next'] is None
+
+    response = client.patch('api/v1/verification/queue', headers=headers, json={
+        'user_ids': [user.id for user in users] + [users[0].id],
+    })
+    assert response.status_code == 200
+    assert [r['status'] for r in response.json['data']] == ['verified', 'verified', 'already_verified', 'not_requested']
+    assert Verification.query.filter_by(is_verified=False).count() == 0
+
+    response = client.patch('api/v1/verification/queue', headers=headers, json={'user_ids': 'all'})
+    assert response.status_code == 400
+
+    user_headers = {'Authorization': f'Bearer {create_access_token(identity=users[3].id)}'}
+    assert client.get('api/v1/verification/queue', headers=user_headers).status_code == 403
+
+
+def test_verification_queue_columns_are_not_null(client):
+    admin = User(email="admin@example.com", password="hashedpassword", full_name='Admin', is_admin=True)
+    user = User(email="user@example.com", password="hashedpassword", full_name='User')
+    db.session.add_all([admin, user])
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+
+    # NULL-dated or NULL-status rows would be skipped by the queue's cursor and filter
+    for column in ('date_verified', 'is_verified'):
+        with pytest.raises(IntegrityError):
+            db.session.execute(insert(Verification.__table__).values(
+                address="123 Main St", bvn="12345678901", user_id=user.id, **{column: None},
+            ))
+        db.session.rollback()
+
+    # Left out, both take their defaults and the request is queued
+    db.session.add(Verification(address="123 Main St", bvn="12345678901", user_id=user.id))
+    db.session.commit()
+    response = client.get('api/v1/verification/queue', headers=headers)
+    assert response.status_code == 200
+    assert [v['user']['id'] for v in response.json['data']['verifications']] == [user.id]
+
+    # Approving without is_verified: true leaves the request in the queue
+    response = client.patch(f'api/v1/verification/{user.id}', headers=headers, json={})
+    assert response.status_code == 400
+    assert Verification.query.one().is_verified is False